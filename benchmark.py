@@ -0,0 +1,267 @@
+import argparse
+import itertools
+import time
+
+from src.utils import iter_video, StageCache
+
+
+def load_clip(video_path, max_frames):
+    """
+    Decode the first max_frames frames of a video.
+    """
+    return list(itertools.islice(iter_video(video_path), max_frames))
+
+
+def load_tracks(args, frames, stage):
+    """
+    Tracks of the clip for a tracking stage ("player_tracks" or "ball_tracks").
+
+    They are read from the stage cache entry the in-memory pipeline wrote for the
+    video (same key: video, --model weights and tracker parameters), or computed
+    on the clip with --model when the video was not processed yet.
+    """
+    from src.pipeline.pipeline import TrackingStages, PLAYER_TRACKER_PARAMS, BALL_TRACKER_PARAMS
+
+    params = {"player_tracks": PLAYER_TRACKER_PARAMS, "ball_tracks": BALL_TRACKER_PARAMS}[stage]
+    cache = StageCache(args.cache_dir)
+    tracks = cache.get(cache.make_key(stage, video_path=args.video, model_paths=[args.model], params=params))
+    if tracks is not None:
+        return tracks[:len(frames)]
+
+    print(f"No cached {stage} for {args.video} in {args.cache_dir}, computing them with {args.model}.")
+    stages = TrackingStages(args.model, court_model_path=None)
+    if stage == "player_tracks":
+        return stages.player_tracker.track_players(frames=frames, **stages.player_tracker.detect_and_embed(frames))
+    return stages.ball_tracker.track_detections(frames, **stages.ball_tracker.detect_and_embed(frames))
+
+
+def benchmark_team_engines(args):
+    """
+    Compare the CLIP and color-histogram team engines on the same player crops:
+    throughput (crops per second) and agreement with CLIP, used as the reference.
+    """
+    from src.teams.teams_assigner import TeamAssigner
+
+    frames = load_clip(args.video, args.max_frames)
+    player_tracks = load_tracks(args, frames, "player_tracks")
+
+    results = {}
+    for engine in ("clip", "color"):
+        assigner = TeamAssigner(engine=engine, sample_interval=1, samples_per_track=len(frames))
+        player_ids, crops = assigner.sample_track_crops(frames, player_tracks)
+        assigner.load_model()
+
+        start_time = time.perf_counter()
+        teams = assigner.classify_crops(crops)
+        elapsed = time.perf_counter() - start_time
+
+        results[engine] = teams
+        print(f"{engine:>6}: {len(crops)} crops in {elapsed:.2f}s ({len(crops) / elapsed:.1f} crops/s)")
+
+    agreement = sum(a == b for a, b in zip(results["clip"], results["color"])) / max(len(results["clip"]), 1)
+    print(f"color engine agreement with clip: {agreement * 100:.1f}%")
+
+
+def detect_ball_possession_loop(detector, player_tracks, ball_tracks):
+    """
+    Frame-by-frame reference implementation of detect_ball_possession, built on
+    the scalar find_best_candidate_for_possession.
+    """
+    from src.utils import get_center_of_bbox
+
+    possession_list = [-1] * len(ball_tracks)
+    consecutive_possession_count = {}
+    for frame_num, ball_dict in enumerate(ball_tracks):
+        ball_bbox = ball_dict.get(1, {}).get('bbox', [])
+        if not ball_bbox:
+            continue
+        best_player_id = detector.find_best_candidate_for_possession(get_center_of_bbox(ball_bbox),
+                                                                     player_tracks[frame_num], ball_bbox)
+        if best_player_id != -1:
+            count = consecutive_possession_count.get(best_player_id, 0) + 1
+            consecutive_possession_count = {best_player_id: count}
+            if count >= detector.min_frames:
+                possession_list[frame_num] = best_player_id
+        else:
+            consecutive_possession_count = {}
+    return possession_list
+
+
+def benchmark_possession(args):
+    """
+    Time the vectorized ball possession detection against the frame-by-frame
+    reference and check that both give the same result on the tracks of the clip.
+    """
+    from src.tracks.ball_tracker import BallTracker
+    from src.ball_aquisition.ball_aquisition_detector import BallAquisitionDetector
+
+    frames = load_clip(args.video, args.max_frames)
+    player_tracks = load_tracks(args, frames, "player_tracks")
+    ball_tracks = load_tracks(args, frames, "ball_tracks")
+    ball_tracks = BallTracker.interpolate_ball_positions(BallTracker.remove_wrong_detections(ball_tracks))
+
+    detector = BallAquisitionDetector()
+    start_time = time.perf_counter()
+    reference = detect_ball_possession_loop(detector, player_tracks, ball_tracks)
+    loop_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    vectorized = detector.detect_ball_possession(player_tracks, ball_tracks)
+    vectorized_time = time.perf_counter() - start_time
+
+    print(f"loop:       {loop_time * 1000:.1f} ms")
+    print(f"vectorized: {vectorized_time * 1000:.1f} ms")
+    print(f"identical results: {reference == vectorized}")
+
+
+def benchmark_tactical_view(args):
+    """
+    Per-frame cost of the tactical mini-map with the static court layer drawn on
+    every frame versus composited from the cached sprite, and the largest pixel
+    difference between both outputs.
+    """
+    import numpy as np
+    from src.tactic_view.tactic_view_converter import TacticalViewConverter
+    from src.draws.tactic_viewer_drawer import TacticalViewDrawer
+
+    frames = load_clip(args.video, args.max_frames)
+    converter = TacticalViewConverter(court_image_path=args.court_image)
+
+    outputs = {}
+    for cache_static_layer in (False, True):
+        drawer = TacticalViewDrawer(cache_static_layer=cache_static_layer)
+        court_image = drawer.load_court_image(converter.court_image_path, converter.width, converter.height)
+        # Warm up (renders the sprite when cached).
+        drawer.draw_frame(frames[0].copy(), court_image, converter.key_points)
+
+        copies = [frame.copy() for frame in frames]
+        start_time = time.perf_counter()
+        outputs[cache_static_layer] = [drawer.draw_frame(frame, court_image, converter.key_points)
+                                       for frame in copies]
+        elapsed = time.perf_counter() - start_time
+
+        name = "sprite" if cache_static_layer else "redraw"
+        print(f"{name:>6}: {elapsed / len(frames) * 1000:.3f} ms/frame")
+
+    max_diff = max(int(np.abs(a.astype(int) - b.astype(int)).max())
+                   for a, b in zip(outputs[False], outputs[True]))
+    print(f"max pixel difference: {max_diff}")
+
+
+def track_continuity(tracks):
+    """
+    Continuity of ball tracks: frames with a ball, ID switches between
+    consecutive frames with a ball, and longest run of frames without one.
+    """
+    present = [bool(frame_tracks) for frame_tracks in tracks]
+    switches, previous_id = 0, None
+    longest_gap, gap = 0, 0
+    for frame_tracks in tracks:
+        if not frame_tracks:
+            gap += 1
+            longest_gap = max(longest_gap, gap)
+            continue
+        gap = 0
+        track_id = next(iter(frame_tracks))
+        if previous_id is not None and track_id != previous_id:
+            switches += 1
+        previous_id = track_id
+    return sum(present) / max(len(tracks), 1), switches, longest_gap
+
+
+def benchmark_ball_trackers(args):
+    """
+    Compare the DeepSort and single-object ball tracking engines on the same
+    detections: tracking latency per frame (detection excluded) and continuity.
+    """
+    from src.detection.shared_detector import SharedDetector
+    from src.tracks.ball_tracker import BallTracker, BALL_TRACKER_ENGINES
+
+    frames = load_clip(args.video, args.max_frames)
+    detector = SharedDetector(model_path=args.model)
+    detections = BallTracker(detector=detector).detect_balls(frames)
+
+    for engine in BALL_TRACKER_ENGINES:
+        tracker = BallTracker(detector=detector, max_age=20, engine=engine)
+        start_time = time.perf_counter()
+        tracks = tracker.track_detections(frames, detections)
+        elapsed = time.perf_counter() - start_time
+
+        coverage, switches, longest_gap = track_continuity(tracks)
+        print(f"{engine:>8}: {elapsed / len(frames) * 1000:.2f} ms/frame, ball in {coverage * 100:.1f}% of frames, "
+              f"{switches} ID switches, longest gap {longest_gap} frames")
+
+
+def count_id_switches(tracks, iou_threshold=0.5):
+    """
+    ID switches without ground truth: boxes overlapping a box of the previous
+    frame (IoU above iou_threshold, matched greedily) under another track ID.
+    """
+    import numpy as np
+    from src.utils import iou_matrix
+
+    switches = 0
+    for previous, current in zip(tracks, tracks[1:]):
+        if not previous or not current:
+            continue
+        previous_ids, current_ids = list(previous), list(current)
+        ious = iou_matrix([previous[i]["bbox"] for i in previous_ids], [current[i]["bbox"] for i in current_ids])
+        while ious.size and ious.max() > iou_threshold:
+            i, j = np.unravel_index(np.argmax(ious), ious.shape)
+            switches += previous_ids[i] != current_ids[j]
+            ious[i, :] = 0
+            ious[:, j] = 0
+    return switches
+
+
+def benchmark_player_trackers(args):
+    """
+    Compare the player tracking backends on the same detections: tracking
+    throughput (detection excluded), ID switches between consecutive frames and
+    number of distinct track IDs.
+    """
+    from src.detection.shared_detector import SharedDetector
+    from src.tracks.player_tracker import PlayerTracker
+    from src.tracks.backends import TRACKER_BACKENDS
+
+    frames = load_clip(args.video, args.max_frames)
+    # Low threshold: the ByteTrack backend also associates low-confidence detections.
+    detector = SharedDetector(model_path=args.model, conf_threshold=0.1)
+    detections = detector.detections_for(frames, PlayerTracker.player_class_id)
+
+    for backend in TRACKER_BACKENDS:
+        tracker = PlayerTracker(detector=detector, max_age=15, backend=backend).tracker
+        start_time = time.perf_counter()
+        tracks = [tracker.update(detection, frame) for detection, frame in zip(detections, frames)]
+        elapsed = time.perf_counter() - start_time
+
+        n_ids = len({track_id for frame_tracks in tracks for track_id in frame_tracks})
+        print(f"{backend:>9}: {len(frames) / elapsed:.1f} FPS ({elapsed / len(frames) * 1000:.2f} ms/frame), "
+              f"{count_id_switches(tracks)} ID switches, {n_ids} track IDs")
+
+
+BENCHMARKS = {
+    "team_engines": benchmark_team_engines,
+    "possession": benchmark_possession,
+    "tactical_view": benchmark_tactical_view,
+    "ball_trackers": benchmark_ball_trackers,
+    "player_trackers": benchmark_player_trackers,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Performance benchmarks of the pipeline stages.")
+    parser.add_argument("benchmark", choices=sorted(BENCHMARKS))
+    parser.add_argument("--video", default="data/videos/video_1.mp4")
+    parser.add_argument("--model", default="models/players_detection_model.pt", help="Detection model weights.")
+    parser.add_argument("--cache-dir", default="cache/stages",
+                        help="Stage cache of the pipeline the tracks are read from.")
+    parser.add_argument("--court-image", default="data/basketball_court.png")
+    parser.add_argument("--max-frames", type=int, default=300)
+    args = parser.parse_args()
+
+    BENCHMARKS[args.benchmark](args)
+
+
+if __name__ == "__main__":
+    main()
@@ -19,6 +19,7 @@ setup(
         "opencv-python-headless",
         "pandas",
         "Pillow",
+        "pyyaml",
         "torch",
         "transformers",
         "ultralytics",
@@ -1,7 +1,9 @@
 
 import sys 
 sys.path.append('../../')
+import numpy as np
 from src.utils.bbox import measure_distance, get_center_of_bbox
+from src.utils.track_table import TrackTable
 
 class BallAquisitionDetector:
     """
@@ -28,6 +30,14 @@ class BallAquisitionDetector:
         self.possession_threshold = 50
         self.min_frames = 11
         self.containment_threshold = 0.8
+        self.reset()
+
+    def reset(self):
+        """
+        Forget the possession streak carried over between frames by update().
+        """
+        self._streak_player_id = -1
+        self._streak_length = 0
         
     def get_key_basketball_player_assignment_points(self, player_bbox,ball_center):
         """
@@ -166,18 +176,99 @@ class BallAquisitionDetector:
                 
         return -1
     
+    def ball_boxes_array(self, ball_tracks):
+        """
+        Stack the ball bounding boxes (track id 1) into a (num_frames, 4) array,
+        with NaN rows for frames without a ball.
+        """
+        ball_boxes = np.full((len(ball_tracks), 4), np.nan)
+        for frame_num, ball_dict in enumerate(ball_tracks):
+            ball_bbox = ball_dict.get(1, {}).get('bbox', [])
+            if len(ball_bbox):
+                ball_boxes[frame_num] = ball_bbox
+        return ball_boxes
+
+    def find_best_candidates(self, player_table, ball_boxes):
+        """
+        Vectorized find_best_candidate_for_possession over every frame at once.
+
+        Containment ratios and key point distances are computed for all
+        (frame, player) rows of the table with NumPy broadcasting, then the best
+        row of each frame is selected with a single lexicographic sort.
+
+        Args:
+            player_table (TrackTable): Player tracks.
+            ball_boxes (np.ndarray): (num_frames, 4) ball boxes, NaN rows without a ball.
+
+        Returns:
+            np.ndarray: Row index of the best candidate per frame, -1 where there is none.
+        """
+        num_frames = len(ball_boxes)
+        candidates = np.full(num_frames, -1, dtype=np.int64)
+
+        frames = np.asarray(player_table.columns["frame"], dtype=np.int64)
+        rows = np.flatnonzero((frames < num_frames))
+        rows = rows[~np.isnan(ball_boxes[frames[rows], 0])]
+        if len(rows) == 0:
+            return candidates
+        frames = frames[rows]
+
+        x1, y1, x2, y2 = (np.asarray(player_table.columns[name], dtype=np.float64)[rows]
+                          for name in ("x1", "y1", "x2", "y2"))
+        bx1, by1, bx2, by2 = ball_boxes[frames].T
+        ball_cx = np.trunc((bx1 + bx2) / 2)
+        ball_cy = np.trunc((by1 + by2) / 2)
+
+        # Containment ratio of the ball in each player box
+        inter_w = np.minimum(x2, bx2) - np.maximum(x1, bx1)
+        inter_h = np.minimum(y2, by2) - np.maximum(y1, by1)
+        ball_area = (bx2 - bx1) * (by2 - by1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            containment = np.where((inter_w >= 0) & (inter_h >= 0) & (ball_area != 0),
+                                   inter_w * inter_h / ball_area, 0.0)
+
+        # Key points of get_key_basketball_player_assignment_points, as (rows, 14) arrays
+        half_w = np.floor_divide(x2 - x1, 2)
+        half_h = np.floor_divide(y2 - y1, 2)
+        third_h = np.floor_divide(y2 - y1, 3)
+        points_x = np.stack([x1, x2, ball_cx, ball_cx,
+                             x1 + half_w, x2, x1, x2, x1, x1 + half_w, x2, x1, x1 + half_w, x1 + half_w], axis=1)
+        points_y = np.stack([ball_cy, ball_cy, y1, y2,
+                             y1, y1, y1, y1 + half_h, y1 + half_h, y1 + half_h, y2, y2, y2, y1 + third_h], axis=1)
+        inside_y = (ball_cy > y1) & (ball_cy < y2)
+        inside_x = (ball_cx > x1) & (ball_cx < x2)
+        valid_points = np.ones_like(points_x, dtype=bool)
+        valid_points[:, 0] = valid_points[:, 1] = inside_y
+        valid_points[:, 2] = valid_points[:, 3] = inside_x
+
+        distances = np.sqrt((points_x - ball_cx[:, None]) ** 2 + (points_y - ball_cy[:, None]) ** 2)
+        min_distance = np.where(valid_points, distances, np.inf).min(axis=1)
+
+        # Per frame: high containment players first (largest distance wins), then
+        # the closest player; ties keep the first player of the frame.
+        high = containment > self.containment_threshold
+        score = np.where(high, -min_distance, min_distance)
+        order = np.lexsort((rows, score, ~high, frames))
+        sorted_frames = frames[order]
+        first = order[np.r_[True, sorted_frames[1:] != sorted_frames[:-1]]]
+
+        accepted = high[first] | (min_distance[first] < self.possession_threshold)
+        candidates[frames[first[accepted]]] = rows[first[accepted]]
+        return candidates
+
     def detect_ball_possession(self, player_tracks, ball_tracks):
         """
         Detect which player has the ball in each frame based on bounding box information.
 
-        Loops through all frames, looks up ball bounding boxes and player bounding boxes,
-        and uses find_best_candidate_for_possession to determine who has the ball.
-        Requires a player to hold possession for at least min_frames consecutive frames
-        before confirming possession.
+        Finds the best candidate of every frame at once (see find_best_candidates),
+        then requires a player to hold possession for at least min_frames consecutive
+        frames before confirming possession. Frames without a ball do not break a
+        streak; frames with a ball but no candidate do.
 
         Args:
-            player_tracks (list): A list of dictionaries for each frame, where each dictionary
-                maps player_id to player information including 'bbox'.
+            player_tracks (list or TrackTable): A list of dictionaries for each frame, where each
+                dictionary maps player_id to player information including 'bbox', or the
+                equivalent columnar TrackTable.
             ball_tracks (list): A list of dictionaries for each frame, where each dictionary
                 maps ball_id to ball information including 'bbox'.
 
@@ -187,32 +278,63 @@ class BallAquisitionDetector:
         """
         num_frames = len(ball_tracks)
         possession_list = [-1] * num_frames
-        consecutive_possession_count = {}
-        
-        for frame_num in range(num_frames):
-            ball_info = ball_tracks[frame_num].get(1, {})
-            if not ball_info:
-                continue
-                
-            ball_bbox = ball_info.get('bbox', [])
-            if not ball_bbox:
-                continue
-                
-            ball_center = get_center_of_bbox(ball_bbox)
-            
-            best_player_id = self.find_best_candidate_for_possession(
-                ball_center, 
-                player_tracks[frame_num], 
-                ball_bbox
-            )
-
-            if best_player_id != -1:
-                number_of_consecutive_frames = consecutive_possession_count.get(best_player_id, 0) + 1
-                consecutive_possession_count = {best_player_id: number_of_consecutive_frames} 
-
-                if consecutive_possession_count[best_player_id] >= self.min_frames:
-                    possession_list[frame_num] = best_player_id
-            else:
-                consecutive_possession_count ={}
-    
+
+        if not isinstance(player_tracks, TrackTable):
+            player_tracks = TrackTable.from_tracks(player_tracks[:num_frames])
+
+        ball_boxes = self.ball_boxes_array(ball_tracks)
+        candidate_rows = self.find_best_candidates(player_tracks, ball_boxes)
+
+        # Streaks are counted over the frames that have a ball only.
+        ball_frames = np.flatnonzero(~np.isnan(ball_boxes[:, 0]))
+        if len(ball_frames) == 0:
+            return possession_list
+
+        track_ids = np.asarray(player_tracks.columns["track_id"])
+        rows = candidate_rows[ball_frames]
+        candidate_ids = np.where(rows >= 0, track_ids[np.maximum(rows, 0)], -1)
+        has_candidate = rows >= 0
+
+        streak_start = np.r_[True, (candidate_ids[1:] != candidate_ids[:-1]) | ~has_candidate[:-1]]
+        start_index = np.maximum.accumulate(np.where(streak_start, np.arange(len(rows)), 0))
+        streak_length = np.arange(len(rows)) - start_index + 1
+
+        confirmed = has_candidate & (streak_length >= self.min_frames)
+        for frame_num, row in zip(ball_frames[confirmed], rows[confirmed]):
+            possession_list[frame_num] = player_tracks.track_key(track_ids[row])
+
         return possession_list
+
+    def update(self, player_tracks_frame, ball_dict):
+        """
+        Online counterpart of detect_ball_possession: process the next frame and
+        return the player who has possession in it.
+
+        Only the current possession streak is kept between frames, so the state is
+        constant-size. Frames without a ball return -1 without breaking the
+        streak; frames with a ball but no candidate break it.
+
+        Args:
+            player_tracks_frame (dict): Mapping from player_id to info including 'bbox'.
+            ball_dict (dict): Mapping from ball_id to info including 'bbox' (ball id 1 is used).
+
+        Returns:
+            int: The player_id who has possession, or -1.
+        """
+        ball_bbox = ball_dict.get(1, {}).get('bbox', [])
+        if not len(ball_bbox):
+            return -1
+
+        best_player_id = self.find_best_candidate_for_possession(get_center_of_bbox(ball_bbox),
+                                                                 player_tracks_frame, ball_bbox)
+        if best_player_id == -1:
+            self.reset()
+            return -1
+
+        if best_player_id == self._streak_player_id:
+            self._streak_length += 1
+        else:
+            self._streak_player_id = best_player_id
+            self._streak_length = 1
+
+        return best_player_id if self._streak_length >= self.min_frames else -1
@@ -0,0 +1,125 @@
+"""
+Headless command line interface of the pipeline.
+
+    python -m src.cli run --input video.mp4 --output annotated.mp4
+    python -m src.cli run --input video.mp4 --stages players,ball,teams --no-render --analytics analytics.json
+
+Options default to the values of config.yml. The components of disabled stages
+(YOLO, Deep SORT, CLIP...) are never imported nor loaded.
+"""
+import os
+import argparse
+import logging
+
+from src.pipeline.pipeline import run_pipeline, validate_stages
+
+DEFAULT_CONFIG_PATH = "config.yml"
+
+
+def load_config(path=DEFAULT_CONFIG_PATH):
+    """
+    Read the YAML configuration of the pipeline.
+
+    Returns:
+        dict: The configuration (empty if the file does not exist or is empty).
+    """
+    if not path or not os.path.exists(path):
+        return {}
+    import yaml
+    with open(path, encoding="utf-8") as f:
+        return yaml.safe_load(f) or {}
+
+
+def parse_stages(value):
+    """
+    Parse a comma-separated list of stages, e.g. "players,ball,teams".
+    """
+    try:
+        return validate_stages(stage.strip() for stage in value.split(",") if stage.strip())
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cv_project", description="Basketball video analysis pipeline.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run = subparsers.add_parser("run", help="Run the pipeline on a video.")
+    run.add_argument("--config", default=DEFAULT_CONFIG_PATH, help="YAML configuration file (default: %(default)s).")
+    run.add_argument("--input", help="Input video path (config: input).")
+    run.add_argument("--output", help="Annotated output video path (config: output).")
+    run.add_argument("--analytics", help="JSON file the analytics are exported to (config: analytics).")
+    run.add_argument("--stages", type=parse_stages,
+                     help="Comma-separated stages to run, among players, ball, teams, tactical (config: stages).")
+    run.add_argument("--no-render", dest="render", action="store_false", default=None,
+                     help="Do not render the annotated video (config: render).")
+    run.add_argument("--window-size", type=int, help="Frames per window in streaming mode (config: window_size).")
+    run.add_argument("--chunk-size", type=int, help="Frames per chunk in chunked parallel mode (config: chunk_size).")
+    run.add_argument("--workers", type=int, help="Worker processes in chunked mode (config: workers).")
+    run.add_argument("--no-cache", dest="use_cache", action="store_false", default=None,
+                     help="Do not read or write the stage cache (config: cache.enabled).")
+    return parser
+
+
+def run_options(args, config):
+    """
+    Merge the command line arguments over the configuration into run_pipeline arguments.
+
+    Returns:
+        dict: Keyword arguments of run_pipeline.
+    """
+    def option(value, default):
+        return default if value is None else value
+
+    models = config.get("models") or {}
+    cache = config.get("cache") or {}
+    stages = args.stages
+    if stages is None and config.get("stages") is not None:
+        stages = validate_stages(config["stages"])
+
+    options = {
+        "video_path": option(args.input, config.get("input")),
+        "output_path": option(args.output, config.get("output")),
+        "analytics_path": option(args.analytics, config.get("analytics")),
+        "enabled_stages": stages,
+        "render": option(args.render, config.get("render", True)),
+        "model_path": models.get("players"),
+        "court_model_path": models.get("court_keypoints"),
+        "court_image_path": config.get("court_image"),
+        "team_colors": config.get("team_colors"),
+        "window_size": option(args.window_size, config.get("window_size")),
+        "chunk_size": option(args.chunk_size, config.get("chunk_size")),
+        "workers": option(args.workers, config.get("workers")),
+        "use_cache": option(args.use_cache, cache.get("enabled")),
+        "cache_dir": cache.get("dir"),
+    }
+
+    if options["video_path"] is None:
+        raise ValueError("No input video: give --input or set input in the configuration.")
+    if options["render"] and options["output_path"] is None:
+        raise ValueError("No output video: give --output or set output in the configuration (or use --no-render).")
+    if not options["render"] and options["analytics_path"] is None:
+        raise ValueError("Nothing to output with --no-render: give --analytics or set analytics "
+                         "in the configuration.")
+
+    # Other options left unset fall back to the defaults of run_pipeline.
+    return {name: value for name, value in options.items()
+            if value is not None or name in ("video_path", "output_path")}
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        options = run_options(args, load_config(args.config))
+    except ValueError as e:
+        parser.error(str(e))
+
+    logging.basicConfig(level=logging.INFO)
+    result_path = run_pipeline(**options)
+    logging.getLogger(__name__).info(f"Output written to {result_path}")
+    return result_path
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+from src.detection.shared_detector import SharedDetector, split_detections_by_class
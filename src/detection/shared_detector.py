@@ -0,0 +1,127 @@
+import logging
+import numpy as np
+
+import sys
+sys.path.append('../../')
+
+from src.utils import load_yolo_model, auto_batch_size, predict_in_batches
+
+logger = logging.getLogger(__name__)
+
+
+def split_detections_by_class(result):
+    """
+    Convert a YOLO result into per-class detection arrays.
+
+    Args:
+        result (ultralytics.engine.results.Results): YOLO result for one frame.
+
+    Returns:
+        dict: Mapping class_id -> np.ndarray of shape (N, 5) with rows [x1, y1, x2, y2, conf].
+    """
+    boxes = result.boxes.xyxy.cpu().numpy()
+    confs = result.boxes.conf.cpu().numpy()
+    classes = result.boxes.cls.cpu().numpy().astype(int)
+
+    detections = {}
+    for class_id in np.unique(classes):
+        mask = classes == class_id
+        detections[int(class_id)] = np.hstack([boxes[mask], confs[mask, None]]).astype(np.float32)
+    return detections
+
+
+class SharedDetector:
+    """
+    Runs the players detection model once per frame and fans out the
+    detections of each class to several consumers (players, ball, ...).
+
+    Consumers call detections_for() with the same list of frames; the model
+    runs on the first call and the following calls reuse its output.
+    """
+
+    def __init__(self, model_path, conf_threshold=0.5, batch_size=None, half=False,
+                 export_format=None, imgsz=640):
+        """
+        Args:
+            model_path (str): Path to the YOLO model weights.
+            conf_threshold (float): Minimum confidence kept by the detector. Consumers
+                can apply a stricter threshold of their own.
+            batch_size (int, optional): Frames per inference batch (auto if None).
+            half (bool): Use half precision inference.
+            export_format (str, optional): "onnx" or "openvino" exported runtime.
+            imgsz (int): Inference image size.
+        """
+        self.model_path = model_path
+        self.export_format = export_format
+        self.model = None
+        self.conf_threshold = conf_threshold
+        self.batch_size = batch_size
+        self.half = half
+        self.imgsz = imgsz
+        self.detection_fps = None
+
+        self._frames = None
+        self._detections = None
+
+    def load_model(self):
+        """
+        Load the model on first use, so building the detector is cheap when every
+        consumer is served from a cache.
+        """
+        if self.model is None:
+            self.model = load_yolo_model(self.model_path, export_format=self.export_format,
+                                         half=self.half, imgsz=self.imgsz)
+        return self.model
+
+    @property
+    def names(self):
+        return self.load_model().names
+
+    def class_id(self, class_name):
+        """
+        Return the class id of class_name, or None if the model does not know it.
+        """
+        names_inv = {v: k for k, v in self.names.items()}
+        return names_inv.get(class_name)
+
+    def detect(self, frames):
+        """
+        Detect every class on a list of frames, running the model once per frame.
+
+        Args:
+            frames (list): List of video frames.
+
+        Returns:
+            list: One dict per frame mapping class_id -> np.ndarray (N, 5) of [x1, y1, x2, y2, conf].
+        """
+        if frames is self._frames:
+            return self._detections
+
+        detections = []
+        if frames:
+            batch_size = self.batch_size or auto_batch_size(frames[0].shape, imgsz=self.imgsz)
+            results, self.detection_fps = predict_in_batches(self.load_model(), frames, batch_size,
+                                                             conf=self.conf_threshold,
+                                                             half=self.half,
+                                                             imgsz=self.imgsz)
+            detections = [split_detections_by_class(result) for result in results]
+            if self.detection_fps is not None:
+                logger.info(f"Shared detection: {len(frames)} frames at {self.detection_fps:.1f} FPS")
+
+        self._frames = frames
+        self._detections = detections
+        return detections
+
+    def detections_for(self, frames, class_id):
+        """
+        Return the detections of a single class for each frame.
+
+        Args:
+            frames (list): List of video frames.
+            class_id (int): Class to select.
+
+        Returns:
+            list: One np.ndarray (N, 5) of [x1, y1, x2, y2, conf] per frame.
+        """
+        empty = np.zeros((0, 5), dtype=np.float32)
+        return [frame_detections.get(class_id, empty) for frame_detections in self.detect(frames)]
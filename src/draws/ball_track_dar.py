@@ -18,33 +18,34 @@ class BallTracksDrawer:
             alpha = (i + 1) / self.trail_length
             cv2.circle(frame, point, 3, [int(c * alpha) for c in color], -1)
 
-    def draw(self, video_frames, tracks):
-        output_video_frames = []
-
-        for frame_num, frame in enumerate(video_frames):
-            frame = frame.copy()
-            ball_dict = tracks[frame_num]
+    def draw_frame(self, frame, ball_dict):
+        """
+        Draw the ball trail, marker and direction of one frame, in place.
+        """
+        for track_id, ball in ball_dict.items():
+            bbox = ball.get("bbox")  # Expected format: [x1, y1, x2, y2]
+            if not bbox:
+                continue
 
-            for track_id, ball in ball_dict.items():
-                bbox = ball.get("bbox")  # Expected format: [x1, y1, x2, y2]
-                if not bbox:
-                    continue
+            x1, y1, x2, y2 = bbox
+            center = (int((x1 + x2) / 2), int((y1 + y2) / 2))
 
-                x1, y1, x2, y2 = bbox
-                center = (int((x1 + x2) / 2), int((y1 + y2) / 2))
+            self.trail_history[track_id].append(center)
+            del self.trail_history[track_id][:-self.trail_length]
+            self.draw_trail(frame, self.trail_history[track_id], self.ball_color)
 
-                self.trail_history[track_id].append(center)
-                self.draw_trail(frame, self.trail_history[track_id], self.ball_color)
-                frame = draw_triangle(frame, bbox, self.ball_color)
+            # Draw triangle marker on the ball
+            frame = draw_triangle(frame, bbox, self.ball_color)
 
-                # Draw triangle marker on the ball
-                frame = draw_triangle(frame, bbox, self.ball_color)
+            # Optional: direction arrow
+            if len(self.trail_history[track_id]) > 1:
+                prev = self.trail_history[track_id][-2]
+                cv2.arrowedLine(frame, prev, center, self.ball_color, 2, tipLength=0.4)
 
-                # Optional: direction arrow
-                if len(self.trail_history[track_id]) > 1:
-                    prev = self.trail_history[track_id][-2]
-                    cv2.arrowedLine(frame, prev, center, self.ball_color, 2, tipLength=0.4)
-
-            output_video_frames.append(frame)
+        return frame
 
+    def draw(self, video_frames, tracks):
+        output_video_frames = []
+        for frame_num, frame in enumerate(video_frames):
+            output_video_frames.append(self.draw_frame(frame.copy(), tracks[frame_num]))
         return output_video_frames
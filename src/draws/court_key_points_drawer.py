@@ -33,31 +33,40 @@ class CourtKeypointDrawer:
         output_frames = []
 
         for index, frame in enumerate(frames):
-            annotated_frame = frame.copy()
-            keypoints = court_keypoints[index]
+            output_frames.append(self.draw_frame(frame.copy(), court_keypoints[index]))
 
-            if not keypoints:
-                output_frames.append(annotated_frame)
-                continue
+        return output_frames
+
+    def draw_frame(self, frame, keypoints):
+        """
+        Dessine les keypoints du terrain d'une frame, sur place.
+
+        Args:
+            frame (np.ndarray): Frame vidéo.
+            keypoints: Keypoints de la frame (liste de (x, y), tableau ou Tensor).
 
-            # Si keypoints est un Tensor, on le convertit
-            if hasattr(keypoints, "cpu"):
-                keypoints = keypoints.cpu().numpy()
-            else:
-                keypoints = np.array(keypoints)
+        Returns:
+            np.ndarray: Frame annotée.
+        """
+        if not len(keypoints):
+            return frame
 
-            keypoints_obj = sv.KeyPoints(keypoints)
+        # Si keypoints est un Tensor, on le convertit
+        if hasattr(keypoints, "cpu"):
+            keypoints = keypoints.cpu().numpy()
+        else:
+            keypoints = np.array(keypoints)
 
-            annotated_frame = self.vertex_annotator.annotate(
-                scene=annotated_frame,
-                key_points=keypoints_obj
-            )
+        keypoints_obj = sv.KeyPoints(keypoints)
 
-            annotated_frame = self.vertex_label_annotator.annotate(
-                scene=annotated_frame,
-                key_points=keypoints_obj
-            )
+        frame = self.vertex_annotator.annotate(
+            scene=frame,
+            key_points=keypoints_obj
+        )
 
-            output_frames.append(annotated_frame)
+        frame = self.vertex_label_annotator.annotate(
+            scene=frame,
+            key_points=keypoints_obj
+        )
 
-        return output_frames
+        return frame
@@ -2,6 +2,8 @@ import cv2
 import numpy as np
 from typing import List, Tuple, Optional, Dict
 
+from src.draws.utils import blend_rect
+
 class PassInterceptionDrawer:
     """
     Classe pour calculer et dessiner les statistiques cumulées
@@ -73,15 +75,18 @@ class PassInterceptionDrawer:
         self,
         video_frames: List[np.ndarray],
         passes: List[int],
-        interceptions: List[int]
+        interceptions: List[int],
+        start_frame: int = 0
     ) -> List[np.ndarray]:
         """
         Dessine les statistiques cumulées sur chaque frame.
 
         Args:
             video_frames: Liste de frames (np.ndarray).
-            passes: Liste des passes par frame.
-            interceptions: Liste des interceptions par frame.
+            passes: Liste des passes par frame (vidéo complète).
+            interceptions: Liste des interceptions par frame (vidéo complète).
+            start_frame: Index global de la première frame de video_frames, pour dessiner
+                une fenêtre de la vidéo en mode streaming.
 
         Returns:
             Liste des frames avec overlay statistique.
@@ -89,7 +94,7 @@ class PassInterceptionDrawer:
         self.prepare_stats(passes, interceptions)
 
         output_frames = []
-        for idx, frame in enumerate(video_frames):
+        for idx, frame in enumerate(video_frames, start=start_frame):
             frame_copy = frame.copy()
             if idx >= len(self.cumulative_stats):
                 output_frames.append(frame_copy)
@@ -118,7 +123,6 @@ class PassInterceptionDrawer:
         Returns:
             Frame modifiée.
         """
-        overlay = frame.copy()
         h, w = frame.shape[:2]
 
         # Rectangle semi-transparent fond sombre
@@ -127,8 +131,7 @@ class PassInterceptionDrawer:
         rect_x2 = int(w * 0.45)
         rect_y2 = int(h * 0.90)
 
-        cv2.rectangle(overlay, (rect_x1, rect_y1), (rect_x2, rect_y2), self.overlay_color, thickness=-1)
-        cv2.addWeighted(overlay, self.overlay_alpha, frame, 1 - self.overlay_alpha, 0, frame)
+        blend_rect(frame, (rect_x1, rect_y1), (rect_x2, rect_y2), self.overlay_color, self.overlay_alpha)
 
         font = cv2.FONT_HERSHEY_SIMPLEX
         line_spacing = int(h * 0.05)
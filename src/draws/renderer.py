@@ -0,0 +1,184 @@
+import numpy as np
+
+
+class Layer:
+    """
+    One annotation layer of the renderer: a drawer bound to the per-frame data it
+    draws. draw() paints the layer of one frame in place on the composited buffer.
+
+    Frame numbers are global indices in the video, so the same layers render
+    every window of a streamed video.
+    """
+
+    def draw(self, frame, frame_num):
+        raise NotImplementedError
+
+
+class PlayerTracksLayer(Layer):
+    def __init__(self, drawer, tracks, player_assignment, ball_acquisition):
+        self.drawer = drawer
+        self.tracks = tracks
+        self.player_assignment = player_assignment
+        self.ball_acquisition = ball_acquisition
+
+    def draw(self, frame, frame_num):
+        return self.drawer.draw_frame(frame,
+                                      self.tracks[frame_num],
+                                      self.player_assignment[frame_num],
+                                      self.ball_acquisition[frame_num])
+
+
+class SpeedAndDistanceLayer(Layer):
+    def __init__(self, drawer, tracks, speed_metrics):
+        """
+        Args:
+            drawer (SpeedAndDistanceDrawer): The drawer.
+            tracks (list): Per-frame player tracks.
+            speed_metrics (dict): Output of SpeedAndDistanceCalculator.calculate_metrics.
+        """
+        self.drawer = drawer
+        self.tracks = tracks
+        self.player_ids = speed_metrics["player_ids"]
+        self.offsets = speed_metrics["offsets"]
+        self.players = speed_metrics["players"]
+        self.total_distances = speed_metrics["cumulative_distances"]
+        self.speeds = speed_metrics["speeds"]
+
+    def _values(self, array, frame_num, player_ids):
+        values = {}
+        lo, hi = self.offsets[frame_num], self.offsets[frame_num + 1]
+        for player, value in zip(self.players[lo:hi].tolist(), array[lo:hi].tolist()):
+            player_id = self.player_ids[player]
+            if player_id in player_ids and value == value:
+                values[player_id] = value
+        return values
+
+    def draw(self, frame, frame_num):
+        if frame_num >= len(self.offsets) - 1:
+            return frame
+        frame_tracks = self.tracks[frame_num]
+        return self.drawer.draw_frame(frame, frame_tracks,
+                                      self._values(self.total_distances, frame_num, frame_tracks),
+                                      self._values(self.speeds, frame_num, frame_tracks))
+
+
+class BallTracksLayer(Layer):
+    def __init__(self, drawer, tracks):
+        self.drawer = drawer
+        self.tracks = tracks
+
+    def draw(self, frame, frame_num):
+        return self.drawer.draw_frame(frame, self.tracks[frame_num])
+
+
+class TacticalViewLayer(Layer):
+    def __init__(self, drawer, tactical_view_converter, tactical_player_positions,
+                 player_assignment, ball_acquisition):
+        self.drawer = drawer
+        self.court_keypoints = tactical_view_converter.key_points
+        self.tactical_player_positions = tactical_player_positions
+        self.player_assignment = player_assignment
+        self.ball_acquisition = ball_acquisition
+        # The court image is read and resized once, not once per frame or window.
+        self.court_image = drawer.load_court_image(tactical_view_converter.court_image_path,
+                                                   tactical_view_converter.width,
+                                                   tactical_view_converter.height)
+
+    def draw(self, frame, frame_num):
+        frame_positions, frame_assignments, player_with_ball = None, {}, -1
+        if frame_num < len(self.tactical_player_positions):
+            frame_positions = self.tactical_player_positions[frame_num]
+            if frame_num < len(self.player_assignment):
+                frame_assignments = self.player_assignment[frame_num]
+            if frame_num < len(self.ball_acquisition):
+                player_with_ball = self.ball_acquisition[frame_num]
+        return self.drawer.draw_frame(frame, self.court_image, self.court_keypoints,
+                                      frame_positions, frame_assignments, player_with_ball)
+
+
+class TeamBallControlLayer(Layer):
+    def __init__(self, drawer, possession_index):
+        """
+        Args:
+            possession_index (PossessionIndex): Possession of the whole video; each frame
+                is an O(log n) query instead of per-frame counters.
+        """
+        self.drawer = drawer
+        self.possession_index = possession_index
+
+    def draw(self, frame, frame_num):
+        if frame_num >= len(self.possession_index):
+            return frame
+        return self.drawer.draw_frame(frame, frame_num, self.possession_index)
+
+
+class PassInterceptionLayer(Layer):
+    def __init__(self, drawer, possession_index):
+        self.drawer = drawer
+        self.possession_index = possession_index
+        if drawer.max_val is None:
+            # Same bar scale as PassInterceptionDrawer.prepare_stats, from the totals of the video.
+            last_frame = len(possession_index) - 1
+            max_passes = max(possession_index.event_count("pass", last_frame, team=team_id) for team_id in (1, 2))
+            max_interceptions = max(possession_index.event_count("interception", last_frame, team=team_id)
+                                    for team_id in (1, 2))
+            drawer.max_val = (max_passes + max_interceptions) or 1
+
+    def draw(self, frame, frame_num):
+        if frame_num >= len(self.possession_index):
+            return frame
+        index = self.possession_index
+        stats = (index.event_count("pass", frame_num, team=1), index.event_count("pass", frame_num, team=2),
+                 index.event_count("interception", frame_num, team=1),
+                 index.event_count("interception", frame_num, team=2))
+        return self.drawer.draw_frame(frame, frame_num, stats)
+
+
+class CourtKeypointsLayer(Layer):
+    def __init__(self, drawer, court_keypoints):
+        self.drawer = drawer
+        self.court_keypoints = court_keypoints
+
+    def draw(self, frame, frame_num):
+        return self.drawer.draw_frame(frame, self.court_keypoints[frame_num])
+
+
+class FrameRenderer:
+    """
+    Single-pass compositor of annotation layers.
+
+    Chaining the drawers copies every frame once per drawer (and the panels made
+    one more full-frame copy to blend their background). The renderer copies each
+    frame once and draws every layer in order on that buffer, so the output is the
+    same as the chained drawers with a single copy per frame.
+    """
+
+    def __init__(self, layers):
+        """
+        Args:
+            layers (list): Layer instances, drawn in order (later layers on top).
+        """
+        self.layers = list(layers)
+
+    def render_frame(self, frame, frame_num):
+        """
+        Composite every layer of frame frame_num on a copy of frame.
+        """
+        output = np.array(frame, copy=True)
+        for layer in self.layers:
+            output = layer.draw(output, frame_num)
+        return output
+
+    def render(self, frames, start_frame=0):
+        """
+        Composite every layer on frames, which are the frames start_frame.. of the video.
+
+        Args:
+            frames (iterable): Video frames.
+            start_frame (int): Global index of the first frame.
+
+        Yields:
+            numpy.ndarray: The annotated frames, in order.
+        """
+        for frame_num, frame in enumerate(frames, start=start_frame):
+            yield self.render_frame(frame, frame_num)
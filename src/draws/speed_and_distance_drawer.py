@@ -2,34 +2,46 @@ import cv2
 
 class SpeedAndDistanceDrawer():
     def __init__(self):
-        pass 
+        pass
+
+    def draw_frame(self, frame, player_tracks, total_distances, player_speed):
+        """
+        Draw the speed and the total distance of every player of one frame, in place.
+
+        Args:
+            frame (numpy.ndarray): The frame on which to draw.
+            player_tracks (dict): Player tracking info of the frame.
+            total_distances (dict): Distance covered by each player so far, in meters.
+            player_speed (dict): Speed of each player in the frame, in km/h.
+
+        Returns:
+            numpy.ndarray: The frame with the drawings applied.
+        """
+        for player_id,bbox in player_tracks.items():
+            x1,y1,x2,y2 = bbox['bbox']
+            position = [int((x1+x2)/2),int(y2)]
+            position[1]+=40
+
+            distance = total_distances.get(player_id,None)
+            speed = player_speed.get(player_id,None)
+            if speed is not None:
+                cv2.putText(frame, f"{speed:.2f} km/h",position,cv2.FONT_HERSHEY_SIMPLEX,0.5,(0,0,0),2)
+            if distance is not None:
+                cv2.putText(frame, f"{distance:.2f} m",(position[0],position[1]+20),cv2.FONT_HERSHEY_SIMPLEX,0.5,(0,0,0),2)
+
+        return frame
+
     def draw(self, video_frames,player_tracks,player_distances_per_frame,player_speed_per_frame):
         output_video_frames = []
         total_distances = {}
 
-        for frame,player_tracks,player_distance,player_speed in zip(video_frames,player_tracks,player_distances_per_frame,player_speed_per_frame):            
-            output_frame = frame.copy()
-
+        for frame,player_tracks,player_distance,player_speed in zip(video_frames,player_tracks,player_distances_per_frame,player_speed_per_frame):
             # Get Total Distance
             for player_id, distance in player_distance.items():
                 if player_id not in total_distances:
                     total_distances[player_id]=0
                 total_distances[player_id]+=distance
 
-            
-            for player_id,bbox in player_tracks.items():
-                x1,y1,x2,y2 = bbox['bbox']
-                position = [int((x1+x2)/2),int(y2)]
-                position[1]+=40
-
-                distance = total_distances.get(player_id,None)
-                speed = player_speed.get(player_id,None)
-                if speed is not None:
-                    cv2.putText(output_frame, f"{speed:.2f} km/h",position,cv2.FONT_HERSHEY_SIMPLEX,0.5,(0,0,0),2)
-                if distance is not None:
-                    cv2.putText(output_frame, f"{distance:.2f} m",(position[0],position[1]+20),cv2.FONT_HERSHEY_SIMPLEX,0.5,(0,0,0),2)
-
-            
-            output_video_frames.append(output_frame)
+            output_video_frames.append(self.draw_frame(frame.copy(), player_tracks, total_distances, player_speed))
 
-        return output_video_frames
\ No newline at end of file
+        return output_video_frames
@@ -1,11 +1,28 @@
 import cv2 
+import numpy as np
+
+from src.draws.utils import split_premultiplied, composite_premultiplied
 
 class TacticalViewDrawer:
-    def __init__(self, team_1_color=[255, 245, 238], team_2_color=[128, 0, 0]):
+    def __init__(self, team_1_color=[255, 245, 238], team_2_color=[128, 0, 0], cache_static_layer=True,
+                 unknown_team_color=[128, 128, 128]):
+        """
+        Args:
+            team_1_color (list, optional): Color of team 1 players.
+            team_2_color (list, optional): Color of team 2 players.
+            unknown_team_color (list, optional): Color of players not assigned to a team
+                (unknown yet, or team assignment disabled).
+            cache_static_layer (bool, optional): Render the court image, keypoints and labels once
+                into a BGRA sprite composited on each frame, instead of drawing them on every frame.
+        """
         self.start_x = 20
         self.start_y = 40
         self.team_1_color = team_1_color
         self.team_2_color = team_2_color
+        self.unknown_team_color = unknown_team_color
+        self.alpha = 0.6  # Transparency factor of the court image
+        self.cache_static_layer = cache_static_layer
+        self._static_layer = None
 
     def draw(self, 
              video_frames, 
@@ -33,57 +50,160 @@ class TacticalViewDrawer:
         Returns:
             list: List of frames with tactical view drawn on them.
         """
-        court_image = cv2.imread(court_image_path)
-        court_image = cv2.resize(court_image, (width, height))
+        court_image = self.load_court_image(court_image_path, width, height)
 
         output_video_frames = []
         for frame_idx, frame in enumerate(video_frames):
-            frame = frame.copy()
-
-            y1 = self.start_y
-            y2 = self.start_y+height
-            x1 = self.start_x
-            x2 = self.start_x+width
-            
-            alpha = 0.6  # Transparency factor
-            overlay = frame[y1:y2, x1:x2].copy()
-            cv2.addWeighted(court_image, alpha, overlay, 1 - alpha, 0, frame[y1:y2, x1:x2])
-            
-            # Draw court keypoints
-            for keypoint_index, keypoint in enumerate(tactical_court_keypoints):
-                x, y = keypoint
-                x += self.start_x
-                y += self.start_y
-                cv2.circle(frame, (x, y), 5, (0, 0, 255), -1)
-                cv2.putText(frame, str(keypoint_index), (x, y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
-            
+            frame_positions, frame_assignments, player_with_ball = None, {}, -1
             # Draw player positions in tactical view if available
             if tactical_player_positions and player_assignment and frame_idx < len(tactical_player_positions):
                 frame_positions = tactical_player_positions[frame_idx]
                 frame_assignments = player_assignment[frame_idx] if frame_idx < len(player_assignment) else {}
                 player_with_ball = ball_acquisition[frame_idx] if ball_acquisition and frame_idx < len(ball_acquisition) else -1
-                
-                for player_id, position in frame_positions.items():
-                    # Get player's team
-                    team_id = frame_assignments.get(player_id, 1)  # Default to team 1 if not assigned
-                    
-                    # Set color based on team
-                    color = self.team_1_color if team_id == 1 else self.team_2_color
-                    
-                    # Adjust position to overlay coordinates
-                    x, y = int(position[0]) + self.start_x, int(position[1]) + self.start_y
-                    
-                    # Draw player circle
-                    player_radius = 8
-                    cv2.circle(frame, (x, y), player_radius, color, -1)
-                    
-                    # Add player ID
-                    #cv2.putText(frame, str(player_id), (x-4, y+4), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0, 0, 0), 1)
-                    
-                    # Highlight player with ball
-                    if player_id == player_with_ball:
-                        cv2.circle(frame, (x, y), player_radius+3, (0, 0, 255), 2)
-            
-            output_video_frames.append(frame)
 
-        return output_video_frames
\ No newline at end of file
+            output_video_frames.append(self.draw_frame(frame.copy(),
+                                                       court_image,
+                                                       tactical_court_keypoints,
+                                                       frame_positions,
+                                                       frame_assignments,
+                                                       player_with_ball))
+
+        return output_video_frames
+
+    def load_court_image(self, court_image_path, width, height):
+        """
+        Read the court image and resize it to the tactical view size.
+        """
+        court_image = cv2.imread(court_image_path)
+        return cv2.resize(court_image, (width, height))
+
+    def draw_frame(self,
+                   frame,
+                   court_image,
+                   tactical_court_keypoints,
+                   frame_positions=None,
+                   frame_assignments=None,
+                   player_with_ball=-1):
+        """
+        Draw the tactical view of one frame, in place.
+
+        Args:
+            frame (numpy.ndarray): Frame to draw on.
+            court_image (numpy.ndarray): Court image already resized to the tactical view size.
+            tactical_court_keypoints (list): Court keypoints in tactical view.
+            frame_positions (dict, optional): Player ID -> position in tactical view coordinates.
+            frame_assignments (dict, optional): Player ID -> team.
+            player_with_ball (int): Player with the ball (-1 if none).
+
+        Returns:
+            numpy.ndarray: The frame with the tactical view drawn on it.
+        """
+        if self.cache_static_layer:
+            self.get_static_layer(court_image, tactical_court_keypoints)
+            sprite_color, transparency, (sprite_x, sprite_y) = self._static_layer["planes"]
+            composite_premultiplied(frame, sprite_color, transparency, sprite_x, sprite_y)
+        else:
+            self.draw_static_layer(frame, court_image, tactical_court_keypoints)
+
+        if not frame_positions:
+            return frame
+
+        frame_assignments = frame_assignments or {}
+        for player_id, position in frame_positions.items():
+            # Get player's team
+            team_id = frame_assignments.get(player_id, -1)  # -1: team unknown
+
+            # Set color based on team (neutral color when unknown)
+            if team_id == 1:
+                color = self.team_1_color
+            elif team_id == 2:
+                color = self.team_2_color
+            else:
+                color = self.unknown_team_color
+
+            # Adjust position to overlay coordinates
+            x, y = int(position[0]) + self.start_x, int(position[1]) + self.start_y
+
+            # Draw player circle
+            player_radius = 8
+            cv2.circle(frame, (x, y), player_radius, color, -1)
+
+            # Highlight player with ball
+            if player_id == player_with_ball:
+                cv2.circle(frame, (x, y), player_radius+3, (0, 0, 255), 2)
+
+        return frame
+
+    def draw_keypoints(self, image, tactical_court_keypoints, offset_x, offset_y):
+        """
+        Draw the court keypoints and their labels, in place.
+        """
+        for keypoint_index, keypoint in enumerate(tactical_court_keypoints):
+            x, y = keypoint
+            x += offset_x
+            y += offset_y
+            cv2.circle(image, (x, y), 5, (0, 0, 255), -1)
+            cv2.putText(image, str(keypoint_index), (x, y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
+        return image
+
+    def draw_static_layer(self, frame, court_image, tactical_court_keypoints):
+        """
+        Draw the court image blend, keypoints and labels directly on the frame, in place.
+        """
+        height, width = court_image.shape[:2]
+        y1 = self.start_y
+        y2 = self.start_y+height
+        x1 = self.start_x
+        x2 = self.start_x+width
+
+        overlay = frame[y1:y2, x1:x2].copy()
+        cv2.addWeighted(court_image, self.alpha, overlay, 1 - self.alpha, 0, frame[y1:y2, x1:x2])
+
+        return self.draw_keypoints(frame, tactical_court_keypoints, self.start_x, self.start_y)
+
+    def get_static_layer(self, court_image, tactical_court_keypoints):
+        """
+        Return the static part of the tactical view (court image, keypoints and labels)
+        as a premultiplied BGRA sprite and its top-left position in the frame, rendered
+        on first use.
+
+        The static layer is drawn once over a black and once over a white background:
+        the black rendering is the premultiplied color and the difference between the
+        two gives the transparency of every pixel (court blend, opaque keypoints,
+        antialiased label edges), so compositing the sprite gives the same pixels as
+        drawing the layer on the frame.
+        """
+        # The drawer is called with the same court image and keypoints on every frame.
+        if self._static_layer is not None and self._static_layer["court_image"] is court_image \
+                and self._static_layer["keypoints"] is tactical_court_keypoints:
+            return self._static_layer["sprite"], self._static_layer["position"]
+
+        height, width = court_image.shape[:2]
+        # Enough room for the keypoint circles and the labels drawn around the court border.
+        margin = 30
+        sprite_x, sprite_y = max(0, self.start_x - margin), max(0, self.start_y - margin)
+        canvas_shape = (self.start_y + height + margin, self.start_x + width + margin, 3)
+
+        on_black = self.draw_static_layer(np.zeros(canvas_shape, dtype=np.uint8),
+                                          court_image, tactical_court_keypoints)
+        on_white = self.draw_static_layer(np.full(canvas_shape, 255, dtype=np.uint8),
+                                          court_image, tactical_court_keypoints)
+        on_black = on_black[sprite_y:, sprite_x:]
+        on_white = on_white[sprite_y:, sprite_x:]
+
+        transparency = (on_white.astype(np.int16) - on_black).mean(axis=2)
+        alpha = np.clip(255 - np.rint(transparency), 0, 255).astype(np.uint8)
+        # Crop to the pixels the static layer actually covers.
+        rows, cols = np.nonzero(alpha.any(axis=1))[0], np.nonzero(alpha.any(axis=0))[0]
+        top, bottom, left, right = rows[0], rows[-1] + 1, cols[0], cols[-1] + 1
+        sprite = np.dstack([on_black, alpha])[top:bottom, left:right]
+        sprite_x, sprite_y = sprite_x + int(left), sprite_y + int(top)
+
+        self._static_layer = {
+            "court_image": court_image,
+            "keypoints": tactical_court_keypoints,
+            "sprite": sprite,
+            "position": (sprite_x, sprite_y),
+            "planes": split_premultiplied(sprite) + ((sprite_x, sprite_y),),
+        }
+        return sprite, (sprite_x, sprite_y)
@@ -2,6 +2,9 @@ import cv2
 import numpy as np
 from typing import List, Dict, Tuple, Optional
 
+from src.draws.utils import blend_rect
+from src.stats import BallControlStats
+
 class TeamBallControlDrawer:
     """
     Classe pour calculer et afficher les statistiques de contrôle de balle par équipe sur des frames vidéo.
@@ -13,12 +16,19 @@ class TeamBallControlDrawer:
                  font_scale: float = 0.8,
                  font_thickness: int = 2,
                  text_color: tuple = (255, 255, 255),
-                 team_colors: Optional[Dict[int, Tuple[int, int, int]]] = None):
+                 team_colors: Optional[Dict[int, Tuple[int, int, int]]] = None,
+                 rolling_window: Optional[int] = None):
+        """
+        Args:
+            rolling_window: Si défini, les pourcentages portent sur les rolling_window
+                dernières frames (ex. 2 minutes * fps) au lieu de tout le match.
+        """
         self.overlay_alpha = overlay_alpha
         self.overlay_color = overlay_color
         self.font_scale = font_scale
         self.font_thickness = font_thickness
         self.text_color = text_color
+        self.rolling_window = rolling_window
 
         # Couleurs par équipe : dict {team_id: (B,G,R)}
         if team_colors is None:
@@ -60,33 +70,47 @@ class TeamBallControlDrawer:
                     team_ball_control.append(-1)
         return np.array(team_ball_control, dtype=np.int8)
 
+    def get_ball_control_stats(
+        self,
+        player_assignment: List[Dict[int, int]],
+        ball_acquisition: List[int]
+    ) -> BallControlStats:
+        """
+        Construit les compteurs cumulés de contrôle de balle de toute la vidéo.
+        """
+        return BallControlStats.from_team_ball_control(
+            self.get_team_ball_control(player_assignment, ball_acquisition))
+
     def draw(
         self,
         video_frames: List[np.ndarray],
         player_assignment: List[Dict[int, int]],
-        ball_acquisition: List[int]
+        ball_acquisition: List[int],
+        start_frame: int = 0
     ) -> List[np.ndarray]:
         """
         Dessine les statistiques de contrôle de balle sur chaque frame.
 
         Args:
             video_frames: Liste de frames (ndarray) sur lesquelles dessiner.
-            player_assignment: Liste de dicts {player_id: team_id} par frame.
-            ball_acquisition: Liste des player_id en possession par frame.
+            player_assignment: Liste de dicts {player_id: team_id} par frame (vidéo complète).
+            ball_acquisition: Liste des player_id en possession par frame (vidéo complète).
+            start_frame: Index global de la première frame de video_frames, pour dessiner
+                une fenêtre de la vidéo en mode streaming.
 
         Returns:
             Liste de frames avec dessin superposé.
         """
-        team_ball_control = self.get_team_ball_control(player_assignment, ball_acquisition)
+        ball_control_stats = self.get_ball_control_stats(player_assignment, ball_acquisition)
 
         output_frames = []
-        total_frames = len(team_ball_control)
-        for i, frame in enumerate(video_frames):
+        total_frames = len(ball_control_stats)
+        for i, frame in enumerate(video_frames, start=start_frame):
             # Protection si moins de frames que prévu
             if i >= total_frames:
                 output_frames.append(frame)
                 continue
-            frame_drawn = self.draw_frame(frame.copy(), i, team_ball_control)
+            frame_drawn = self.draw_frame(frame.copy(), i, ball_control_stats)
             output_frames.append(frame_drawn)
         return output_frames
 
@@ -94,12 +118,14 @@ class TeamBallControlDrawer:
         self,
         frame: np.ndarray,
         frame_num: int,
-        team_ball_control: np.ndarray
+        ball_control_stats: BallControlStats
     ) -> np.ndarray:
         """
         Dessine un overlay avec un fond sombre semi-transparent, texte et barres colorées de contrôle de balle.
+
+        Les pourcentages sont lus dans les compteurs cumulés de ball_control_stats,
+        en temps constant quelle que soit la position dans la vidéo.
         """
-        overlay = frame.copy()
         h, w = frame.shape[:2]
 
         # Rectangle semi-transparent foncé
@@ -111,18 +137,12 @@ class TeamBallControlDrawer:
         rect_height = rect_y2 - rect_y1
 
         # Fond noir transparent
-        cv2.rectangle(overlay, (rect_x1, rect_y1), (rect_x2, rect_y2), self.overlay_color, -1)
-        cv2.addWeighted(overlay, self.overlay_alpha, frame, 1 - self.overlay_alpha, 0, frame)
+        blend_rect(frame, (rect_x1, rect_y1), (rect_x2, rect_y2), self.overlay_color, self.overlay_alpha)
 
         # Calcul des stats
-        ball_control_slice = team_ball_control[:frame_num + 1]
-        total = ball_control_slice.shape[0]
-        if total == 0:
-            team1_pct = 0.0
-            team2_pct = 0.0
-        else:
-            team1_pct = np.sum(ball_control_slice == 1) / total * 100
-            team2_pct = np.sum(ball_control_slice == 2) / total * 100
+        percentages = ball_control_stats.percentages(frame_num, window=self.rolling_window)
+        team1_pct = percentages.get(1, 0.0)
+        team2_pct = percentages.get(2, 0.0)
 
         # Positions pour les barres et textes
         bar_x = rect_x1 + int(rect_width * 0.25)
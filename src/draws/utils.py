@@ -86,4 +86,93 @@ def draw_ellipse(frame,bbox,color,track_id=None):
             2
         )
 
-    return frame
\ No newline at end of file
+    return frame
+
+
+def blend_rect(frame, top_left, bottom_right, color, alpha):
+    """
+    Blends a filled rectangle into the frame, in place, touching only the rectangle's pixels.
+
+    Equivalent to drawing the filled rectangle on a full copy of the frame and
+    blending the copy with cv2.addWeighted, without copying the whole frame.
+
+    Args:
+        frame (numpy.ndarray): The frame on which to draw.
+        top_left (tuple): (x1, y1) corner of the rectangle.
+        bottom_right (tuple): (x2, y2) corner of the rectangle (inclusive, as cv2.rectangle).
+        color (tuple): The color of the rectangle in BGR format.
+        alpha (float): Opacity of the rectangle.
+
+    Returns:
+        numpy.ndarray: The frame with the rectangle blended on it.
+    """
+    h, w = frame.shape[:2]
+    x1, y1 = max(0, int(top_left[0])), max(0, int(top_left[1]))
+    x2, y2 = min(w - 1, int(bottom_right[0])), min(h - 1, int(bottom_right[1]))
+    if x2 < x1 or y2 < y1:
+        return frame
+
+    roi = frame[y1:y2 + 1, x1:x2 + 1]
+    solid = np.empty_like(roi)
+    solid[:] = color
+    roi[:] = cv2.addWeighted(solid, alpha, roi, 1 - alpha, 0)
+    return frame
+
+
+def split_premultiplied(sprite):
+    """
+    Splits a premultiplied BGRA sprite into its BGR color and its 3-channel
+    transparency (255 - alpha), the operands of composite_premultiplied.
+    """
+    color = np.ascontiguousarray(sprite[:, :, :3])
+    transparency = cv2.cvtColor(np.ascontiguousarray(255 - sprite[:, :, 3]), cv2.COLOR_GRAY2BGR)
+    return color, transparency
+
+
+def composite_premultiplied(frame, color, transparency, x, y):
+    """
+    Composites a premultiplied sprite, split with split_premultiplied, into the frame,
+    in place, with its top-left corner at (x, y).
+
+    A pixel becomes color + frame * transparency / 255. Only the region covered by
+    the sprite is touched; the parts of the sprite outside the frame are skipped.
+
+    Returns:
+        numpy.ndarray: The frame with the sprite composited on it.
+    """
+    h, w = frame.shape[:2]
+    fx1, fy1 = max(0, x), max(0, y)
+    fx2, fy2 = min(w, x + color.shape[1]), min(h, y + color.shape[0])
+    if fx2 <= fx1 or fy2 <= fy1:
+        return frame
+
+    if (fx1, fy1, fx2, fy2) != (x, y, x + color.shape[1], y + color.shape[0]):
+        color = color[fy1 - y:fy2 - y, fx1 - x:fx2 - x]
+        transparency = transparency[fy1 - y:fy2 - y, fx1 - x:fx2 - x]
+
+    roi = frame[fy1:fy2, fx1:fx2]
+    # Rounded and saturated by OpenCV.
+    blended = cv2.multiply(roi, transparency, scale=1 / 255)
+    roi[:] = cv2.add(blended, color)
+    return frame
+
+
+def alpha_composite(frame, sprite, x, y):
+    """
+    Composites a premultiplied BGRA sprite into the frame, in place, with its top-left corner at (x, y).
+
+    The sprite color is already multiplied by its alpha, so a pixel becomes
+    sprite + frame * (255 - alpha) / 255. To composite the same sprite on many
+    frames, split it once with split_premultiplied and use composite_premultiplied.
+
+    Args:
+        frame (numpy.ndarray): The BGR frame on which to draw.
+        sprite (numpy.ndarray): The premultiplied BGRA sprite (alpha 0 transparent, 255 opaque).
+        x (int): Horizontal position of the sprite in the frame.
+        y (int): Vertical position of the sprite in the frame.
+
+    Returns:
+        numpy.ndarray: The frame with the sprite composited on it.
+    """
+    color, transparency = split_premultiplied(sprite)
+    return composite_premultiplied(frame, color, transparency, x, y)
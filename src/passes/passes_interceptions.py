@@ -1,15 +1,55 @@
-from copy import deepcopy
+from src.stats.possession import PossessionSegments
 
 class PassAndInterceptionDetector():
     """
     A class that detects passes between teammates and interceptions by opposing teams.
+
+    detect_passes and detect_interceptions both read the result of detect_events,
+    which keeps its last result: calling both on the same ball_acquisition and
+    player_assignment objects computes the events once.
     """
     def __init__(self):
-        pass 
+        self._last_events = None
+        self.reset()
+
+    def reset(self):
+        """
+        Forget the last ball holder carried over between frames by update().
+        """
+        self._prev_holder = -1
+        self._prev_team = -1
+
+    def detect_events(self, ball_acquisition, player_assignment):
+        """
+        Detects passes, interceptions and turnovers in a single pass: possession is
+        run-length encoded into segments once (see PossessionSegments) and every
+        event type is derived from the segment boundaries.
+
+        Args:
+            ball_acquisition (list): A list indicating which player has possession of the ball in each frame.
+            player_assignment (list): A list of dictionaries indicating team assignments for each player
+                in the corresponding frame.
+
+        Returns:
+            dict: "segments" (PossessionSegments) and the per-frame lists "passes",
+                "interceptions" and "turnovers" (-1: no event, otherwise the team id).
+        """
+        # Same input objects as the previous call (e.g. detect_passes then
+        # detect_interceptions): reuse its result. The inputs are compared by
+        # identity, so they must not be modified in place between calls.
+        if (self._last_events is not None and self._last_events[0] is ball_acquisition
+                and self._last_events[1] is player_assignment):
+            return self._last_events[2]
+
+        segments = PossessionSegments.from_ball_acquisition(ball_acquisition, player_assignment)
+        events = dict(segments.events(), segments=segments)
+        self._last_events = (ball_acquisition, player_assignment, events)
+        return events
 
     def detect_passes(self,ball_acquisition,player_assignment):
         """
-        Detects successful passes between players of the same team.
+        Detects successful passes between players of the same team (the "passes"
+        of detect_events, computed once for both wrappers).
 
         Args:
             ball_acquisition (list): A list indicating which player has possession of the ball in each frame.
@@ -20,30 +60,12 @@ class PassAndInterceptionDetector():
             list: A list where each element indicates if a pass occurred in that frame
                 (-1: no pass, 1: Team 1 pass, 2: Team 2 pass).
         """
-        
-        passes = [-1] * len(ball_acquisition)
-        prev_holder=-1
-        previous_frame=-1
-
-        for frame in range(1, len(ball_acquisition)):
-            if ball_acquisition[frame - 1] != -1:
-                prev_holder = ball_acquisition[frame - 1]
-                previous_frame= frame - 1
-            
-            current_holder = ball_acquisition[frame]
-            
-            if prev_holder != -1 and current_holder != -1 and prev_holder != current_holder:
-                prev_team = player_assignment[previous_frame].get(prev_holder, -1)
-                current_team = player_assignment[frame].get(current_holder, -1)
-
-                if prev_team == current_team and prev_team != -1:
-                    passes[frame] = prev_team
-
-        return passes
+        return self.detect_events(ball_acquisition, player_assignment)["passes"]
 
     def detect_interceptions(self,ball_acquisition,player_assignment):
         """
-        Detects interceptions where the ball possession changes between opposing teams.
+        Detects interceptions where the ball possession changes between opposing teams
+        (the "interceptions" of detect_events, computed once for both wrappers).
 
         Args:
             ball_acquisition (list): A list indicating which player has possession of the ball in each frame.
@@ -54,22 +76,35 @@ class PassAndInterceptionDetector():
             list: A list where each element indicates if an interception occurred in that frame
                 (-1: no interception, 1: Team 1 interception, 2: Team 2 interception).
         """
-        interceptions = [-1] * len(ball_acquisition)
-        prev_holder=-1
-        previous_frame=-1
-        
-        for frame in range(1, len(ball_acquisition)):
-            if ball_acquisition[frame - 1] != -1:
-                prev_holder = ball_acquisition[frame - 1]
-                previous_frame= frame - 1
-
-            current_holder = ball_acquisition[frame]
-            
-            if prev_holder != -1 and current_holder != -1 and prev_holder != current_holder:
-                prev_team = player_assignment[previous_frame].get(prev_holder, -1)
-                current_team = player_assignment[frame].get(current_holder, -1)
-                
-                if prev_team != current_team and prev_team != -1 and current_team != -1:
-                    interceptions[frame] = current_team
-        
-        return interceptions
\ No newline at end of file
+        return self.detect_events(ball_acquisition, player_assignment)["interceptions"]
+
+    def update(self, current_holder, frame_assignment):
+        """
+        Online counterpart of detect_passes and detect_interceptions: process the
+        next frame and return its events. Only the last ball holder and its team
+        are kept between frames.
+
+        Args:
+            current_holder (int): The player who has possession in the frame (-1 if none).
+            frame_assignment (dict): Team assignments of the players of the frame.
+
+        Returns:
+            tuple: (pass, interception) of the frame, each -1 for none or the team id.
+        """
+        pass_team = -1
+        interception_team = -1
+        prev_holder, prev_team = self._prev_holder, self._prev_team
+
+        if prev_holder != -1 and current_holder != -1 and prev_holder != current_holder:
+            current_team = frame_assignment.get(current_holder, -1)
+
+            if prev_team == current_team and prev_team != -1:
+                pass_team = prev_team
+            if prev_team != current_team and prev_team != -1 and current_team != -1:
+                interception_team = current_team
+
+        if current_holder != -1:
+            self._prev_holder = current_holder
+            self._prev_team = frame_assignment.get(current_holder, -1)
+
+        return pass_team, interception_team
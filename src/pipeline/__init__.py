@@ -0,0 +1 @@
+from src.pipeline.pipeline import run_pipeline
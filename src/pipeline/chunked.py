@@ -0,0 +1,308 @@
+import os
+import shutil
+import logging
+import tempfile
+import subprocess
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+from src.utils import iter_video, get_video_properties, prefetch, iou_matrix, VideoSink, StageCache, TrackTable
+from src.pipeline.pipeline import (TrackingStages, DEFAULT_TEAM_COLORS, PLAYER_TRACKER_PARAMS, BALL_TRACKER_PARAMS,
+                                   TEAM_ASSIGNER_PARAMS, IO_QUEUE_SIZE, PIPELINE_STAGES, validate_stages,
+                                   export_analytics, _track_windows, _run_analytics, _build_renderer)
+
+logger = logging.getLogger(__name__)
+
+
+def plan_chunks(n_frames, chunk_size, overlap):
+    """
+    Split a video into consecutive chunks processed independently.
+
+    Each chunk owns the frames start..end-1 and is tracked from warmup_start =
+    start - overlap: the overlap frames are owned by the previous chunk, they warm
+    up the chunk's trackers and are used to stitch its track IDs to the previous
+    chunk's.
+
+    Returns:
+        list: (warmup_start, start, end) per chunk.
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be a positive integer.")
+    if not 0 <= overlap < chunk_size:
+        raise ValueError("overlap must be in [0, chunk_size).")
+
+    return [(max(0, start - overlap), start, min(start + chunk_size, n_frames))
+            for start in range(0, n_frames, chunk_size)]
+
+
+def _init_worker(threads):
+    # Each process runs its own models: limit their threads so that the
+    # processes share the cores instead of oversubscribing them.
+    cv2.setNumThreads(threads)
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+
+def _track_chunk(video_path, model_path, court_model_path, warmup_start, end, window_size,
+                 enabled_stages=PIPELINE_STAGES):
+    stages = TrackingStages(model_path, court_model_path)
+    frames = prefetch(iter_video(video_path, start=warmup_start, end=end), IO_QUEUE_SIZE)
+    return _track_windows(stages, frames, window_size, first_frame=warmup_start, enabled_stages=enabled_stages)
+
+
+def _render_chunk(video_path, part_path, start, end, fps, team_colors, analytics):
+    renderer = _build_renderer(team_colors, analytics)
+    with VideoSink(part_path, fps=fps) as sink:
+        sink.write_frames(renderer.render(prefetch(iter_video(video_path, start=start, end=end), IO_QUEUE_SIZE),
+                                          start_frame=start))
+    return part_path
+
+
+def match_tracks(previous, current, n_overlap, iou_threshold=0.5, min_matches=None):
+    """
+    Match the track IDs of a chunk to those of the previous chunk over their overlap.
+
+    Args:
+        previous (TrackTable): Player tracks of the previous chunk, whose last
+            n_overlap frames are the overlap.
+        current (TrackTable): Player tracks of the chunk, whose first n_overlap
+            frames are the overlap.
+        n_overlap (int): Number of overlap frames.
+        iou_threshold (float): IoU above which two boxes of an overlap frame match.
+        min_matches (int, optional): Number of matching frames needed to link two
+            tracks (a quarter of the overlap by default).
+
+    Returns:
+        dict: current track_id -> previous track_id, for the linked tracks.
+    """
+    if min_matches is None:
+        min_matches = max(1, n_overlap // 4)
+
+    # Number of overlap frames in which each pair of tracks matches.
+    votes = Counter()
+    previous_offset = previous.n_frames - n_overlap
+    for frame_num in range(n_overlap):
+        lo, hi = previous.offsets[previous_offset + frame_num], previous.offsets[previous_offset + frame_num + 1]
+        previous_ids, previous_boxes = previous.columns["track_id"][lo:hi], previous.bboxes[lo:hi]
+        lo, hi = current.offsets[frame_num], current.offsets[frame_num + 1]
+        current_ids, current_boxes = current.columns["track_id"][lo:hi], current.bboxes[lo:hi]
+        if len(previous_ids) == 0 or len(current_ids) == 0:
+            continue
+
+        ious = iou_matrix(previous_boxes, current_boxes)
+        for i, j in zip(*np.nonzero(ious >= iou_threshold)):
+            votes[int(current_ids[j]), int(previous_ids[i])] += 1
+
+    # Greedy one-to-one assignment, most consistent pairs first.
+    mapping, linked = {}, set()
+    for (current_id, previous_id), count in votes.most_common():
+        if count < min_matches:
+            break
+        if current_id in mapping or previous_id in linked:
+            continue
+        mapping[current_id] = previous_id
+        linked.add(previous_id)
+    return mapping
+
+
+def stitch_chunks(chunk_results, chunks):
+    """
+    Join the tracking results of consecutive chunks into whole-video results.
+
+    Track IDs of each chunk are linked to the previous chunk's through their
+    overlap (match_tracks); unlinked tracks get new IDs. The overlap frames are
+    kept from the previous chunk. Each track then gets the majority team of all
+    its frames, since chunks classify teams independently.
+
+    Args:
+        chunk_results (list): (player TrackTable, ball TrackTable, court keypoints) per chunk,
+            covering the frames warmup_start..end-1 of the chunk.
+        chunks (list): (warmup_start, start, end) per chunk, from plan_chunks.
+
+    Returns:
+        tuple: (player TrackTable, ball TrackTable, court keypoints) of the whole video.
+    """
+    player_tables, ball_tables, court_keypoints = [], [], []
+    previous = None
+    next_id = 0
+    for (player_table, ball_table, keypoints), (warmup_start, start, _) in zip(chunk_results, chunks):
+        n_overlap = min(start - warmup_start, player_table.n_frames)
+        mapping = {}
+        if previous is not None:
+            n_overlap = min(n_overlap, previous.n_frames)
+            mapping = match_tracks(previous, player_table, n_overlap) if n_overlap else {}
+
+        track_ids = np.asarray(player_table.columns["track_id"])
+        unique_ids, inverse = np.unique(track_ids, return_inverse=True)
+        global_ids = []
+        for track_id in unique_ids.tolist():
+            if track_id not in mapping:
+                mapping[track_id] = next_id
+                next_id += 1
+            global_ids.append(mapping[track_id])
+
+        columns = dict(player_table.columns,
+                       track_id=np.asarray(global_ids, dtype=track_ids.dtype)[inverse].reshape(track_ids.shape))
+        player_table = TrackTable(columns, player_table.n_frames,
+                                  str_ids=player_table.str_ids, int_bboxes=player_table.int_bboxes)
+
+        owned = player_table.frame_slice(n_overlap, player_table.n_frames)
+        player_tables.append(owned)
+        ball_tables.append(ball_table.frame_slice(n_overlap, ball_table.n_frames))
+        court_keypoints += keypoints[n_overlap:]
+        # Chunks own more frames than the overlap, so the next overlap lies in this chunk.
+        previous = owned
+
+    player_table = TrackTable.concatenate(player_tables)
+    return vote_teams(player_table), TrackTable.concatenate(ball_tables), court_keypoints
+
+
+def vote_teams(table):
+    """
+    Give every track the majority team of its rows (ties go to team 1). Tracks
+    without any team (e.g. teams stage disabled) keep -1.
+    """
+    track_ids = np.asarray(table.columns["track_id"])
+    teams = np.asarray(table.columns["team"])
+    unique_ids, inverse = np.unique(track_ids, return_inverse=True)
+    inverse = inverse.reshape(track_ids.shape)
+
+    team_1_votes = np.bincount(inverse, weights=teams == 1, minlength=len(unique_ids))
+    team_2_votes = np.bincount(inverse, weights=teams == 2, minlength=len(unique_ids))
+    track_team = np.where(team_2_votes > team_1_votes, 2, 1)
+    track_team = np.where(team_1_votes + team_2_votes > 0, track_team, -1).astype(teams.dtype)
+
+    columns = dict(table.columns, team=track_team[inverse])
+    return TrackTable(columns, table.n_frames, str_ids=table.str_ids, int_bboxes=table.int_bboxes)
+
+
+def concat_videos(part_paths, output_path, fps):
+    """
+    Concatenate video files with ffmpeg's concat demuxer (no re-encoding) when
+    ffmpeg is installed, otherwise by decoding and re-encoding them with OpenCV.
+    """
+    if shutil.which("ffmpeg"):
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as list_file:
+            for part_path in part_paths:
+                list_file.write(f"file '{os.path.abspath(part_path)}'\n")
+        try:
+            subprocess.run(["ffmpeg", "-y", "-loglevel", "error", "-f", "concat", "-safe", "0",
+                            "-i", list_file.name, "-c", "copy", output_path], check=True)
+            return output_path
+        except subprocess.CalledProcessError as e:
+            logger.warning(f"ffmpeg concat failed ({e}), re-encoding with OpenCV.")
+        finally:
+            os.remove(list_file.name)
+
+    with VideoSink(output_path, fps=fps) as sink:
+        for part_path in part_paths:
+            sink.write_frames(iter_video(part_path))
+    return output_path
+
+
+def run_chunked(video_path,
+                output_path,
+                model_path="models/players_detection_model.pt",
+                court_model_path="models/court_keypoints.pt",
+                court_image_path="data/basketball_court.png",
+                team_colors=None,
+                chunk_size=1500,
+                overlap=30,
+                window_size=200,
+                workers=None,
+                use_cache=True,
+                cache_dir="cache/stages",
+                enabled_stages=None,
+                render=True,
+                analytics_path=None):
+    """
+    Run the pipeline on a long video split into chunks processed in parallel.
+
+    The video is split into overlapping chunks (plan_chunks). Detection, tracking,
+    team classification and court keypoints run per chunk in a process pool, each
+    chunk streamed window by window. Chunk results are stitched into whole-video
+    tracks (stitch_chunks), the analytics run once on the whole video, then each
+    chunk is rendered in the pool and the rendered parts are concatenated.
+
+    Each worker process loads its own models, so memory grows with workers.
+    Player and ball trails restart at each chunk boundary when rendering.
+
+    Args:
+        video_path (str): Input video path.
+        output_path (str): Annotated output video path.
+        model_path (str): Path to the players/ball YOLO weights.
+        court_model_path (str): Path to the court keypoints YOLO weights.
+        court_image_path (str): Path to the tactical court image.
+        team_colors (dict, optional): {team_id: BGR color} used by the drawers.
+        chunk_size (int): Number of frames owned by each chunk.
+        overlap (int): Number of frames shared by consecutive chunks, used to stitch track IDs.
+        window_size (int): Number of frames held in memory per worker.
+        workers (int, optional): Number of processes (all cores by default).
+        use_cache (bool): Whether to read/write chunk results from the cache.
+        cache_dir (str): Directory of the stage cache.
+        enabled_stages (iterable, optional): Stages to run, among PIPELINE_STAGES (all by default).
+        render (bool): Whether to render and write the annotated video.
+        analytics_path (str, optional): JSON file the analytics are exported to.
+
+    Returns:
+        str: The output video path (the analytics path when render is False).
+    """
+    enabled_stages = validate_stages(enabled_stages)
+    team_colors = team_colors or DEFAULT_TEAM_COLORS
+    workers = workers or os.cpu_count() or 1
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    cache = StageCache(cache_dir) if use_cache else None
+
+    fps, n_frames, _, _ = get_video_properties(video_path)
+    chunks = plan_chunks(n_frames, chunk_size, overlap)
+    logger.info(f"Processing {n_frames} frames in {len(chunks)} chunks with {workers} workers")
+
+    def chunk_key(warmup_start, end):
+        return cache.make_key("chunk_tracking",
+                              video_path=video_path,
+                              model_paths=[model_path, court_model_path],
+                              params={"warmup_start": warmup_start,
+                                      "end": end,
+                                      "window_size": window_size,
+                                      "stages": list(enabled_stages),
+                                      "player_tracker": PLAYER_TRACKER_PARAMS,
+                                      "ball_tracker": BALL_TRACKER_PARAMS,
+                                      "team_assigner": TEAM_ASSIGNER_PARAMS})
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(threads,)) as pool:
+        chunk_results, futures = [], {}
+        for index, (warmup_start, _, end) in enumerate(chunks):
+            result = cache.get(chunk_key(warmup_start, end)) if cache is not None else None
+            if result is None:
+                futures[index] = pool.submit(_track_chunk, video_path, model_path, court_model_path,
+                                             warmup_start, end, window_size, enabled_stages)
+            chunk_results.append(result)
+
+        for index, future in futures.items():
+            chunk_results[index] = future.result()
+            if cache is not None:
+                warmup_start, _, end = chunks[index]
+                cache.set(chunk_key(warmup_start, end), chunk_results[index])
+
+        player_table, ball_table, court_keypoints = stitch_chunks(chunk_results, chunks)
+        analytics = _run_analytics(player_table, ball_table.to_tracks(),
+                                   player_table.teams_view(), court_keypoints,
+                                   court_image_path, fps=fps, enabled_stages=enabled_stages)
+        if analytics_path is not None:
+            export_analytics(analytics, analytics_path)
+        if not render:
+            return analytics_path
+
+        with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(output_path))) as parts_dir:
+            part_futures = [pool.submit(_render_chunk, video_path, os.path.join(parts_dir, f"part_{index:05d}.mp4"),
+                                        start, end, fps, team_colors, analytics)
+                            for index, (_, start, end) in enumerate(chunks)]
+            concat_videos([future.result() for future in part_futures], output_path, fps)
+
+    return output_path
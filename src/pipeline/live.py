@@ -0,0 +1,269 @@
+import os
+import json
+import time
+import logging
+from collections import deque, Counter
+
+import cv2
+
+from src.utils import BackgroundVideoSink
+from src.stats import OnlineBallControlStats
+from src.tracks.ball_tracker import OnlineBallSmoother, KalmanBallSmoother
+from src.ball_aquisition.ball_aquisition_detector import BallAquisitionDetector
+from src.passes.passes_interceptions import PassAndInterceptionDetector
+from src.tactic_view.tactic_view_converter import TacticalViewConverter
+from src.speed_and_distance_calculator import SpeedAndDistanceCalculator
+from src.draws.draw_player import PlayerTracksDrawer
+from src.draws.ball_track_dar import BallTracksDrawer
+from src.draws.tactic_viewer_drawer import TacticalViewDrawer
+from src.draws.teams_ball_pos_draw import TeamBallControlDrawer
+from src.draws.passes_interceptions_draw import PassInterceptionDrawer
+from src.pipeline.pipeline import TrackingStages, DEFAULT_TEAM_COLORS, IO_QUEUE_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+def iter_live_frames(source, realtime=True, max_frames=None):
+    """
+    Read frames from a live source: a camera index, a stream URL (e.g. RTSP) or
+    a video file.
+
+    A video file is replayed at its real-time rate when realtime is True: frames
+    are not read before they are due and, when processing falls behind, the late
+    frames are skipped, as they would be lost on a live source.
+
+    Args:
+        source (int or str): Camera index, stream URL or video path.
+        realtime (bool): Pace a video file to its frame rate.
+        max_frames (int, optional): Stop after this many source frames.
+
+    Yields:
+        tuple: (frame_num, frame, capture_time) with frame_num the index of the frame
+        in the source and capture_time its perf_counter() read time.
+    """
+    cap = cv2.VideoCapture(source)
+    if not cap.isOpened():
+        raise IOError(f"Cannot open video source: {source}")
+
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30
+    replay = realtime and isinstance(source, str) and os.path.isfile(source)
+    start_time = time.perf_counter()
+    frame_num = 0
+    try:
+        while max_frames is None or frame_num < max_frames:
+            if replay:
+                lag = time.perf_counter() - start_time - frame_num / fps
+                if lag < 0:
+                    time.sleep(-lag)
+                elif lag >= 1 / fps:
+                    # Drop the frames that a live source would already have replaced.
+                    for _ in range(int(lag * fps)):
+                        if not cap.grab():
+                            return
+                        frame_num += 1
+
+            ret, frame = cap.read()
+            if not ret:
+                break
+            yield frame_num, frame, time.perf_counter()
+            frame_num += 1
+    finally:
+        cap.release()
+
+
+class LivePipeline:
+    """
+    Frame-by-frame pipeline with bounded state and constant latency.
+
+    Each frame is detected and tracked as soon as it is received. The analytics
+    (ball smoothing, possession, passes and interceptions, tactical positions,
+    speed and distance, ball control) are online components updated once per
+    frame. Ball gap filling looks lookahead frames ahead, so the analytics and
+    the rendered frame of frame t are produced when frame t + lookahead is
+    received; only those lookahead frames are buffered.
+    """
+
+    def __init__(self,
+                 model_path="models/players_detection_model.pt",
+                 court_model_path="models/court_keypoints.pt",
+                 court_image_path="data/basketball_court.png",
+                 team_colors=None,
+                 fps=30,
+                 lookahead=10,
+                 kalman_ball=False,
+                 rolling_window=None,
+                 render=True):
+        """
+        Args:
+            rolling_window (int, optional): Also compute the ball control percentages
+                of the last rolling_window frames (drawn instead of the cumulative
+                ones when rendering).
+        """
+        team_colors = team_colors or DEFAULT_TEAM_COLORS
+        self.fps = fps
+        self.render = render
+        self.stages = TrackingStages(model_path, court_model_path)
+        # Forget the team votes of tracks lost for 10 s: DeepSort creates new IDs all game long.
+        self.stages.team_assigner.forget_after = int(fps * 10)
+
+        # The Kalman smoother also filters the detector jitter and follows the
+        # ball's velocity through gaps longer than the look-ahead.
+        smoother_class = KalmanBallSmoother if kalman_ball else OnlineBallSmoother
+        self.ball_smoother = smoother_class(max_distance=25, lookahead=lookahead)
+        self.possession_detector = BallAquisitionDetector()
+        self.event_detector = PassAndInterceptionDetector()
+        self.tactical_view_converter = TacticalViewConverter(court_image_path=court_image_path)
+        self.speed_calculator = SpeedAndDistanceCalculator(self.tactical_view_converter.width,
+                                                           self.tactical_view_converter.height,
+                                                           self.tactical_view_converter.actual_width_in_meters,
+                                                           self.tactical_view_converter.actual_height_in_meters,
+                                                           forget_after=int(fps * 10))
+        self.ball_control = OnlineBallControlStats(rolling_window=rolling_window)
+        self.passes = Counter()
+        self.interceptions = Counter()
+
+        self.player_drawer = PlayerTracksDrawer(team_1_color=team_colors[1], team_2_color=team_colors[2])
+        self.ball_drawer = BallTracksDrawer()
+        self.tactical_view_drawer = TacticalViewDrawer(team_1_color=team_colors[1], team_2_color=team_colors[2])
+        self.ball_control_drawer = TeamBallControlDrawer(team_colors=team_colors, rolling_window=rolling_window)
+        self.pass_interception_drawer = PassInterceptionDrawer(team_colors=team_colors)
+        self.court_image = self.tactical_view_drawer.load_court_image(court_image_path,
+                                                                      self.tactical_view_converter.width,
+                                                                      self.tactical_view_converter.height)
+
+        # Frames waiting for their smoothed ball position: at most lookahead + 1.
+        self._pending = deque()
+
+    def process(self, frame_num, frame, capture_time=None):
+        """
+        Process the next frame of the stream.
+
+        Args:
+            frame_num (int): Index of the frame in the source.
+            frame (numpy.ndarray): The frame.
+            capture_time (float, optional): perf_counter() time the frame was read,
+                used to report the latency.
+
+        Returns:
+            dict or None: The result of the frame received lookahead frames earlier
+            (see _analyze), or None while the first frames are buffered.
+        """
+        frames = [frame]
+        player_tracks = self.stages.player_tracker.track_players(frames=frames)[0]
+        player_teams = self.stages.team_assigner.get_player_teams_across_frames(
+            video_frames=frames, player_tracks=[player_tracks])[0]
+        ball_tracks = self.stages.ball_tracker.get_object_tracks(frames=frames)[0]
+        court_keypoints = self.stages.court_keypoint_detector.detect_keypoints(frames=frames)[0]
+
+        self._pending.append((frame_num, frame, capture_time, player_tracks, player_teams, court_keypoints))
+        smoothed = self.ball_smoother.update(ball_tracks)
+        if smoothed is None:
+            return None
+        return self._analyze(smoothed[1])
+
+    def flush(self):
+        """
+        Return the results of the frames still buffered, at the end of the stream.
+        """
+        return [self._analyze(ball_dict) for _, ball_dict in self.ball_smoother.flush()]
+
+    def _analyze(self, ball_dict):
+        frame_num, frame, capture_time, player_tracks, player_teams, court_keypoints = self._pending.popleft()
+        index = len(self.ball_control)
+
+        ball_holder = self.possession_detector.update(player_tracks, ball_dict)
+        pass_team, interception_team = self.event_detector.update(ball_holder, player_teams)
+        if pass_team != -1:
+            self.passes[pass_team] += 1
+        if interception_team != -1:
+            self.interceptions[interception_team] += 1
+
+        team_in_control = player_teams.get(ball_holder, -1) if ball_holder != -1 else -1
+        self.ball_control.update(team_in_control if team_in_control in (1, 2) else -1)
+
+        validated_keypoints = self.tactical_view_converter.validate_keypoints([court_keypoints])[0]
+        tactical_positions = self.tactical_view_converter.update(validated_keypoints, player_tracks)
+        _, speeds = self.speed_calculator.update(tactical_positions, fps=self.fps)
+
+        result = {
+            "frame_num": frame_num,
+            "ball_holder": ball_holder,
+            "team_in_control": team_in_control,
+            "pass": pass_team,
+            "interception": interception_team,
+            "ball_control": self.ball_control.percentages(index),
+            "rolling_ball_control": (self.ball_control.percentages(index, window=self.ball_control.rolling_window)
+                                     if self.ball_control.rolling_window else None),
+            "passes": dict(self.passes),
+            "interceptions": dict(self.interceptions),
+            "speeds": speeds,
+            "latency_ms": (time.perf_counter() - capture_time) * 1000 if capture_time is not None else None,
+            "frame": None,
+        }
+
+        if self.render:
+            output = frame.copy()
+            output = self.player_drawer.draw_frame(output, player_tracks, player_teams, ball_holder)
+            output = self.ball_drawer.draw_frame(output, ball_dict)
+            output = self.tactical_view_drawer.draw_frame(output, self.court_image,
+                                                          self.tactical_view_converter.key_points,
+                                                          tactical_positions, player_teams, ball_holder)
+            output = self.ball_control_drawer.draw_frame(output, index, self.ball_control)
+            output = self.pass_interception_drawer.draw_frame(output, index,
+                                                              (self.passes[1], self.passes[2],
+                                                               self.interceptions[1], self.interceptions[2]))
+            result["frame"] = output
+
+        return result
+
+
+def log_result(result):
+    """
+    Default publisher of live results: one JSON line per frame in the log.
+    """
+    stats = {key: value for key, value in result.items() if key != "frame"}
+    logger.info(json.dumps(stats, default=str))
+
+
+def run_live(source,
+             output_path=None,
+             on_result=log_result,
+             realtime=True,
+             max_frames=None,
+             lookahead=10,
+             **pipeline_kwargs):
+    """
+    Run the live pipeline on a camera, a stream or a video file replayed in real time.
+
+    Args:
+        source (int or str): Camera index, stream URL or video path.
+        output_path (str, optional): Write the annotated frames to this video.
+        on_result (callable): Called with the result dict of every frame, as soon as
+            it is available (e.g. to publish the stats).
+        realtime (bool): Replay a video file at its frame rate, dropping late frames.
+        max_frames (int, optional): Stop after this many source frames.
+        lookahead (int): Frames of delay allowed to fill ball detection gaps.
+        **pipeline_kwargs: Other LivePipeline arguments (model paths, team colors...).
+    """
+    cap = cv2.VideoCapture(source)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30
+    cap.release()
+
+    pipeline = LivePipeline(fps=fps, lookahead=lookahead, render=output_path is not None, **pipeline_kwargs)
+    sink = BackgroundVideoSink(output_path, fps=fps, max_queued=IO_QUEUE_SIZE) if output_path else None
+
+    def publish(result):
+        if result is None:
+            return
+        on_result(result)
+        if sink is not None:
+            sink.write(result["frame"])
+
+    try:
+        for frame_num, frame, capture_time in iter_live_frames(source, realtime=realtime, max_frames=max_frames):
+            publish(pipeline.process(frame_num, frame, capture_time))
+        for result in pipeline.flush():
+            publish(result)
+    finally:
+        if sink is not None:
+            sink.close()
@@ -0,0 +1,470 @@
+import json
+import logging
+from functools import cached_property
+
+import numpy as np
+
+from src.utils import read_video, save_video, iter_video, iter_windows, get_video_properties, BackgroundVideoSink, \
+    prefetch, StageCache, TrackTable
+from src.ball_aquisition.ball_aquisition_detector import BallAquisitionDetector
+from src.passes.passes_interceptions import PassAndInterceptionDetector
+from src.tactic_view.tactic_view_converter import TacticalViewConverter
+from src.speed_and_distance_calculator import SpeedAndDistanceCalculator
+from src.stats import PossessionIndex
+from src.draws.draw_player import PlayerTracksDrawer
+from src.draws.ball_track_dar import BallTracksDrawer
+from src.draws.teams_ball_pos_draw import TeamBallControlDrawer
+from src.draws.passes_interceptions_draw import PassInterceptionDrawer
+from src.draws.tactic_viewer_drawer import TacticalViewDrawer
+from src.draws.speed_and_distance_drawer import SpeedAndDistanceDrawer
+from src.draws.renderer import (FrameRenderer, PlayerTracksLayer, BallTracksLayer, TacticalViewLayer,
+                                TeamBallControlLayer, PassInterceptionLayer, CourtKeypointsLayer,
+                                SpeedAndDistanceLayer)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TEAM_COLORS = {1: [255, 245, 238], 2: [128, 0, 0]}
+
+PLAYER_TRACKER_PARAMS = {"max_age": 15, "conf_threshold": 0.5, "backend": "deepsort"}
+BALL_TRACKER_PARAMS = {"max_age": 20, "conf_threshold": 0.5, "engine": "deepsort"}
+TEAM_ASSIGNER_PARAMS = {"engine": "clip"}
+
+# Stages that can be enabled or disabled. The component of a disabled stage is
+# never imported nor loaded, and the analytics and layers needing it are skipped.
+PIPELINE_STAGES = ("players", "ball", "teams", "tactical")
+STAGE_DEPENDENCIES = {"teams": ("players",)}
+
+# Frames decoded ahead / queued for encoding by the background I/O threads.
+IO_QUEUE_SIZE = 32
+
+
+def validate_stages(enabled_stages=None):
+    """
+    Check a selection of pipeline stages.
+
+    Args:
+        enabled_stages (iterable, optional): Names of the stages to run (all of them if None).
+
+    Returns:
+        tuple: The enabled stages, in pipeline order.
+    """
+    if enabled_stages is None:
+        return PIPELINE_STAGES
+    enabled_stages = set(enabled_stages)
+    for stage in enabled_stages:
+        if stage not in PIPELINE_STAGES:
+            raise ValueError(f"Unknown stage: {stage}. Expected one of {list(PIPELINE_STAGES)}.")
+    for stage, dependencies in STAGE_DEPENDENCIES.items():
+        missing = [dependency for dependency in dependencies if dependency not in enabled_stages]
+        if stage in enabled_stages and missing:
+            raise ValueError(f"Stage {stage} requires the stages {missing}.")
+    return tuple(stage for stage in PIPELINE_STAGES if stage in enabled_stages)
+
+
+class TrackingStages:
+    """
+    Lazily built detection/tracking components: a model is only loaded when a
+    stage actually has to run (i.e. its result is not cached), and its module is
+    only imported then, so disabled stages cost nothing at startup.
+    """
+
+    def __init__(self, model_path, court_model_path):
+        self.model_path = model_path
+        self.court_model_path = court_model_path
+
+    @cached_property
+    def detector(self):
+        # Players and ball come from the same model: run it once per frame and share the detections.
+        # Each tracker applies its own threshold; the ByteTrack backend also uses the
+        # low-confidence player detections (its low_threshold).
+        from src.detection.shared_detector import SharedDetector
+        conf_threshold = 0.1 if PLAYER_TRACKER_PARAMS["backend"] == "bytetrack" else 0.5
+        return SharedDetector(model_path=self.model_path, conf_threshold=conf_threshold)
+
+    @cached_property
+    def player_tracker(self):
+        from src.tracks.player_tracker import PlayerTracker
+        return PlayerTracker(detector=self.detector, **PLAYER_TRACKER_PARAMS)
+
+    @cached_property
+    def ball_tracker(self):
+        from src.tracks.ball_tracker import BallTracker
+        return BallTracker(detector=self.detector, **BALL_TRACKER_PARAMS)
+
+    @cached_property
+    def team_assigner(self):
+        from src.teams.teams_assigner import TeamAssigner
+        return TeamAssigner(**TEAM_ASSIGNER_PARAMS)
+
+    @cached_property
+    def court_keypoint_detector(self):
+        from src.court_keypoint_detector.court_keypoint_detector import CourtKeypointDetector
+        return CourtKeypointDetector(model_path=self.court_model_path)
+
+
+def run_pipeline(video_path,
+                 output_path,
+                 model_path="models/players_detection_model.pt",
+                 court_model_path="models/court_keypoints.pt",
+                 court_image_path="data/basketball_court.png",
+                 team_colors=None,
+                 window_size=None,
+                 use_cache=True,
+                 cache_dir="cache/stages",
+                 chunk_size=None,
+                 workers=None,
+                 enabled_stages=None,
+                 render=True,
+                 analytics_path=None):
+    """
+    Run detection, tracking, analytics and rendering on a video.
+
+    With window_size=None the whole video is decoded into memory and every stage
+    runs over the full list of frames. With a window_size, frames are streamed:
+    the video is decoded twice (once for detection/tracking, once for rendering)
+    and only window_size frames (plus the IO_QUEUE_SIZE frames decoded ahead and
+    queued for encoding) are held in memory at any time; only the lightweight
+    per-frame results (tracks, teams, keypoints, possession) are kept for the
+    whole video.
+
+    With a chunk_size, the video is split into chunks processed in parallel by
+    worker processes (see src.pipeline.chunked.run_chunked).
+
+    Stage results are cached by content (video, model weights and parameters),
+    so a cached result is never reused for another video or configuration.
+
+    enabled_stages selects the stages to run (see PIPELINE_STAGES): a disabled
+    stage's model is never loaded, and the analytics and overlays depending on
+    it are skipped. With render=False no video is written, e.g. for
+    analytics-only batch jobs exporting to analytics_path (see export_analytics).
+
+    Args:
+        video_path (str): Input video path.
+        output_path (str): Annotated output video path.
+        model_path (str): Path to the players/ball YOLO weights.
+        court_model_path (str): Path to the court keypoints YOLO weights.
+        court_image_path (str): Path to the tactical court image.
+        team_colors (dict, optional): {team_id: BGR color} used by the drawers.
+        window_size (int, optional): Number of frames per window in streaming mode.
+        use_cache (bool): Whether to read/write stage results from the cache.
+        cache_dir (str): Directory of the stage cache.
+        chunk_size (int, optional): Number of frames per chunk in chunked parallel mode.
+        workers (int, optional): Number of worker processes in chunked mode (all cores by default).
+        enabled_stages (iterable, optional): Stages to run, among PIPELINE_STAGES (all by default).
+        render (bool): Whether to render and write the annotated video.
+        analytics_path (str, optional): JSON file the analytics are exported to.
+
+    Returns:
+        str: The output video path (the analytics path when render is False).
+    """
+    enabled_stages = validate_stages(enabled_stages)
+    if not render and analytics_path is None:
+        raise ValueError("Nothing to output: render is disabled and no analytics_path is given.")
+
+    if chunk_size:
+        from src.pipeline.chunked import run_chunked
+        return run_chunked(video_path, output_path, model_path=model_path, court_model_path=court_model_path,
+                           court_image_path=court_image_path, team_colors=team_colors,
+                           chunk_size=chunk_size, window_size=window_size or 200, workers=workers,
+                           use_cache=use_cache, cache_dir=cache_dir, enabled_stages=enabled_stages,
+                           render=render, analytics_path=analytics_path)
+
+    team_colors = team_colors or DEFAULT_TEAM_COLORS
+    cache = StageCache(cache_dir) if use_cache else None
+    stages = TrackingStages(model_path, court_model_path)
+
+    if window_size:
+        return _run_streaming(video_path, output_path, stages, court_image_path,
+                              team_colors, window_size, cache, enabled_stages, render, analytics_path)
+
+    frames, fps = read_video(video_path)
+
+    def cached(stage, model_paths, params, compute):
+        if cache is None:
+            return compute()
+        key = cache.make_key(stage, video_path=video_path, model_paths=model_paths, params=params)
+        return cache.get_or_compute(key, compute)
+
+    # Detections and appearance embeddings are cached apart from the tracks: they
+    # do not depend on max_age, so tracking again with another max_age reuses them.
+    # Disabled stages get empty per-frame results.
+    player_tracks, ball_tracks, player_teams = ([{} for _ in frames] for _ in range(3))
+    court_keypoints = [None] * len(frames)
+    if "players" in enabled_stages:
+        player_tracks = cached("player_tracks", [model_path], PLAYER_TRACKER_PARAMS,
+                               lambda: stages.player_tracker.track_players(
+                                   frames=frames,
+                                   **cached("player_detections", [model_path],
+                                            _detection_params(PLAYER_TRACKER_PARAMS),
+                                            lambda: stages.player_tracker.detect_and_embed(frames))))
+    if "ball" in enabled_stages:
+        ball_tracks = cached("ball_tracks", [model_path], BALL_TRACKER_PARAMS,
+                             lambda: stages.ball_tracker.track_detections(
+                                 frames,
+                                 **cached("ball_detections", [model_path], _detection_params(BALL_TRACKER_PARAMS),
+                                          lambda: stages.ball_tracker.detect_and_embed(frames))))
+    if "teams" in enabled_stages:
+        player_teams = cached("team_assignments", [model_path],
+                              dict(TEAM_ASSIGNER_PARAMS, player_tracks=PLAYER_TRACKER_PARAMS),
+                              lambda: stages.team_assigner.get_player_teams_across_frames(
+                                  video_frames=frames, player_tracks=player_tracks))
+    if "tactical" in enabled_stages:
+        court_keypoints = cached("court_keypoints", [court_model_path], {},
+                                 lambda: stages.court_keypoint_detector.detect_keypoints(frames=frames))
+
+    analytics = _run_analytics(player_tracks, ball_tracks, player_teams, court_keypoints,
+                               court_image_path, fps=fps, enabled_stages=enabled_stages)
+    if analytics_path is not None:
+        export_analytics(analytics, analytics_path)
+    if not render:
+        return analytics_path
+    renderer = _build_renderer(team_colors, analytics)
+
+    save_video(frames=renderer.render(frames), path=output_path, fps=fps, max_queued=IO_QUEUE_SIZE)
+    return output_path
+
+
+def _detection_params(tracker_params):
+    return {key: value for key, value in tracker_params.items() if key != "max_age"}
+
+
+def _run_streaming(video_path, output_path, stages, court_image_path,
+                   team_colors, window_size, cache, enabled_stages=PIPELINE_STAGES, render=True,
+                   analytics_path=None):
+    fps, _, _, _ = get_video_properties(video_path)
+
+    def track_video():
+        # Pass 1: detection and tracking, window by window.
+        return _track_windows(stages, prefetch(iter_video(video_path), IO_QUEUE_SIZE), window_size,
+                              enabled_stages=enabled_stages)
+
+    if cache is None:
+        player_table, ball_table, court_keypoints = track_video()
+    else:
+        key = cache.make_key("streaming_tracking",
+                             video_path=video_path,
+                             model_paths=[stages.model_path, stages.court_model_path],
+                             params={"window_size": window_size,
+                                     "stages": list(enabled_stages),
+                                     "player_tracker": PLAYER_TRACKER_PARAMS,
+                                     "ball_tracker": BALL_TRACKER_PARAMS,
+                                     "team_assigner": TEAM_ASSIGNER_PARAMS})
+        player_table = cache.get_table(key + "-players")
+        ball_table = cache.get_table(key + "-ball")
+        court_keypoints = cache.get(key)
+        if player_table is None or ball_table is None or court_keypoints is None:
+            player_table, ball_table, court_keypoints = track_video()
+            cache.set_table(key + "-players", player_table)
+            cache.set_table(key + "-ball", ball_table)
+            cache.set(key, court_keypoints)
+
+    # Per-frame dictionaries are built on access from the (memory-mapped) columns.
+    analytics = _run_analytics(player_table, ball_table.to_tracks(),
+                               player_table.teams_view(), court_keypoints,
+                               court_image_path, fps=fps, enabled_stages=enabled_stages)
+    if analytics_path is not None:
+        export_analytics(analytics, analytics_path)
+    if not render:
+        return analytics_path
+    renderer = _build_renderer(team_colors, analytics)
+
+    # Pass 2: decode again and render/write each window as soon as it is drawn.
+    # Decoding, rendering and encoding run concurrently: a background thread decodes
+    # ahead and another one encodes the rendered frames.
+    with BackgroundVideoSink(output_path, fps=fps, max_queued=IO_QUEUE_SIZE) as sink:
+        for start_frame, window in iter_windows(prefetch(iter_video(video_path), IO_QUEUE_SIZE), window_size):
+            sink.write_frames(renderer.render(window, start_frame))
+
+    return output_path
+
+
+def _track_windows(stages, frames, window_size, first_frame=0, enabled_stages=PIPELINE_STAGES):
+    """
+    Detect and track players, ball, teams and court keypoints on a stream of
+    frames, window by window. Trackers keep their state across windows, so track
+    IDs stay consistent over the whole stream. Each window's tracks are
+    converted to compact columnar tables right away.
+
+    Args:
+        stages (TrackingStages): Detection/tracking components.
+        frames (iterable): Video frames, in order.
+        window_size (int): Number of frames per window.
+        first_frame (int): Video index of the first frame (for logging).
+        enabled_stages (tuple): Stages to run; disabled stages get empty results.
+
+    Returns:
+        tuple: (player TrackTable with teams, ball TrackTable, list of court keypoints per frame).
+    """
+    player_tables, ball_tables, court_keypoints = [], [], []
+    for start_frame, window in iter_windows(frames, window_size):
+        start_frame += first_frame
+        logger.info(f"Tracking frames {start_frame} to {start_frame + len(window) - 1}")
+        # Disabled stages get empty per-frame results.
+        window_player_tracks, window_ball_tracks = [{} for _ in window], [{} for _ in window]
+        window_player_teams, window_court_keypoints = None, [None] * len(window)
+        if "players" in enabled_stages:
+            window_player_tracks = stages.player_tracker.track_players(frames=window)
+        if "teams" in enabled_stages:
+            window_player_teams = stages.team_assigner.get_player_teams_across_frames(
+                video_frames=window, player_tracks=window_player_tracks)
+        if "ball" in enabled_stages:
+            window_ball_tracks = stages.ball_tracker.get_object_tracks(frames=window)
+        if "tactical" in enabled_stages:
+            window_court_keypoints = stages.court_keypoint_detector.detect_keypoints(frames=window)
+        player_tables.append(TrackTable.from_tracks(window_player_tracks, window_player_teams))
+        ball_tables.append(TrackTable.from_tracks(window_ball_tracks))
+        court_keypoints += window_court_keypoints
+    return TrackTable.concatenate(player_tables), TrackTable.concatenate(ball_tables), court_keypoints
+
+
+def _run_analytics(player_tracks, ball_tracks, player_teams, court_keypoints, court_image_path, fps=30,
+                   enabled_stages=PIPELINE_STAGES):
+    """
+    Whole-video analytics from the stage results. Analytics depending on a
+    disabled stage are left out of the returned dict.
+
+    player_tracks may be a TrackTable (streaming and chunked modes): ball
+    possession then reads its columns directly, and the other analytics a view
+    of its per-frame dictionaries.
+    """
+    player_table = None
+    if isinstance(player_tracks, TrackTable):
+        player_table, player_tracks = player_tracks, player_tracks.tracks_view()
+
+    if "ball" in enabled_stages:
+        from src.tracks.ball_tracker import BallTracker
+        ball_tracks = BallTracker.remove_wrong_detections(ball_tracks, max_distance=25)
+        ball_tracks = BallTracker.interpolate_ball_positions(ball_tracks)
+
+    if "players" in enabled_stages and "ball" in enabled_stages:
+        ball_acquisition = BallAquisitionDetector().detect_ball_possession(
+            player_tracks=player_tracks if player_table is None else player_table, ball_tracks=ball_tracks)
+    else:
+        ball_acquisition = [-1] * len(player_tracks)
+
+    analytics = {
+        "enabled_stages": enabled_stages,
+        "player_tracks": player_tracks,
+        "ball_tracks": ball_tracks,
+        "player_teams": player_teams,
+        "court_keypoints": court_keypoints,
+        "ball_acquisition": ball_acquisition,
+    }
+
+    if "teams" in enabled_stages and "ball" in enabled_stages:
+        events = PassAndInterceptionDetector().detect_events(ball_acquisition=ball_acquisition,
+                                                             player_assignment=player_teams)
+        analytics.update({
+            "possession_segments": events["segments"],
+            "possession_index": PossessionIndex(events["segments"]),
+            "passes": events["passes"],
+            "interceptions": events["interceptions"],
+            "turnovers": events["turnovers"],
+        })
+
+    if "tactical" in enabled_stages:
+        tactical_view_converter = TacticalViewConverter(court_image_path=court_image_path)
+        validated_keypoints = tactical_view_converter.validate_keypoints(court_keypoints)
+        tactical_player_positions = tactical_view_converter.transform_players_to_tactical_view(validated_keypoints,
+                                                                                              player_tracks)
+        analytics.update({
+            "tactical_view_converter": tactical_view_converter,
+            "tactical_player_positions": tactical_player_positions,
+        })
+
+        if "players" in enabled_stages:
+            # Speed and distance in court meters, from the tactical positions.
+            speed_calculator = SpeedAndDistanceCalculator(tactical_view_converter.width,
+                                                          tactical_view_converter.height,
+                                                          tactical_view_converter.actual_width_in_meters,
+                                                          tactical_view_converter.actual_height_in_meters)
+            analytics["speed_metrics"] = speed_calculator.calculate_metrics(tactical_player_positions, fps=fps)
+
+    return analytics
+
+
+def _build_renderer(team_colors, analytics):
+    """
+    Bind the drawers to the analytics of the whole video as the layers of a
+    single-pass renderer. Layers are drawn bottom to top; layers whose analytics
+    were skipped (disabled stages) are left out.
+    """
+    enabled_stages = analytics["enabled_stages"]
+    player_teams = analytics["player_teams"]
+    ball_acquisition = analytics["ball_acquisition"]
+    layers = []
+    if "players" in enabled_stages:
+        layers.append(PlayerTracksLayer(PlayerTracksDrawer(team_1_color=team_colors[1], team_2_color=team_colors[2]),
+                                        analytics["player_tracks"], player_teams, ball_acquisition))
+    if "speed_metrics" in analytics:
+        layers.append(SpeedAndDistanceLayer(SpeedAndDistanceDrawer(), analytics["player_tracks"],
+                                            analytics["speed_metrics"]))
+    if "ball" in enabled_stages:
+        layers.append(BallTracksLayer(BallTracksDrawer(), analytics["ball_tracks"]))
+    if "tactical_view_converter" in analytics:
+        layers.append(TacticalViewLayer(TacticalViewDrawer(team_1_color=team_colors[1], team_2_color=team_colors[2]),
+                                        analytics["tactical_view_converter"], analytics["tactical_player_positions"],
+                                        player_teams, ball_acquisition))
+    if "possession_index" in analytics:
+        layers.append(TeamBallControlLayer(TeamBallControlDrawer(team_colors=team_colors),
+                                           analytics["possession_index"]))
+        layers.append(PassInterceptionLayer(PassInterceptionDrawer(team_colors=team_colors),
+                                            analytics["possession_index"]))
+    if "tactical" in enabled_stages:
+        # Imported here: supervision is only needed to draw the court keypoints.
+        from src.draws.court_key_points_drawer import CourtKeypointDrawer
+        layers.append(CourtKeypointsLayer(CourtKeypointDrawer(), analytics["court_keypoints"]))
+    return FrameRenderer(layers)
+
+
+def export_analytics(analytics, path):
+    """
+    Write the analytics of a video to a JSON file: per-frame tracks, teams and
+    ball holder, tactical positions, possession segments and events, ball
+    control and speed/distance totals, for the stages that ran.
+
+    Args:
+        analytics (dict): Output of the analytics stage of the pipeline.
+        path (str): Output JSON path.
+
+    Returns:
+        str: The JSON path.
+    """
+    enabled_stages = analytics["enabled_stages"]
+    n_frames = len(analytics["player_tracks"])
+    export = {"stages": list(enabled_stages), "n_frames": n_frames}
+    if "players" in enabled_stages:
+        export["player_tracks"] = list(analytics["player_tracks"])
+    if "teams" in enabled_stages:
+        export["player_teams"] = list(analytics["player_teams"])
+    if "ball" in enabled_stages:
+        export["ball_tracks"] = list(analytics["ball_tracks"])
+        if "players" in enabled_stages:
+            export["ball_acquisition"] = list(analytics["ball_acquisition"])
+    if "tactical_player_positions" in analytics:
+        export["tactical_player_positions"] = list(analytics["tactical_player_positions"])
+    if "possession_index" in analytics:
+        possession_index = analytics["possession_index"]
+        export["possession"] = possession_index.to_dict()
+        export["ball_control"] = possession_index.range_percentages(0, n_frames)
+    if "speed_metrics" in analytics:
+        export["total_distances"] = analytics["speed_metrics"]["total_distances"]
+        export["max_speeds"] = analytics["speed_metrics"]["max_speeds"]
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(_to_json(export), f)
+    logger.info(f"Analytics exported to {path}")
+    return path
+
+
+def _to_json(value):
+    # Plain JSON types: NumPy values converted, dict keys as strings, NaN as null.
+    if isinstance(value, dict):
+        return {str(key): _to_json(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [_to_json(item) for item in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and value != value:
+        return None
+    return value
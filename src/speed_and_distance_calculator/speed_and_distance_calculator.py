@@ -1,9 +1,9 @@
-import os
-import sys
-import pathlib
-folder_path = pathlib.Path(__file__).parent.resolve()
-sys.path.append(os.path.join(folder_path,"../"))
-from utils import measure_distance
+from collections import deque
+from itertools import islice
+
+import numpy as np
+
+from src.utils import measure_distance
 
 
 class SpeedAndDistanceCalculator():
@@ -12,33 +12,51 @@ class SpeedAndDistanceCalculator():
                  height_in_pixels,
                  width_in_meters,
                  height_in_meters,
+                 forget_after=None,
                  ):
-        
+        """
+        Args:
+            forget_after (int, optional): In update(), players unseen for more than
+                forget_after frames are forgotten, which bounds the online state.
+                None keeps them, as the whole-video methods do.
+        """
         self.width_in_pixels = width_in_pixels
         self.height_in_pixels= height_in_pixels
 
         self.width_in_meters = width_in_meters
         self.height_in_meters= height_in_meters
 
+        self.window_size = 5  # Speed needs the player in window_size of the last window_size*3 frames
+        self.forget_after = forget_after
+        self.reset()
+
+    def reset(self):
+        """
+        Forget the state carried over between frames by update().
+        """
+        self.frame_num = 0
+        self.total_distances = {}
+        self._previous_positions = {}
+        self._last_seen = {}
+        self._recent_distances = {}
+
     def calculate_distance(self,
                             tactical_player_positions
                             ):
-        previous_players_position = {}
-        output_distances =[]
-
-        for frame_number, tactical_player_position_frame in enumerate(tactical_player_positions):
-            output_distances.append({})
+        """
+        Distance covered by each player since the previous frame they were seen in.
 
-            for player_id, current_player_position in tactical_player_position_frame.items():
-                # Calculate distance
-                if player_id in previous_players_position:
-                    previous_position = previous_players_position[player_id]
-                    meter_distance = self.calculate_meter_distance(previous_position, current_player_position)
-                    output_distances[frame_number][player_id] = meter_distance
+        Args:
+            tactical_player_positions (list): Per-frame dicts mapping player_id to its
+                [x, y] tactical position in pixels.
 
-                previous_players_position[player_id]=current_player_position
-        
-        return output_distances
+        Returns:
+            list: Per-frame dicts mapping player_id to the distance in meters (no entry
+            for the first frame a player is seen in).
+        """
+        rows = self.rows_by_player(tactical_player_positions)
+        distances = self.distance_rows(rows["frames"], rows["players"], rows["values"])
+        return self._rows_to_dicts(rows, distances)
 
     def calculate_meter_distance(self,previous_pixel_position, current_pixel_position):
          # using width_in_pixels,height_in_pixels and width_in_meters,height_in_meters Calculate the meter distance betweent current position and previous position
@@ -60,53 +78,268 @@ class SpeedAndDistanceCalculator():
 
     def calculate_speed(self, distances, fps=30):
         """
-        Calculate player speeds based on distances covered over the last 5 frames.
-        
+        Calculate player speeds based on distances covered over the last window_size*3 frames.
+
+        The first distance of the window is not counted, and the speed is 0 until
+        the player has at least window_size counted distances in the window.
+
         Args:
             distances (list): List of dictionaries containing distance per player per frame,
                             as output by calculate_distance method.
             fps (float): Frames per second of the video, used to calculate elapsed time.
-            
+
         Returns:
             list: List of dictionaries where each dictionary maps player_id to their
                 speed in km/h at that frame.
         """
-        speeds = []
-        window_size = 5  # Look at last 5 frames for speed calculation
-        
-        # Calculate speed for each frame and player
-        for frame_idx in range(len(distances)):
-            speeds.append({})
-            # For each player in current frame
-            for player_id in distances[frame_idx].keys():
-                # Look back window_size frames or fewer if at the beginning
-                start_frame = max(0, frame_idx - (window_size * 3) + 1)
-                
-                total_distance = 0
-                frames_present = 0
-                last_frame_present = None
-                
-                # Calculate total distance in the window
-                for i in range(start_frame, frame_idx + 1):
-                    if player_id in distances[i]:
-                        if last_frame_present is not None:
-                            total_distance += distances[i][player_id]
-                            frames_present += 1
-                        last_frame_present = i
-                
-                # Calculate speed only if player was present in at least two frames
-                if frames_present >= window_size:
-                    # Calculate time in hours (convert frames to hours)
-                    time_in_seconds = frames_present / fps
-                    time_in_hours = time_in_seconds / 3600
-                    
-                    # Calculate speed in km/h
-                    if time_in_hours > 0:
-                        speed_kmh = (total_distance / 1000) / time_in_hours
-                        speeds[frame_idx][player_id] = speed_kmh
-                    else:
-                        speeds[frame_idx][player_id] = 0
-                else:
-                    speeds[frame_idx][player_id] = 0
-        
-        return speeds
\ No newline at end of file
+        rows = self.rows_by_player(distances)
+        speeds, _ = self.speed_rows(rows["frames"], rows["players"], rows["values"], fps=fps)
+        return self._rows_to_dicts(rows, speeds)
+
+    def calculate_metrics(self, tactical_player_positions, fps=30):
+        """
+        Distances, speeds and accelerations of every player and frame, with
+        per-player summaries.
+
+        Metrics are computed over sparse rows, one per (frame, player) position,
+        so memory grows with the number of positions and not with frames times
+        every track ID of the video. Rows are returned in frame order: the rows of
+        frame f are offsets[f]:offsets[f + 1].
+
+        Args:
+            tactical_player_positions (list): Per-frame dicts mapping player_id to its
+                [x, y] tactical position in pixels.
+            fps (float): Frames per second of the video.
+
+        Returns:
+            dict: "player_ids", "offsets", then per row "players" (index in
+            player_ids), "distances" (meters), "cumulative_distances" (meters
+            covered so far), "speeds" (km/h) and "accelerations" (m/s²), NaN where
+            undefined, and per-player dicts "total_distances" (meters),
+            "max_speeds" (km/h) and "max_accelerations" (m/s²).
+        """
+        rows = self.rows_by_player(tactical_player_positions)
+        frames, players = rows["frames"], rows["players"]
+        distances = self.distance_rows(frames, players, rows["values"])
+        speeds, valid_speeds = self.speed_rows(frames, players, distances, fps=fps)
+        accelerations = self.acceleration_rows(frames, players, speeds, valid_speeds, fps=fps)
+
+        # Running total of each player, defined from their first distance on.
+        has_distance = ~np.isnan(distances)
+        values = np.concatenate([[0.0], np.cumsum(np.where(has_distance, distances, 0.0))])
+        counts = np.concatenate([[0], np.cumsum(has_distance)])
+        player_starts = np.searchsorted(players, players, side="left")
+        cumulative_distances = values[1:] - values[player_starts]
+        cumulative_distances[counts[1:] == counts[player_starts]] = np.nan
+
+        player_ids = rows["player_ids"]
+        first_rows = np.searchsorted(players, np.arange(len(player_ids)), side="left")
+        total_distances = np.bincount(players, weights=np.where(has_distance, distances, 0.0),
+                                      minlength=len(player_ids))
+        max_speeds = max_accelerations = np.zeros(0)
+        if len(players):
+            max_speeds = np.maximum.reduceat(np.where(valid_speeds, speeds, 0.0), first_rows)
+            max_accelerations = np.maximum.reduceat(np.where(np.isnan(accelerations), -np.inf, accelerations),
+                                                    first_rows)
+
+        # Back to frame order.
+        order = rows["order"]
+        frame_order = np.empty_like(order)
+        frame_order[order] = np.arange(len(order))
+        return {
+            "player_ids": player_ids,
+            "offsets": rows["offsets"],
+            "players": players[frame_order],
+            "distances": distances[frame_order],
+            "cumulative_distances": cumulative_distances[frame_order],
+            "speeds": speeds[frame_order],
+            "accelerations": accelerations[frame_order],
+            "total_distances": dict(zip(player_ids, total_distances.tolist())),
+            "max_speeds": dict(zip(player_ids, max_speeds.tolist())),
+            "max_accelerations": {player_id: value if np.isfinite(value) else 0.0
+                                  for player_id, value in zip(player_ids, max_accelerations.tolist())},
+        }
+
+    @staticmethod
+    def rows_by_player(values_per_frame):
+        """
+        Flatten per-frame {player_id: value} dicts into rows sorted by player then frame.
+
+        Returns:
+            dict: "player_ids" (in order of first appearance), "offsets" (start of the
+            rows of each frame in frame order, plus the total), "order" (frame-order
+            row of each sorted row), then per sorted row "frames", "players" (index
+            in player_ids) and "values" (array of the values).
+        """
+        player_ids, frames, players, values = {}, [], [], []
+        counts = np.zeros(len(values_per_frame), dtype=np.int64)
+        for frame_num, frame_values in enumerate(values_per_frame):
+            counts[frame_num] = len(frame_values)
+            for player_id, value in frame_values.items():
+                frames.append(frame_num)
+                players.append(player_ids.setdefault(player_id, len(player_ids)))
+                values.append(value[:2] if isinstance(value, (list, tuple, np.ndarray)) else value)
+
+        frames = np.asarray(frames, dtype=np.int64)
+        players = np.asarray(players, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float64)
+        order = np.lexsort((frames, players))
+        return {
+            "player_ids": list(player_ids),
+            "offsets": np.concatenate([[0], np.cumsum(counts)]),
+            "order": order,
+            "frames": frames[order],
+            "players": players[order],
+            "values": values[order],
+        }
+
+    def distance_rows(self, frames, players, positions):
+        """
+        Distance in meters from the previous frame each player was seen in.
+
+        Args:
+            frames (np.ndarray): Frame of each row, rows sorted by player then frame.
+            players (np.ndarray): Player index of each row.
+            positions (np.ndarray): (rows, 2) positions in pixels.
+
+        Returns:
+            np.ndarray: Distance of each row, NaN for the first row of a player.
+        """
+        distances = np.full(len(frames), np.nan)
+        if len(frames) < 2:
+            return distances
+        meters = np.stack([positions[:, 0] * self.width_in_meters / self.width_in_pixels,
+                           positions[:, 1] * self.height_in_meters / self.height_in_pixels], axis=-1)
+        delta = meters[1:] - meters[:-1]
+        same_player = players[1:] == players[:-1]
+        distances[1:] = np.where(same_player, (delta[:, 0] ** 2 + delta[:, 1] ** 2) ** 0.5 * 0.4, np.nan)
+        return distances
+
+    def speed_rows(self, frames, players, distances, fps=30):
+        """
+        Sliding-window speeds of calculate_speed for every row: the window of the
+        last window_size*3 frames of a row's player is found by binary search, and
+        its sums are differences of cumulative sums.
+
+        Args:
+            frames (np.ndarray): Frame of each row, rows sorted by player then frame.
+            players (np.ndarray): Player index of each row.
+            distances (np.ndarray): Distance of each row in meters, NaN where undefined.
+            fps (float): Frames per second of the video.
+
+        Returns:
+            tuple: (speed of each row in km/h, NaN where there is no distance and 0
+            when the window has fewer than window_size counted distances; mask of the
+            speeds computed from a full enough window).
+        """
+        n_rows = len(frames)
+        window = self.window_size * 3
+        has_distance = ~np.isnan(distances)
+        values = np.where(has_distance, distances, 0.0)
+        if n_rows == 0:
+            return values, has_distance
+
+        counts = np.concatenate([[0], np.cumsum(has_distance)])
+        sums = np.concatenate([[0.0], np.cumsum(values)])
+        # Sort key spacing players further apart than a window, so a window never
+        # reaches the rows of the previous player.
+        keys = players * (int(frames.max()) + 1 + window) + frames
+        starts = np.searchsorted(keys, keys - window + 1, side="left")
+        ends = np.arange(1, n_rows + 1)
+        n_in_window = counts[ends] - counts[starts]
+        window_sum = sums[ends] - sums[starts]
+
+        # The first distance of the window is not counted.
+        row_index = np.arange(n_rows)
+        next_present = np.minimum.accumulate(np.where(has_distance, row_index, n_rows)[::-1])[::-1]
+        first_distance = values[np.minimum(next_present[starts], n_rows - 1)]
+
+        frames_present = n_in_window - 1
+        valid = has_distance & (frames_present >= self.window_size)
+        time_in_hours = np.where(valid, frames_present, 1) / fps / 3600
+        speeds = np.where(valid, ((window_sum - first_distance) / 1000) / time_in_hours, 0.0)
+        speeds[~has_distance] = np.nan
+        return speeds, valid
+
+    @staticmethod
+    def acceleration_rows(frames, players, speeds, valid_speeds, fps=30):
+        """
+        Acceleration in m/s² between consecutive valid speeds of each player.
+
+        Returns:
+            np.ndarray: Acceleration of each row, NaN where undefined.
+        """
+        n_rows = len(frames)
+        if n_rows == 0:
+            return np.zeros(0)
+        last_valid = np.maximum.accumulate(np.where(valid_speeds, np.arange(n_rows), -1))
+        previous = np.concatenate([[-1], last_valid[:-1]])
+        previous_row = np.maximum(previous, 0)
+        defined = valid_speeds & (previous >= 0) & (players[previous_row] == players)
+
+        meters_per_second = np.where(valid_speeds, speeds, 0.0) / 3.6
+        delta_speed = meters_per_second - meters_per_second[previous_row]
+        delta_time = np.where(defined, frames - frames[previous_row], 1) / fps
+        return np.where(defined, delta_speed / delta_time, np.nan)
+
+    @staticmethod
+    def _rows_to_dicts(rows, row_values):
+        output = [{} for _ in range(len(rows["offsets"]) - 1)]
+        player_ids = rows["player_ids"]
+        for frame_num, player, value in zip(rows["frames"].tolist(), rows["players"].tolist(), row_values.tolist()):
+            if value == value:
+                output[frame_num][player_ids[player]] = value
+        return output
+
+    def update(self, tactical_player_positions_frame, fps=30):
+        """
+        Online counterpart of calculate_distance and calculate_speed: process the
+        positions of the next frame and return its distances and speeds.
+
+        Only the last position of each player and the distances of the speed
+        window are kept between frames. Running totals are kept in total_distances.
+
+        Args:
+            tactical_player_positions_frame (dict): Player positions of the frame.
+            fps (float): Frames per second of the video.
+
+        Returns:
+            tuple: (distances, speeds) dictionaries of the frame, as one element of
+            calculate_distance and calculate_speed outputs.
+        """
+        frame_num = self.frame_num
+        self.frame_num += 1
+
+        distances = {}
+        for player_id, current_player_position in tactical_player_positions_frame.items():
+            if player_id in self._previous_positions:
+                distance = self.calculate_meter_distance(self._previous_positions[player_id], current_player_position)
+                distances[player_id] = distance
+                self.total_distances[player_id] = self.total_distances.get(player_id, 0) + distance
+            self._previous_positions[player_id] = current_player_position
+            self._last_seen[player_id] = frame_num
+
+        speeds = {}
+        start_frame = frame_num - (self.window_size * 3) + 1
+        for player_id, distance in distances.items():
+            recent = self._recent_distances.setdefault(player_id, deque())
+            recent.append((frame_num, distance))
+            while recent[0][0] < start_frame:
+                recent.popleft()
+
+            # The first distance of the window is not counted, as in calculate_speed.
+            frames_present = len(recent) - 1
+            if frames_present >= self.window_size:
+                total_distance = sum(d for _, d in islice(recent, 1, None))
+                time_in_hours = frames_present / fps / 3600
+                speeds[player_id] = (total_distance / 1000) / time_in_hours
+            else:
+                speeds[player_id] = 0
+
+        if self.forget_after is not None:
+            for player_id in [p for p, last in self._last_seen.items() if frame_num - last > self.forget_after]:
+                del self._last_seen[player_id]
+                self._previous_positions.pop(player_id, None)
+                self._recent_distances.pop(player_id, None)
+
+        return distances, speeds
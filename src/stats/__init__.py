@@ -0,0 +1,2 @@
+from src.stats.ball_control import BallControlStats, OnlineBallControlStats
+from src.stats.possession import PossessionSegments, PossessionIndex
@@ -0,0 +1,177 @@
+from collections import Counter, deque
+from itertools import islice
+
+import numpy as np
+
+
+class BallControlQueries:
+    """
+    Ball control percentage queries shared by BallControlStats and
+    PossessionIndex, built on their counts(start, end), __len__ (number of
+    frames) and team_ids.
+    """
+
+    def range_percentages(self, start, end):
+        """
+        Ball control percentage of each team in frames start..end-1 (frames without
+        control count in the total).
+
+        Returns:
+            dict: {team_id: percentage}, 0 for an empty range.
+        """
+        start, end = max(0, start), min(len(self), end)
+        total = end - start
+        if total <= 0:
+            return {team_id: 0.0 for team_id in self.team_ids}
+        return {team_id: count / total * 100 for team_id, count in self.counts(start, end).items()}
+
+    def percentages(self, frame_num, window=None):
+        """
+        Ball control percentage of each team up to frame_num (included).
+
+        Args:
+            frame_num (int): Last frame taken into account.
+            window (int, optional): Only take the last window frames into account
+                (rolling possession); the whole video so far if None.
+
+        Returns:
+            dict: {team_id: percentage}.
+        """
+        start = 0 if window is None else frame_num + 1 - window
+        return self.range_percentages(start, frame_num + 1)
+
+
+class BallControlStats(BallControlQueries):
+    """
+    Running ball control counters per team.
+
+    Keeps, for each team, the prefix count of frames in which the team controls
+    the ball: counts over any frame range (cumulative up to a frame, rolling
+    window, arbitrary range) are a difference of two prefix counts, so querying
+    a frame is O(1) whatever the length of the video. Frames are appended one at
+    a time with update(), or all at once with from_team_ball_control().
+    """
+
+    def __init__(self, team_ids=(1, 2)):
+        """
+        Args:
+            team_ids (tuple): Teams whose control is counted. Other values (e.g. -1
+                for no control) only count in the total number of frames.
+        """
+        self.team_ids = tuple(team_ids)
+        self._prefix_counts = {team_id: [0] for team_id in self.team_ids}
+
+    def __len__(self):
+        return len(self._prefix_counts[self.team_ids[0]]) - 1
+
+    @classmethod
+    def from_team_ball_control(cls, team_ball_control, team_ids=(1, 2)):
+        """
+        Build the counters of a whole video.
+
+        Args:
+            team_ball_control (array-like): Team in control of the ball per frame (-1 if none).
+            team_ids (tuple): Teams whose control is counted.
+
+        Returns:
+            BallControlStats: The statistics.
+        """
+        stats = cls(team_ids)
+        team_ball_control = np.asarray(team_ball_control)
+        for team_id in stats.team_ids:
+            prefix = np.zeros(len(team_ball_control) + 1, dtype=np.int64)
+            np.cumsum(team_ball_control == team_id, out=prefix[1:])
+            stats._prefix_counts[team_id] = prefix.tolist()
+        return stats
+
+    def update(self, team_id):
+        """
+        Append the next frame.
+
+        Args:
+            team_id (int): Team in control of the ball in the frame (-1 if none).
+        """
+        for counted_team, prefix in self._prefix_counts.items():
+            prefix.append(prefix[-1] + (counted_team == team_id))
+
+    def counts(self, start, end):
+        """
+        Number of frames of each team's ball control in frames start..end-1.
+
+        Returns:
+            dict: {team_id: count}.
+        """
+        start, end = max(0, start), min(len(self), end)
+        if end <= start:
+            return {team_id: 0 for team_id in self.team_ids}
+        return {team_id: prefix[end] - prefix[start] for team_id, prefix in self._prefix_counts.items()}
+
+
+class OnlineBallControlStats(BallControlQueries):
+    """
+    Ball control counters of a live stream, in bounded memory.
+
+    Unlike BallControlStats, which keeps a prefix count per frame, only running
+    totals and the teams of the last rolling_window frames are kept, so only
+    ranges ending at the last frame can be queried: the whole stream so far
+    (cumulative percentages) and any range within the rolling window.
+    """
+
+    def __init__(self, team_ids=(1, 2), rolling_window=None):
+        """
+        Args:
+            team_ids (tuple): Teams whose control is counted. Other values (e.g. -1
+                for no control) only count in the total number of frames.
+            rolling_window (int, optional): Number of last frames kept for rolling
+                percentages; only cumulative percentages if None.
+        """
+        self.team_ids = tuple(team_ids)
+        self.rolling_window = rolling_window
+        self._n_frames = 0
+        self._totals = Counter()
+        self._window = deque(maxlen=rolling_window or 0)
+        self._window_counts = Counter()
+
+    def __len__(self):
+        return self._n_frames
+
+    def update(self, team_id):
+        """
+        Append the next frame.
+
+        Args:
+            team_id (int): Team in control of the ball in the frame (-1 if none).
+        """
+        self._n_frames += 1
+        self._totals[team_id] += 1
+        if self._window.maxlen:
+            if len(self._window) == self._window.maxlen:
+                self._window_counts[self._window[0]] -= 1
+            self._window.append(team_id)
+            self._window_counts[team_id] += 1
+
+    def counts(self, start, end):
+        """
+        Number of frames of each team's ball control in frames start..end-1.
+
+        Raises:
+            ValueError: If the range does not end at the last frame or starts
+                before the rolling window (and not at the first frame).
+
+        Returns:
+            dict: {team_id: count}.
+        """
+        start, end = max(0, start), min(len(self), end)
+        if end <= start:
+            return {team_id: 0 for team_id in self.team_ids}
+        window_start = len(self) - len(self._window)
+        if end != len(self) or (start != 0 and start < window_start):
+            raise ValueError(f"Only ranges ending at frame {len(self)} and starting at 0 or after "
+                             f"frame {window_start} are kept, got {start}..{end}.")
+        if start == 0:
+            counts = self._totals
+        elif start == window_start:
+            counts = self._window_counts
+        else:
+            counts = Counter(islice(self._window, start - window_start, None))
+        return {team_id: counts[team_id] for team_id in self.team_ids}
@@ -0,0 +1,309 @@
+import json
+
+import numpy as np
+
+from src.stats.ball_control import BallControlQueries
+
+
+class PossessionSegments:
+    """
+    Ball possession run-length encoded into segments.
+
+    A segment is a maximal run of consecutive frames in which the same player has
+    the ball with the same team assignment. Frames without possession (-1)
+    separate segments without belonging to any. Events only need the segment
+    boundaries: a change of holder between two consecutive segments is a pass
+    (same team) or an interception (other team), whatever the number of
+    loose-ball frames in between.
+
+    Attributes:
+        starts (np.ndarray): First frame of each segment.
+        ends (np.ndarray): Frame after the last frame of each segment.
+        players (list): Player ID of each segment.
+        teams (np.ndarray): Team of the player during the segment (-1 if unknown).
+        n_frames (int): Number of frames of the video.
+    """
+
+    def __init__(self, starts, ends, players, teams, n_frames):
+        self.starts = np.asarray(starts, dtype=np.int64)
+        self.ends = np.asarray(ends, dtype=np.int64)
+        self.players = list(players)
+        self.teams = np.asarray(teams, dtype=np.int64)
+        self.n_frames = n_frames
+
+    def __len__(self):
+        return len(self.starts)
+
+    @classmethod
+    def from_ball_acquisition(cls, ball_acquisition, player_assignment):
+        """
+        Build the segments of a video.
+
+        Args:
+            ball_acquisition (list): Player with the ball in each frame (-1 if none).
+            player_assignment (list): Per-frame dicts of player team assignments.
+
+        Returns:
+            PossessionSegments: The segments, in frame order.
+        """
+        # Integer code per (holder, team), so the run-length encoding is vectorized.
+        codes_by_key = {}
+        codes = np.full(len(ball_acquisition), -1, dtype=np.int64)
+        for frame_num, holder in enumerate(ball_acquisition):
+            if holder != -1:
+                key = (holder, player_assignment[frame_num].get(holder, -1))
+                codes[frame_num] = codes_by_key.setdefault(key, len(codes_by_key))
+
+        boundaries = np.flatnonzero(np.diff(codes)) + 1
+        run_starts = np.concatenate([[0], boundaries]).astype(np.int64)
+        run_ends = np.concatenate([boundaries, [len(codes)]]).astype(np.int64)
+        if not len(codes):
+            run_starts = run_ends = np.zeros(0, dtype=np.int64)
+        held = codes[run_starts] != -1
+        starts, ends = run_starts[held], run_ends[held]
+
+        keys = list(codes_by_key)
+        segment_keys = [keys[code] for code in codes[starts].tolist()]
+        return cls(starts, ends,
+                   [player for player, _ in segment_keys],
+                   [team for _, team in segment_keys],
+                   len(ball_acquisition))
+
+    @property
+    def durations(self):
+        """
+        Number of frames of each segment.
+        """
+        return self.ends - self.starts
+
+    def transitions(self):
+        """
+        Changes of ball holder between consecutive segments.
+
+        Returns:
+            np.ndarray: Index of the segment of the new holder, one per change (the
+            previous holder's segment is the one before it).
+        """
+        players = np.array(self.players, dtype=object)
+        return np.flatnonzero(np.asarray(players[1:] != players[:-1], dtype=bool)) + 1
+
+    def event_transitions(self):
+        """
+        Classify the changes of ball holder (see transitions) into events: a pass
+        when both holders are of the same known team, an interception when they
+        are of different known teams. Changes involving an unknown team are
+        neither.
+
+        Returns:
+            dict: "frames" (frame of each change), "previous_teams" and "new_teams"
+            (teams of both holders), "previous_players" and "new_players" (lists),
+            and the boolean masks "is_pass" and "is_interception".
+        """
+        changes = self.transitions()
+        previous_teams, new_teams = self.teams[changes - 1], self.teams[changes]
+        known = previous_teams != -1
+        return {
+            "frames": self.starts[changes],
+            "previous_teams": previous_teams,
+            "new_teams": new_teams,
+            "previous_players": [self.players[i - 1] for i in changes.tolist()],
+            "new_players": [self.players[i] for i in changes.tolist()],
+            "is_pass": known & (previous_teams == new_teams),
+            "is_interception": known & (new_teams != -1) & (previous_teams != new_teams),
+        }
+
+    def events(self):
+        """
+        Passes, interceptions and turnovers of the video, from the segment
+        boundaries only (see event_transitions).
+
+        Returns:
+            dict: Per-frame lists (-1 when no event):
+                "passes": team of a pass between teammates;
+                "interceptions": team that took the ball from the other team;
+                "turnovers": team that lost the ball to the other team.
+        """
+        transitions = self.event_transitions()
+        frames, is_pass, is_interception = (transitions["frames"], transitions["is_pass"],
+                                            transitions["is_interception"])
+
+        passes = np.full(self.n_frames, -1, dtype=np.int64)
+        interceptions = np.full(self.n_frames, -1, dtype=np.int64)
+        turnovers = np.full(self.n_frames, -1, dtype=np.int64)
+        passes[frames[is_pass]] = transitions["previous_teams"][is_pass]
+        interceptions[frames[is_interception]] = transitions["new_teams"][is_interception]
+        turnovers[frames[is_interception]] = transitions["previous_teams"][is_interception]
+
+        return {
+            "passes": passes.tolist(),
+            "interceptions": interceptions.tolist(),
+            "turnovers": turnovers.tolist(),
+        }
+
+    def team_possessions(self):
+        """
+        Team possessions: consecutive segments of the same team (passes included)
+        merged into one possession, from the start of its first segment to the end
+        of its last one.
+
+        Returns:
+            tuple: (starts, ends, teams) arrays of the team possessions.
+        """
+        if not len(self):
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, empty
+        first = np.flatnonzero(np.concatenate([[True], self.teams[1:] != self.teams[:-1]]))
+        last = np.concatenate([first[1:], [len(self)]]) - 1
+        return self.starts[first], self.ends[last], self.teams[first]
+
+
+class PossessionIndex(BallControlQueries):
+    """
+    Queryable index of possession and events, built once from the possession
+    segments of a video.
+
+    Ball control is stored as per-team prefix sums of the segment durations and
+    events as sorted frame arrays per team and per player, so every query is a
+    binary search: O(log n) in the number of segments or events, with a memory
+    footprint proportional to the number of segments rather than frames.
+
+    It answers the same ball control queries as BallControlStats (counts, and
+    range_percentages and percentages from BallControlQueries), so the overlays
+    can read either.
+    """
+
+    event_types = ("pass", "interception", "turnover")
+
+    def __init__(self, segments, team_ids=(1, 2)):
+        """
+        Args:
+            segments (PossessionSegments): Possession segments of the video.
+            team_ids (tuple): Teams whose ball control is counted.
+        """
+        self.segments = segments
+        self.team_ids = tuple(team_ids)
+        self.n_frames = segments.n_frames
+
+        durations = segments.durations
+        self._duration_prefix = {team_id: np.concatenate([[0], np.cumsum(np.where(segments.teams == team_id,
+                                                                                  durations, 0))])
+                                 for team_id in self.team_ids}
+
+        # Events: frame, team and player (passer, interceptor, player who lost the ball).
+        transitions = segments.event_transitions()
+        frames, is_pass, is_interception = (transitions["frames"], transitions["is_pass"],
+                                            transitions["is_interception"])
+        previous_teams, new_teams = transitions["previous_teams"], transitions["new_teams"]
+        previous_players, new_players = transitions["previous_players"], transitions["new_players"]
+        self._events = {
+            "pass": (frames[is_pass], previous_teams[is_pass],
+                     [p for p, keep in zip(previous_players, is_pass) if keep]),
+            "interception": (frames[is_interception], new_teams[is_interception],
+                             [p for p, keep in zip(new_players, is_interception) if keep]),
+            "turnover": (frames[is_interception], previous_teams[is_interception],
+                         [p for p, keep in zip(previous_players, is_interception) if keep]),
+        }
+
+        self._event_frames = {}
+        for event_type, (event_frames, teams, players) in self._events.items():
+            for team_id in np.unique(teams).tolist():
+                self._event_frames[event_type, "team", team_id] = event_frames[teams == team_id]
+            player_frames = {}
+            for frame_num, player in zip(event_frames.tolist(), players):
+                player_frames.setdefault(player, []).append(frame_num)
+            for player, player_event_frames in player_frames.items():
+                self._event_frames[event_type, "player", player] = np.asarray(player_event_frames, dtype=np.int64)
+
+    def __len__(self):
+        return self.n_frames
+
+    @classmethod
+    def from_ball_acquisition(cls, ball_acquisition, player_assignment, team_ids=(1, 2)):
+        """
+        Build the index of a video from BallAquisitionDetector output.
+        """
+        return cls(PossessionSegments.from_ball_acquisition(ball_acquisition, player_assignment), team_ids)
+
+    def counts(self, start, end):
+        """
+        Number of frames of each team's ball control in frames start..end-1.
+
+        Returns:
+            dict: {team_id: count}.
+        """
+        start, end = max(0, start), min(self.n_frames, end)
+        segments = self.segments
+        # Segments overlapping the range: first ending after start, last starting before end.
+        first = int(np.searchsorted(segments.ends, start, side="right"))
+        last = int(np.searchsorted(segments.starts, end, side="left")) - 1
+        if end <= start or last < first:
+            return {team_id: 0 for team_id in self.team_ids}
+
+        counts = {}
+        for team_id, prefix in self._duration_prefix.items():
+            count = int(prefix[last + 1] - prefix[first])
+            # Remove the parts of the boundary segments outside the range.
+            if segments.teams[first] == team_id:
+                count -= max(0, start - int(segments.starts[first]))
+            if segments.teams[last] == team_id:
+                count -= max(0, int(segments.ends[last]) - end)
+            counts[team_id] = count
+        return counts
+
+    def event_count(self, event_type, frame_num, team=None, player=None, start=0):
+        """
+        Number of events of a type in frames start..frame_num (included), for a
+        team or a player, e.g. event_count("pass", t, player=x) for the passes of
+        player x up to frame t.
+
+        Args:
+            event_type (str): "pass", "interception" or "turnover".
+            frame_num (int): Last frame taken into account.
+            team (int, optional): Count the events of this team only.
+            player (optional): Count the events of this player only (passer,
+                interceptor or player who lost the ball).
+            start (int): First frame taken into account.
+
+        Returns:
+            int: The number of events.
+        """
+        if event_type not in self.event_types:
+            raise ValueError(f"Unknown event type: {event_type}. Expected one of {list(self.event_types)}.")
+        if player is not None:
+            frames = self._event_frames.get((event_type, "player", player))
+            if frames is not None and team is not None:
+                # Filter the player's events on the team of the event.
+                event_frames, teams, _ = self._events[event_type]
+                frames = frames[np.isin(frames, event_frames[teams == team])]
+        elif team is not None:
+            frames = self._event_frames.get((event_type, "team", team))
+        else:
+            frames = self._events[event_type][0]
+
+        if frames is None:
+            return 0
+        return int(np.searchsorted(frames, frame_num, side="right") - np.searchsorted(frames, start, side="left"))
+
+    def to_dict(self):
+        """
+        Export the segments and events as plain Python data (JSON serializable).
+        """
+        segments = self.segments
+        return {
+            "n_frames": self.n_frames,
+            "segments": [{"start": start, "end": end, "player": player, "team": team}
+                         for start, end, player, team in zip(segments.starts.tolist(), segments.ends.tolist(),
+                                                             segments.players, segments.teams.tolist())],
+            "events": sorted(({"frame": frame_num, "type": event_type, "team": team, "player": player}
+                              for event_type, (frames, teams, players) in self._events.items()
+                              for frame_num, team, player in zip(frames.tolist(), teams.tolist(), players)),
+                             key=lambda event: event["frame"]),
+        }
+
+    def save(self, path):
+        """
+        Write the index to a JSON file.
+        """
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, default=str)
+        return path
@@ -15,6 +15,12 @@ class Homography:
         if self.m is None:
             raise ValueError("Homography matrix could not be calculated.")
     
+    @classmethod
+    def from_matrix(cls, m: np.ndarray) -> "Homography":
+        homography = cls.__new__(cls)
+        homography.m = np.asarray(m, dtype=np.float64)
+        return homography
+
     def transform_points(self, points: np.ndarray) -> np.ndarray:
         if points.size == 0:
             return points
@@ -3,16 +3,28 @@ import sys
 import pathlib
 import numpy as np
 import cv2
-from copy import deepcopy
 from src.tactic_view.homography import Homography
 
 folder_path = pathlib.Path(__file__).parent.resolve()
 sys.path.append(os.path.join(folder_path, "../../"))
-from src.utils import get_foot_position, measure_distance
 
 class TacticalViewConverter:
-    def __init__(self, court_image_path):
+    def __init__(self, court_image_path, reuse_threshold=2.0, smoothing=0.5, reset_error=5.0):
+        """
+        Args:
+            court_image_path (str): Path to the tactical court image.
+            reuse_threshold (float): Maximum displacement (pixels) of the detected court
+                keypoints under which the previous frame's homography is reused (static camera).
+            smoothing (float): Weight of the previous homography in the exponential moving
+                average applied over consecutive frames (0 disables smoothing).
+            reset_error (float): Mean reprojection error (tactical view pixels) of the
+                previous homography on the new keypoints above which the moving average
+                restarts from the new homography (camera pan or cut).
+        """
         self.court_image_path = court_image_path
+        self.reuse_threshold = reuse_threshold
+        self.smoothing = smoothing
+        self.reset_error = reset_error
         self.width = 300
         self.height = 161
 
@@ -20,6 +32,7 @@ class TacticalViewConverter:
         self.actual_height_in_meters = 15
 
         self.key_points = self._generate_key_points()
+        self.reset()
 
     def _generate_key_points(self):
         def px(x_m, y_m):
@@ -41,77 +54,195 @@ class TacticalViewConverter:
             px(28 - 5.79, 5.18), px(28 - 5.79, 10)
         ]
 
-    def validate_keypoints(self, keypoints_list):
-        validated_list = deepcopy(keypoints_list)
-
-        for frame_idx, frame_keypoints in enumerate(validated_list):
-            if len(frame_keypoints) == 0:
-                continue  # aucun keypoint
-
-            frame_keypoints = frame_keypoints[0]  # shape (N, 2)
-
-            detected_indices = [i for i, kp in enumerate(frame_keypoints) if kp[0] > 0 and kp[1] > 0]
-
-            if len(detected_indices) < 3:
-                continue
-
-            invalid_keypoints = []
-
-            for i in detected_indices:
-                other_indices = [idx for idx in detected_indices if idx != i and idx not in invalid_keypoints]
-                if len(other_indices) < 2:
-                    continue
-
-                j, k = other_indices[:2]
-                d_ij = measure_distance(frame_keypoints[i], frame_keypoints[j])
-                d_ik = measure_distance(frame_keypoints[i], frame_keypoints[k])
-
-                t_ij = measure_distance(self.key_points[i], self.key_points[j])
-                t_ik = measure_distance(self.key_points[i], self.key_points[k])
-
-                if t_ij > 0 and t_ik > 0:
-                    prop_detected = d_ij / d_ik if d_ik > 0 else float('inf')
-                    prop_tactical = t_ij / t_ik if t_ik > 0 else float('inf')
-
-                    error = abs((prop_detected - prop_tactical) / prop_tactical)
-
-                    if error > 0.8:
-                        validated_list[frame_idx][0][i] = np.array([0.0, 0.0])
-                        invalid_keypoints.append(i)
-
-        return validated_list
-
-    def transform_players_to_tactical_view(self, keypoints_list, player_tracks):
-        tactical_positions_per_frame = []
-
-        for frame_keypoints, frame_tracks in zip(keypoints_list, player_tracks):
-            tactical_positions = {}
+    def keypoints_to_array(self, keypoints_list):
+        """
+        Convert per-frame keypoints (a list of [] or [[K x (x, y)], ...] per frame, only
+        the first detection is used) into a (num_frames, K, 2) float64 array, with
+        zeros for frames without keypoints.
+
+        Returns:
+            tuple: (keypoints array, boolean array of frames that had keypoints).
+        """
+        num_frames = len(keypoints_list)
+        num_keypoints = next((len(kps[0]) for kps in keypoints_list if len(kps) > 0), len(self.key_points))
+
+        keypoints = np.zeros((num_frames, num_keypoints, 2), dtype=np.float64)
+        has_keypoints = np.zeros(num_frames, dtype=bool)
+        for frame_idx, frame_keypoints in enumerate(keypoints_list):
             if len(frame_keypoints) == 0:
-                tactical_positions_per_frame.append(tactical_positions)
                 continue
+            keypoints[frame_idx] = np.asarray(frame_keypoints[0], dtype=np.float64)
+            has_keypoints[frame_idx] = True
+        return keypoints, has_keypoints
 
-            frame_keypoints = frame_keypoints[0]  # shape (N, 2)
-
-            valid_indices = [i for i, kp in enumerate(frame_keypoints) if kp[0] > 0 and kp[1] > 0]
-
-            if len(valid_indices) < 4:
-                tactical_positions_per_frame.append(tactical_positions)
+    def validate_keypoints(self, keypoints_list):
+        """
+        Drop detected court keypoints whose distances to two other keypoints are
+        inconsistent with the tactical court (relative error above 0.8).
+
+        Each keypoint i is compared with the first two other detected keypoints
+        that are not already invalid. The computation runs for all frames at once,
+        looping only over the keypoint index, on a (num_frames, K, 2) array that is
+        modified in place (the input itself when it already is such an array).
+
+        Args:
+            keypoints_list (list or np.ndarray): Per-frame keypoints as returned by
+                CourtKeypointDetector, or a (num_frames, K, 2) array.
+
+        Returns:
+            list: Per frame, [] when there were no keypoints, else a (1, K, 2) view of
+            the validated array (so frame_keypoints[0] is the (K, 2) keypoints).
+        """
+        if isinstance(keypoints_list, np.ndarray):
+            keypoints = keypoints_list
+            has_keypoints = np.ones(len(keypoints), dtype=bool)
+        else:
+            keypoints, has_keypoints = self.keypoints_to_array(keypoints_list)
+
+        num_keypoints = keypoints.shape[1]
+        tactical_points = np.asarray(self.key_points, dtype=np.float64)[:num_keypoints]
+        tactical_distances = np.linalg.norm(tactical_points[:, None, :] - tactical_points[None, :, :], axis=2)
+
+        detected = (keypoints[..., 0] > 0) & (keypoints[..., 1] > 0)
+        frames_to_check = has_keypoints & (detected.sum(axis=1) >= 3)
+        invalid = np.zeros_like(detected)
+        frame_range = np.arange(len(keypoints))
+
+        for i in range(num_keypoints):
+            available = detected & ~invalid
+            available[:, i] = False
+            counts = np.cumsum(available, axis=1)
+            active = frames_to_check & detected[:, i] & (counts[:, -1] >= 2)
+            if not active.any():
                 continue
 
-            source_points = np.array([frame_keypoints[i] for i in valid_indices], dtype=np.float32)
-            target_points = np.array([self.key_points[i] for i in valid_indices], dtype=np.float32)
-
-            try:
-                homography = Homography(source_points, target_points)
-                for player_id, data in frame_tracks.items():
-                    player_position = np.array([get_foot_position(data["bbox"])]).astype(np.float32)
-                    tactical_pos = homography.transform_points(player_position)
-                    x, y = tactical_pos[0]
-                    if 0 <= x <= self.width and 0 <= y <= self.height:
+            # First two other available keypoints of each frame
+            j = np.argmax(counts >= 1, axis=1)
+            k = np.argmax(counts >= 2, axis=1)
+
+            d_ij = np.linalg.norm(keypoints[:, i] - keypoints[frame_range, j], axis=1)
+            d_ik = np.linalg.norm(keypoints[:, i] - keypoints[frame_range, k], axis=1)
+            t_ij = tactical_distances[i, j]
+            t_ik = tactical_distances[i, k]
+
+            with np.errstate(divide='ignore', invalid='ignore'):
+                prop_detected = np.where(d_ik > 0, d_ij / np.where(d_ik > 0, d_ik, 1), np.inf)
+                prop_tactical = t_ij / np.where(t_ik > 0, t_ik, 1)
+                error = np.abs((prop_detected - prop_tactical) / np.where(prop_tactical != 0, prop_tactical, 1))
+
+            rejected = active & (t_ij > 0) & (t_ik > 0) & (error > 0.8)
+            invalid[rejected, i] = True
+            keypoints[rejected, i] = 0.0
+
+        return [keypoints[frame_idx:frame_idx + 1] if has_keypoints[frame_idx] else []
+                for frame_idx in range(len(keypoints))]
+
+    def reset(self):
+        """
+        Forget the homography carried over between frames by update().
+        """
+        self._homography = None
+        self._reference_indices = None
+        self._reference_points = None
+
+    def update(self, frame_keypoints, frame_tracks):
+        """
+        Project the foot position of every player of the next frame into tactical
+        view coordinates.
+
+        All players of the frame are transformed with a single perspectiveTransform
+        call. When the court keypoints barely move from the frame that produced the
+        current homography (static camera), that homography is reused instead of
+        being re-estimated, and successive homographies are smoothed with an
+        exponential moving average to reduce jitter. Smoothing restarts after a
+        frame without a usable homography, when the set of detected keypoints
+        changes, and when the previous homography no longer fits the new keypoints
+        (reprojection error above reset_error), so pans do not lag and cuts do not
+        blend homographies of different shots.
+
+        Args:
+            frame_keypoints (list): Validated court keypoints of the frame.
+            frame_tracks (dict): Player IDs mapped to {"bbox": [...]}.
+
+        Returns:
+            dict: Player IDs mapped to [x, y] tactical positions.
+        """
+        tactical_positions = {}
+        if len(frame_keypoints) == 0:
+            self._homography = None
+            return tactical_positions
+
+        target_key_points = np.array(self.key_points, dtype=np.float32)
+        frame_keypoints = np.asarray(frame_keypoints[0], dtype=np.float32)  # shape (N, 2)
+
+        valid_indices = np.flatnonzero((frame_keypoints[:, 0] > 0) & (frame_keypoints[:, 1] > 0))
+
+        if len(valid_indices) < 4:
+            self._homography = None
+            return tactical_positions
+
+        source_points = frame_keypoints[valid_indices]
+
+        try:
+            homography = self._homography
+            static_camera = (homography is not None
+                             and np.array_equal(valid_indices, self._reference_indices)
+                             and np.abs(source_points - self._reference_points).max() <= self.reuse_threshold)
+            if not static_camera:
+                target_points = target_key_points[valid_indices]
+                new_homography = Homography(source_points, target_points)
+                if (homography is not None and self.smoothing > 0
+                        and np.array_equal(valid_indices, self._reference_indices)
+                        and self._reprojection_error(homography, source_points, target_points) <= self.reset_error):
+                    previous_m = homography.m / homography.m[2, 2]
+                    current_m = new_homography.m / new_homography.m[2, 2]
+                    new_homography = Homography.from_matrix(self.smoothing * previous_m
+                                                            + (1 - self.smoothing) * current_m)
+                self._homography = homography = new_homography
+                self._reference_indices = valid_indices
+                self._reference_points = source_points
+
+            if frame_tracks:
+                player_ids = list(frame_tracks.keys())
+                bboxes = np.array([frame_tracks[player_id]["bbox"] for player_id in player_ids],
+                                  dtype=np.float64)
+                # Foot position (see get_foot_position): bottom center, truncated to int.
+                feet = np.stack([np.trunc((bboxes[:, 0] + bboxes[:, 2]) / 2), np.trunc(bboxes[:, 3])], axis=1)
+                tactical_points = homography.transform_points(feet.astype(np.float32))
+
+                inside = ((tactical_points[:, 0] >= 0) & (tactical_points[:, 0] <= self.width)
+                          & (tactical_points[:, 1] >= 0) & (tactical_points[:, 1] <= self.height))
+                for player_id, (x, y), is_inside in zip(player_ids, tactical_points, inside):
+                    if is_inside:
                         tactical_positions[player_id] = [float(x), float(y)]
-            except (ValueError, cv2.error):
-                pass
+        except (ValueError, cv2.error):
+            self._homography = None
+
+        return tactical_positions
 
-            tactical_positions_per_frame.append(tactical_positions)
+    @staticmethod
+    def _reprojection_error(homography, source_points, target_points):
+        """
+        Mean distance between the target points and the source points projected by homography.
+        """
+        projected = homography.transform_points(source_points)
+        if not np.all(np.isfinite(projected)):
+            return np.inf
+        return float(np.linalg.norm(projected - target_points, axis=1).mean())
 
-        return tactical_positions_per_frame
+    def transform_players_to_tactical_view(self, keypoints_list, player_tracks):
+        """
+        Project the foot position of every player into tactical view coordinates,
+        frame by frame with update() (see update() for the homography reuse and
+        smoothing), starting from a fresh state.
+
+        Args:
+            keypoints_list (list): Validated court keypoints per frame.
+            player_tracks (list): Per-frame dicts mapping player IDs to {"bbox": [...]}.
+
+        Returns:
+            list: Per-frame dicts mapping player IDs to [x, y] tactical positions.
+        """
+        self.reset()
+        return [self.update(frame_keypoints, frame_tracks)
+                for frame_keypoints, frame_tracks in zip(keypoints_list, player_tracks)]
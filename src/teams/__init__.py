@@ -0,0 +1 @@
+from src.teams.team_engines import TeamClassificationEngine, ClipTeamEngine, ColorHistogramTeamEngine
@@ -0,0 +1,244 @@
+import logging
+from typing import List
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class TeamClassificationEngine:
+    """
+    Interface of the team classification backends used by TeamAssigner.
+
+    An engine turns player crops (BGR numpy arrays) into team ids (1 or 2), or
+    -1 for a crop it cannot classify yet.
+    """
+
+    def load(self):
+        """
+        Load models or other heavy resources. Called before the first classification.
+        """
+
+    def classify_crops(self, crops: List[np.ndarray]) -> List[int]:
+        raise NotImplementedError
+
+
+class ClipTeamEngine(TeamClassificationEngine):
+    """
+    Zero-shot jersey classification with Fashion-CLIP, one text prompt per team.
+    Accurate but slow on CPU.
+    """
+
+    def __init__(self,
+                 team_1_class_name: str = "white shirt",
+                 team_2_class_name: str = "dark blue shirt",
+                 batch_size: int = 64,
+                 model_name: str = "patrickjohncyh/fashion-clip"):
+        self.team_1_class_name = team_1_class_name
+        self.team_2_class_name = team_2_class_name
+        self.batch_size = batch_size
+        self.model_name = model_name
+        self.model = None
+        self.processor = None
+        self.text_embeds = None
+
+    def load(self):
+        if self.model is not None:
+            return
+
+        import torch
+        from transformers import CLIPProcessor, CLIPModel
+
+        try:
+            self.model = CLIPModel.from_pretrained(self.model_name)
+            self.processor = CLIPProcessor.from_pretrained(self.model_name)
+            logger.info("Fashion-CLIP model loaded successfully.")
+        except Exception as e:
+            logger.error(f"Failed to load model: {e}")
+            raise
+
+        # The two prompts never change: encode them once.
+        classes = [self.team_1_class_name, self.team_2_class_name]
+        with torch.no_grad():
+            text_inputs = self.processor(text=classes, return_tensors="pt", padding=True)
+            text_embeds = self.model.get_text_features(**text_inputs)
+        self.text_embeds = text_embeds / text_embeds.norm(dim=-1, keepdim=True)
+
+    def classify_crops(self, crops: List[np.ndarray]) -> List[int]:
+        import torch
+        from PIL import Image
+
+        self.load()
+        teams = []
+        for i in range(0, len(crops), self.batch_size):
+            images = [Image.fromarray(cv2.cvtColor(crop, cv2.COLOR_BGR2RGB))
+                      for crop in crops[i:i + self.batch_size]]
+            with torch.no_grad():
+                image_inputs = self.processor(images=images, return_tensors="pt")
+                image_embeds = self.model.get_image_features(**image_inputs)
+            image_embeds = image_embeds / image_embeds.norm(dim=-1, keepdim=True)
+            # Same argmax as softmax(logits_per_image): the logit scale is a positive constant.
+            similarity = image_embeds @ self.text_embeds.T
+            teams += (similarity.argmax(dim=1) + 1).tolist()
+        return teams
+
+
+class ColorHistogramTeamEngine(TeamClassificationEngine):
+    """
+    Fast CPU team classification from jersey colors.
+
+    Each crop is reduced to its torso region, described by a normalized HSV
+    histogram, and the histograms are split in two clusters with k-means. The
+    clusters are fitted once and reused afterwards, so team ids stay stable across
+    calls. The brighter cluster is team 1 (matching the default "white shirt"
+    team 1 of the CLIP engine) unless team_1_brighter is False.
+
+    Callers may pass a few crops at a time (one frame or one window), and a small
+    batch can hold a single crop or a single team. Features are therefore
+    collected across calls, and the clusters are only fitted once at least
+    min_fit_crops crops form two separated clusters. Until then crops are
+    classified as -1 (unknown).
+    """
+
+    def __init__(self,
+                 h_bins: int = 16,
+                 s_bins: int = 4,
+                 v_bins: int = 4,
+                 patch_size: int = 16,
+                 team_1_brighter: bool = True,
+                 n_iter: int = 20,
+                 seed: int = 0,
+                 min_fit_crops: int = 32,
+                 min_separation: float = 2.0,
+                 min_cluster_fraction: float = 0.1,
+                 max_buffer: int = 2048):
+        """
+        Args:
+            min_fit_crops: Number of crops collected before fitting the clusters.
+            min_separation: Minimum squared distance between the two centroids,
+                relative to the mean squared distance of the crops to their centroid.
+                Splitting a single team gives about 0.6, two teams far more.
+            min_cluster_fraction: Minimum fraction of the crops in the smaller cluster.
+            max_buffer: Maximum number of crop features kept until the fit (most recent).
+        """
+        self.h_bins = h_bins
+        self.s_bins = s_bins
+        self.v_bins = v_bins
+        self.patch_size = patch_size
+        self.team_1_brighter = team_1_brighter
+        self.n_iter = n_iter
+        self.seed = seed
+        self.min_fit_crops = min_fit_crops
+        self.min_separation = min_separation
+        self.min_cluster_fraction = min_cluster_fraction
+        self.max_buffer = max_buffer
+        self.centroids = None
+        self._buffer = None
+
+    def torso_patches(self, crops: List[np.ndarray]) -> np.ndarray:
+        """
+        Cut the torso of each crop (upper body, away from the bbox borders) and
+        resize it to a fixed patch, returning an (N, patch, patch, 3) HSV array.
+        """
+        size = self.patch_size
+        patches = []
+        for crop in crops:
+            h, w = crop.shape[:2]
+            torso = crop[int(h * 0.15):max(int(h * 0.5), int(h * 0.15) + 1),
+                         int(w * 0.2):max(int(w * 0.8), int(w * 0.2) + 1)]
+            patches.append(cv2.resize(torso, (size, size), interpolation=cv2.INTER_AREA))
+
+        # One color conversion for the whole batch, laid out as a single image.
+        strip = cv2.cvtColor(np.hstack(patches), cv2.COLOR_BGR2HSV)
+        return strip.reshape(size, len(crops), size, 3).transpose(1, 0, 2, 3)
+
+    def features(self, crops: List[np.ndarray]) -> np.ndarray:
+        """
+        Compute the (N, h_bins * s_bins * v_bins) histogram features of the crops.
+        """
+        hsv = self.torso_patches(crops).reshape(len(crops), -1, 3).astype(np.int32)
+        h_idx = hsv[..., 0] * self.h_bins // 180
+        s_idx = hsv[..., 1] * self.s_bins // 256
+        v_idx = hsv[..., 2] * self.v_bins // 256
+        n_bins = self.h_bins * self.s_bins * self.v_bins
+        bins = (h_idx * self.s_bins + s_idx) * self.v_bins + v_idx
+        bins += np.arange(len(crops))[:, None] * n_bins
+
+        histograms = np.bincount(bins.ravel(), minlength=len(crops) * n_bins)
+        histograms = histograms.reshape(len(crops), n_bins).astype(np.float32)
+        histograms /= histograms.sum(axis=1, keepdims=True)
+        # Hellinger embedding: euclidean distance then compares square roots of the bins.
+        return np.sqrt(histograms)
+
+    def fit(self, features: np.ndarray) -> bool:
+        """
+        Fit two k-means centroids (k-means++ initialization) on the features, and
+        keep them only if the features form two separated clusters.
+
+        Returns:
+            bool: Whether the clusters were kept (self.centroids is set).
+        """
+        rng = np.random.default_rng(self.seed)
+        first = features[rng.integers(len(features))]
+        d2 = ((features - first) ** 2).sum(axis=1)
+        if d2.sum() > 0:
+            second = features[rng.choice(len(features), p=d2 / d2.sum())]
+        else:
+            second = first
+        centroids = np.stack([first, second])
+
+        for _ in range(self.n_iter):
+            labels = self._nearest(features, centroids)
+            new_centroids = np.stack([features[labels == k].mean(axis=0) if np.any(labels == k) else centroids[k]
+                                      for k in range(2)])
+            if np.allclose(new_centroids, centroids):
+                break
+            centroids = new_centroids
+
+        labels = self._nearest(features, centroids)
+        if not self._separated(features, centroids, labels):
+            return False
+
+        # Order the clusters so that index 0 is team 1.
+        brightness = self._brightness(centroids)
+        if (brightness[0] < brightness[1]) == self.team_1_brighter:
+            centroids = centroids[::-1]
+        self.centroids = centroids
+        return True
+
+    def _separated(self, features: np.ndarray, centroids: np.ndarray, labels: np.ndarray) -> bool:
+        if np.bincount(labels, minlength=2).min() < self.min_cluster_fraction * len(features):
+            return False
+        within = ((features - centroids[labels]) ** 2).sum(axis=1).mean()
+        between = ((centroids[0] - centroids[1]) ** 2).sum()
+        return between > 0 and between >= self.min_separation * within
+
+    def _brightness(self, centroids: np.ndarray) -> np.ndarray:
+        weights = centroids.reshape(2, self.h_bins, self.s_bins, self.v_bins) ** 2
+        v_values = np.arange(self.v_bins)
+        return (weights.sum(axis=(1, 2)) * v_values).sum(axis=1)
+
+    @staticmethod
+    def _nearest(features: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        distances = ((features[:, None, :] - centroids[None, :, :]) ** 2).sum(axis=2)
+        return distances.argmin(axis=1)
+
+    def classify_crops(self, crops: List[np.ndarray]) -> List[int]:
+        if not crops:
+            return []
+
+        features = self.features(crops)
+        if self.centroids is None:
+            buffered = features if self._buffer is None else np.concatenate([self._buffer, features])
+            self._buffer = buffered[-self.max_buffer:]
+            if len(self._buffer) < self.min_fit_crops or not self.fit(self._buffer):
+                return [-1] * len(crops)
+            self._buffer = None
+        return (self._nearest(features, self.centroids) + 1).tolist()
+
+
+TEAM_ENGINES = {
+    "clip": ClipTeamEngine,
+    "color": ColorHistogramTeamEngine,
+}
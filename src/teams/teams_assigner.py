@@ -1,13 +1,13 @@
-from PIL import Image
-import cv2
-from transformers import CLIPProcessor, CLIPModel
-import torch
 import sys
 import logging
-from typing import Tuple, List, Dict, Optional
+from collections import Counter, defaultdict
+from typing import Tuple, List, Dict, Optional, Union
+
+import numpy as np
 
 sys.path.append('../../')
-from utils import read_stub, save_stub
+from src.utils import read_stub, save_stub
+from src.teams.team_engines import TeamClassificationEngine, ClipTeamEngine, TEAM_ENGINES
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -15,22 +15,74 @@ logger = logging.getLogger(__name__)
 class TeamAssigner:
     def __init__(self,
                  team_1_class_name: str = "white shirt",
-                 team_2_class_name: str = "dark blue shirt"):
+                 team_2_class_name: str = "dark blue shirt",
+                 batch_size: int = 64,
+                 samples_per_track: int = 10,
+                 sample_interval: int = 10,
+                 engine: Union[str, TeamClassificationEngine] = "clip",
+                 forget_after: Optional[int] = None):
+        """
+        Args:
+            team_1_class_name: Text prompt describing team 1 jerseys (CLIP engine).
+            team_2_class_name: Text prompt describing team 2 jerseys (CLIP engine).
+            batch_size: Number of player crops per CLIP forward pass.
+            samples_per_track: Number of crops classified per track before its team is final.
+            sample_interval: A track is sampled once every sample_interval frames it appears in.
+            engine: Team classification backend: "clip" (Fashion-CLIP, accurate),
+                "color" (HSV histogram k-means, fast on CPU) or a TeamClassificationEngine instance.
+            forget_after: In get_player_teams_across_frames, tracks unseen for more than
+                forget_after frames are forgotten (votes and team), which bounds the state
+                of a live stream. None keeps them, as a whole video needs.
+        """
         self.team_colors: Dict[int, str] = {}
-        self.player_team_dict: Dict[int, int] = {}        
+        self.player_team_dict: Dict[int, int] = {}
+        self.track_votes: Dict[int, Counter] = defaultdict(Counter)
+        self.track_appearances: Dict[int, int] = defaultdict(int)
         self.team_1_class_name = team_1_class_name
         self.team_2_class_name = team_2_class_name
-        self.model = None
-        self.processor = None
+        self.samples_per_track = samples_per_track
+        self.sample_interval = sample_interval
+        self.forget_after = forget_after
+        self.frame_num = 0
+        self._last_seen: Dict[int, int] = {}
+
+        if isinstance(engine, TeamClassificationEngine):
+            self.engine = engine
+        elif engine == "clip":
+            self.engine = ClipTeamEngine(team_1_class_name, team_2_class_name, batch_size=batch_size)
+        elif engine in TEAM_ENGINES:
+            self.engine = TEAM_ENGINES[engine]()
+        else:
+            raise ValueError(f"Unknown team engine: {engine}. Expected one of {list(TEAM_ENGINES)}.")
 
     def load_model(self):
-        try:
-            self.model = CLIPModel.from_pretrained("patrickjohncyh/fashion-clip")
-            self.processor = CLIPProcessor.from_pretrained("patrickjohncyh/fashion-clip")
-            logger.info("Fashion-CLIP model loaded successfully.")
-        except Exception as e:
-            logger.error(f"Failed to load model: {e}")
-            raise
+        self.engine.load()
+
+    def crop_player(self, frame, bbox) -> Optional[np.ndarray]:
+        """
+        Crop a player from a frame, clipping the bounding box to the frame.
+
+        Returns:
+            numpy.ndarray or None: The BGR crop, or None if the box is empty.
+        """
+        h, w = frame.shape[:2]
+        x1, y1 = max(0, int(bbox[0])), max(0, int(bbox[1]))
+        x2, y2 = min(w, int(bbox[2])), min(h, int(bbox[3]))
+        if x2 <= x1 or y2 <= y1:
+            return None
+        return frame[y1:y2, x1:x2]
+
+    def classify_crops(self, crops: List[np.ndarray]) -> List[int]:
+        """
+        Classify player crops into teams with the configured engine.
+
+        Args:
+            crops: List of BGR crops.
+
+        Returns:
+            List of team ids (1 or 2, -1 if the engine cannot tell yet), one per crop.
+        """
+        return self.engine.classify_crops(crops)
 
     def get_player_color(self,frame,bbox):
         """
@@ -43,47 +95,83 @@ class TeamAssigner:
         Returns:
             str: The classified jersey color/description.
         """
-        image = frame[int(bbox[1]):int(bbox[3]),int(bbox[0]):int(bbox[2])]
-        print(f"Processing bbox: {bbox}, image shape: {image.shape}")
-
-        
-        rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        pil_image = Image.fromarray(rgb_image)
-        image = pil_image
-
-        classes = [self.team_1_class_name, self.team_2_class_name]
-
-        inputs = self.processor(text=classes, images=image, return_tensors="pt", padding=True)
-
-        outputs = self.model(**inputs)
-        logits_per_image = outputs.logits_per_image
-        probs = logits_per_image.softmax(dim=1) 
-
-
-        class_name=  classes[probs.argmax(dim=1)[0]]
+        self.load_model()
+        crop = self.crop_player(frame, bbox)
+        if crop is None:
+            return self.team_1_class_name
 
-        return class_name
+        team_id = self.classify_crops([crop])[0]
+        return self.team_1_class_name if team_id == 1 else self.team_2_class_name
 
+    def vote_team(self, player_id: int) -> int:
+        """
+        Majority vote over the classified crops of a track (ties go to team 1),
+        -1 (unknown) for a track without votes yet.
+        """
+        votes = self.track_votes[player_id]
+        if not votes[1] and not votes[2]:
+            return -1
+        return 1 if votes[1] >= votes[2] else 2
 
     def get_player_team(self, frame, player_bbox: Tuple[int, int, int, int], player_id: int) -> int:
         if player_id in self.player_team_dict:
             return self.player_team_dict[player_id]
 
-        color = self.get_player_color(frame, player_bbox)
-        if color == self.team_1_class_name:
-            team_id = 1
-        else:
-            team_id = 2
+        self.load_model()
+        crop = self.crop_player(frame, player_bbox)
+        team_id = self.classify_crops([crop])[0] if crop is not None else -1
+        if team_id == -1:
+            # Not classified yet: try again on a later frame.
+            return -1
 
+        self.track_votes[player_id][team_id] += 1
         self.player_team_dict[player_id] = team_id
         return team_id
 
+    def sample_track_crops(self,
+                           video_frames: List,
+                           player_tracks: List[Dict[int, dict]]) -> Tuple[List[int], List[np.ndarray]]:
+        """
+        Pick the crops to classify: every sample_interval-th appearance of each track,
+        until the track has samples_per_track votes (counted across calls).
+
+        Returns:
+            Tuple (player_ids, crops) of the same length.
+        """
+        player_ids, crops = [], []
+        pending = Counter()
+        for frame_num, player_track in enumerate(player_tracks):
+            for player_id, track in player_track.items():
+                appearance = self.track_appearances[player_id]
+                self.track_appearances[player_id] += 1
+
+                n_votes = sum(self.track_votes[player_id].values()) + pending[player_id]
+                if n_votes >= self.samples_per_track or appearance % self.sample_interval != 0:
+                    continue
+
+                crop = self.crop_player(video_frames[frame_num], track['bbox'])
+                if crop is None:
+                    continue
+                player_ids.append(player_id)
+                crops.append(crop)
+                pending[player_id] += 1
+        return player_ids, crops
+
     def get_player_teams_across_frames(self,
                                        video_frames: List,
                                        player_tracks: List[Dict[int, dict]],
                                        read_from_stub: bool = False,
                                        stub_path: Optional[str] = None) -> List[Dict[int, int]]:
-
+        """
+        Assign a team to every player of every frame.
+
+        Crops are sampled per track and classified in batches, then each track gets
+        the majority team of its samples, so the cost scales with the number of
+        tracks rather than the number of player-frames. Votes are kept across calls,
+        so successive windows of a video refine the same tracks. Tracks without a
+        team yet (no classified crop) are left out of the per-frame dicts, as in
+        TrackTable.teams_view, so every pipeline mode represents them the same way.
+        """
         player_assignment = read_stub(read_from_stub, stub_path)
         if player_assignment is not None and len(player_assignment) == len(video_frames):
             logger.info("Using cached team assignments.")
@@ -91,15 +179,33 @@ class TeamAssigner:
 
         self.load_model()
 
-        player_assignment = []
-        for frame_num, player_track in enumerate(player_tracks):
-            player_assignment.append({})
-            if frame_num % 50 == 0:
-                self.player_team_dict.clear()
+        player_ids, crops = self.sample_track_crops(video_frames, player_tracks)
+        logger.info(f"Classifying {len(crops)} player crops for team assignment.")
+        for player_id, team_id in zip(player_ids, self.classify_crops(crops)):
+            # Unknown crops are not votes, so the track is sampled again later.
+            if team_id != -1:
+                self.track_votes[player_id][team_id] += 1
 
-            for player_id, track in player_track.items():
-                team = self.get_player_team(video_frames[frame_num], track['bbox'], player_id)
-                player_assignment[frame_num][player_id] = team
+        for player_id in set(player_ids):
+            team_id = self.vote_team(player_id)
+            if team_id != -1:
+                self.player_team_dict[player_id] = team_id
+
+        player_assignment = []
+        for player_track in player_tracks:
+            player_assignment.append({player_id: self.player_team_dict[player_id]
+                                      for player_id in player_track if player_id in self.player_team_dict})
+            for player_id in player_track:
+                self._last_seen[player_id] = self.frame_num
+            self.frame_num += 1
+
+        if self.forget_after is not None:
+            last_frame = self.frame_num - 1
+            for player_id in [p for p, last in self._last_seen.items() if last_frame - last > self.forget_after]:
+                del self._last_seen[player_id]
+                self.track_votes.pop(player_id, None)
+                self.track_appearances.pop(player_id, None)
+                self.player_team_dict.pop(player_id, None)
 
         save_stub(stub_path, player_assignment)
         return player_assignment
@@ -0,0 +1,303 @@
+import itertools
+
+import numpy as np
+
+from src.utils import iou_matrix
+from src.tracks.embeddings import embed_detections
+
+
+class TrackerBackend:
+    """
+    Interface of the multi-object tracking backends used by PlayerTracker.
+
+    A backend receives the detections of one frame and returns the tracks of that
+    frame. It keeps its state between calls, so consecutive calls (or windows of
+    a streamed video) continue the same tracks.
+    """
+
+    @property
+    def min_confidence(self):
+        """
+        Lowest detection confidence the backend uses, to run the detector with.
+        """
+        return self.conf_threshold
+
+    def update(self, detections, frame, embeds=None):
+        """
+        Args:
+            detections (np.ndarray): (N, 5) array of [x1, y1, x2, y2, conf].
+            frame (np.ndarray): The frame (only used by appearance-based backends).
+            embeds (np.ndarray, optional): Precomputed appearance embeddings of the
+                detections (see embed()), used instead of embedding the frame's crops.
+
+        Returns:
+            dict: Track ID mapped to {"bbox": [x1, y1, x2, y2]} (ints).
+        """
+        raise NotImplementedError
+
+    def embed(self, frames, detections):
+        """
+        Appearance embeddings of the detections of many frames, computed in batches
+        across frames, for update(embeds=...). None for motion-only backends.
+        """
+        return None
+
+
+class DeepSortBackend(TrackerBackend):
+    """
+    Deep SORT: Kalman motion model and appearance embeddings of every detection
+    crop. Robust to occlusions, but the embedder runs on every detection of every
+    frame. embed() computes those embeddings in large batches across frames.
+    """
+
+    def __init__(self, max_age=30, conf_threshold=0.5, class_name='player', embed_batch_size=256):
+        from deep_sort_realtime.deepsort_tracker import DeepSort
+
+        self.tracker = DeepSort(max_age=max_age)
+        self.conf_threshold = conf_threshold
+        self.class_name = class_name
+        self.embed_batch_size = embed_batch_size
+        embedder = self.tracker.embedder
+        if embedder is not None and hasattr(embedder, "max_batch_size"):
+            # The embedder splits each predict() call in batches of max_batch_size crops.
+            embedder.max_batch_size = max(embedder.max_batch_size, embed_batch_size)
+
+    def _detections_input(self, detections):
+        detections_input = []
+        for x1, y1, x2, y2, score in detections:
+            if score >= self.conf_threshold:
+                x1, y1, x2, y2 = map(int, (x1, y1, x2, y2))
+                w, h = x2 - x1, y2 - y1
+                # DeepSort drops empty boxes itself, which would misalign precomputed embeds.
+                if w > 0 and h > 0:
+                    detections_input.append([[x1, y1, w, h], float(score), self.class_name])
+        return detections_input
+
+    def embed(self, frames, detections):
+        return embed_detections(self.tracker.embedder, frames,
+                                [self._detections_input(frame_detections) for frame_detections in detections],
+                                batch_size=self.embed_batch_size)
+
+    def update(self, detections, frame, embeds=None):
+        detections_input = self._detections_input(detections)
+
+        tracks_frame = {}
+        for t in self.tracker.update_tracks(detections_input, embeds=embeds, frame=frame):
+            if not t.is_confirmed():
+                continue
+            l, t_, w, h = map(int, t.to_tlwh())
+            tracks_frame[t.track_id] = {"bbox": [l, t_, l + w, t_ + h]}
+        return tracks_frame
+
+
+def linear_assignment(cost, max_cost):
+    """
+    Minimum cost one-to-one assignment between the rows and columns of cost,
+    ignoring pairs costing more than max_cost.
+
+    Uses scipy's Hungarian solver when scipy is installed, otherwise a greedy
+    assignment by increasing cost (same result when the matches are unambiguous).
+
+    Returns:
+        tuple: (matches as a list of (row, col), unmatched rows, unmatched cols).
+    """
+    n_rows, n_cols = cost.shape
+    if n_rows == 0 or n_cols == 0:
+        return [], list(range(n_rows)), list(range(n_cols))
+
+    try:
+        from scipy.optimize import linear_sum_assignment
+        rows, cols = linear_sum_assignment(np.where(cost > max_cost, max_cost + 1e5, cost))
+        pairs = [(r, c) for r, c in zip(rows.tolist(), cols.tolist()) if cost[r, c] <= max_cost]
+    except ImportError:
+        pairs, used_rows, used_cols = [], set(), set()
+        for flat_index in np.argsort(cost, axis=None, kind="stable"):
+            r, c = divmod(int(flat_index), n_cols)
+            if cost[r, c] > max_cost:
+                break
+            if r in used_rows or c in used_cols:
+                continue
+            pairs.append((r, c))
+            used_rows.add(r)
+            used_cols.add(c)
+
+    matched_rows = {r for r, _ in pairs}
+    matched_cols = {c for _, c in pairs}
+    return (pairs,
+            [r for r in range(n_rows) if r not in matched_rows],
+            [c for c in range(n_cols) if c not in matched_cols])
+
+
+class _KalmanTrack:
+    """
+    Constant-velocity Kalman filter on a box [cx, cy, w, h], with noise scaled by
+    the box height (as in SORT/ByteTrack).
+    """
+
+    std_position = 1 / 20
+    std_velocity = 1 / 160
+
+    def __init__(self, bbox, score):
+        self.track_id = None
+        self.score = score
+        self.hits = 1
+        self.time_since_update = 0
+        self.confirmed = False
+
+        measurement = self._to_cxcywh(bbox)
+        self.mean = np.concatenate([measurement, np.zeros(4)])
+        h = measurement[3]
+        std = np.array([2 * self.std_position * h] * 4 + [10 * self.std_velocity * h] * 4)
+        self.covariance = np.diag(std ** 2)
+
+    @staticmethod
+    def _to_cxcywh(bbox):
+        x1, y1, x2, y2 = bbox
+        return np.array([(x1 + x2) / 2, (y1 + y2) / 2, x2 - x1, y2 - y1], dtype=np.float64)
+
+    @property
+    def bbox(self):
+        cx, cy, w, h = self.mean[:4]
+        return np.array([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2])
+
+    def predict(self):
+        transition = np.eye(8)
+        transition[:4, 4:] = np.eye(4)
+        h = self.mean[3]
+        std = np.array([self.std_position * h] * 4 + [self.std_velocity * h] * 4)
+        self.mean = transition @ self.mean
+        self.covariance = transition @ self.covariance @ transition.T + np.diag(std ** 2)
+        self.time_since_update += 1
+
+    def update(self, bbox, score):
+        h = self.mean[3]
+        measurement_noise = np.diag(np.full(4, (self.std_position * h) ** 2))
+        projected_covariance = self.covariance[:4, :4] + measurement_noise
+        gain = self.covariance[:, :4] @ np.linalg.inv(projected_covariance)
+        self.mean = self.mean + gain @ (self._to_cxcywh(bbox) - self.mean[:4])
+        self.covariance = self.covariance - gain @ self.covariance[:4, :]
+
+        self.score = score
+        self.hits += 1
+        self.time_since_update = 0
+
+
+class ByteTrackBackend(TrackerBackend):
+    """
+    Motion-only tracker with ByteTrack's two-stage association: no embedder, the
+    only per-frame work is a Kalman prediction per track and IoU matrices.
+
+    1. High-confidence detections are matched to every track (tracked or lost)
+       by IoU.
+    2. Low-confidence detections, which are usually occluded players, are matched
+       to the tracked tracks left over by the first stage, keeping them alive
+       through occlusions.
+    3. New tracks must be matched again on the next frame to be confirmed;
+       unmatched high-confidence detections start new tracks.
+
+    Lost tracks are kept max_age frames for re-association. Only the tracks
+    matched in the current frame are returned, and track IDs are strings as with
+    Deep SORT.
+    """
+
+    def __init__(self, max_age=30, conf_threshold=0.5, low_threshold=0.1, new_track_threshold=None,
+                 match_iou=0.2, low_match_iou=0.5, unconfirmed_match_iou=0.3):
+        """
+        Args:
+            max_age (int): Frames a lost track is kept for re-association.
+            conf_threshold (float): Minimum confidence of the first (high-confidence) association stage.
+            low_threshold (float): Minimum confidence of the second association stage.
+            new_track_threshold (float, optional): Minimum confidence to start a new
+                track (conf_threshold + 0.1 by default).
+            match_iou (float): Minimum IoU of a first stage match.
+            low_match_iou (float): Minimum IoU of a second stage match.
+            unconfirmed_match_iou (float): Minimum IoU to confirm a new track.
+        """
+        self.max_age = max_age
+        self.conf_threshold = conf_threshold
+        self.low_threshold = low_threshold
+        self.new_track_threshold = conf_threshold + 0.1 if new_track_threshold is None else new_track_threshold
+        self.match_iou = match_iou
+        self.low_match_iou = low_match_iou
+        self.unconfirmed_match_iou = unconfirmed_match_iou
+        self.reset()
+
+    @property
+    def min_confidence(self):
+        return self.low_threshold
+
+    def reset(self):
+        self.tracks = []
+        self._next_id = itertools.count(1)
+        self._frame_num = 0
+
+    def _confirm(self, track):
+        # IDs are only given to confirmed tracks, so one-frame false positives do not use any.
+        track.confirmed = True
+        track.track_id = str(next(self._next_id))
+
+    @staticmethod
+    def _match(tracks, boxes, min_iou):
+        if not tracks or not len(boxes):
+            return [], list(range(len(tracks))), list(range(len(boxes)))
+        cost = 1 - iou_matrix(np.array([t.bbox for t in tracks]), boxes)
+        return linear_assignment(cost, 1 - min_iou)
+
+    def update(self, detections, frame=None, embeds=None):
+        detections = np.asarray(detections, dtype=np.float64).reshape(-1, 5)
+        scores = detections[:, 4]
+        high = detections[scores >= self.conf_threshold]
+        low = detections[(scores >= self.low_threshold) & (scores < self.conf_threshold)]
+
+        for track in self.tracks:
+            track.predict()
+
+        confirmed = [t for t in self.tracks if t.confirmed]
+        unconfirmed = [t for t in self.tracks if not t.confirmed]
+        updated = []
+
+        # Stage 1: high-confidence detections against every confirmed track.
+        matches, unmatched_tracks, unmatched_high = self._match(confirmed, high[:, :4], self.match_iou)
+        for t, d in matches:
+            confirmed[t].update(high[d, :4], high[d, 4])
+            updated.append(confirmed[t])
+
+        # Stage 2: low-confidence detections against the tracks still tracked last frame.
+        remaining = [confirmed[t] for t in unmatched_tracks if confirmed[t].time_since_update == 1]
+        matches, _, _ = self._match(remaining, low[:, :4], self.low_match_iou)
+        for t, d in matches:
+            remaining[t].update(low[d, :4], low[d, 4])
+            updated.append(remaining[t])
+
+        # New tracks of the previous frame are confirmed by a second high-confidence match.
+        high = high[unmatched_high]
+        matches, _, unmatched_high = self._match(unconfirmed, high[:, :4], self.unconfirmed_match_iou)
+        for t, d in matches:
+            unconfirmed[t].update(high[d, :4], high[d, 4])
+            self._confirm(unconfirmed[t])
+            updated.append(unconfirmed[t])
+
+        new_tracks = []
+        for d in unmatched_high:
+            if high[d, 4] >= self.new_track_threshold:
+                track = _KalmanTrack(high[d, :4], high[d, 4])
+                # Tracks of the first frame are confirmed at once, as in ByteTrack.
+                if self._frame_num == 0:
+                    self._confirm(track)
+                new_tracks.append(track)
+
+        self.tracks = [t for t in confirmed if t.time_since_update <= self.max_age] + \
+                      [t for t in unconfirmed if t.confirmed] + new_tracks
+        self._frame_num += 1
+
+        tracks_frame = {}
+        for track in updated + [t for t in new_tracks if t.confirmed]:
+            x1, y1, x2, y2 = map(int, track.bbox)
+            tracks_frame[track.track_id] = {"bbox": [x1, y1, x2, y2]}
+        return tracks_frame
+
+
+TRACKER_BACKENDS = {
+    "deepsort": DeepSortBackend,
+    "bytetrack": ByteTrackBackend,
+}
@@ -1,16 +1,45 @@
-from ultralytics import YOLO
-from deep_sort_realtime.deepsort_tracker import DeepSort
 import numpy as np
-import pandas as pd
 import sys
+from collections import deque
 sys.path.append('../../')
-from utils import read_stub, save_stub
+from src.utils import read_stub, save_stub, load_yolo_model
+from src.detection.shared_detector import split_detections_by_class
+from src.tracks.single_object_tracker import SingleObjectTracker
+from src.tracks.backends import DeepSortBackend
+
+BALL_TRACKER_ENGINES = ("deepsort", "single")
 
 
 class BallTracker:
-    def __init__(self, model_path, max_age=15, conf_threshold=0.5):
-        self.model = YOLO(model_path)
-        self.tracker = DeepSort(max_age=max_age)
+    ball_class_name = 'Ball'
+
+    def __init__(self, model_path=None, max_age=15, conf_threshold=0.5, detector=None, engine="deepsort"):
+        """
+        Args:
+            model_path (str, optional): Path to the YOLO model weights. Not needed
+                (and not loaded) when a shared detector is given.
+            max_age (int): Max number of frames to keep a lost track.
+            conf_threshold (float): Confidence threshold for detections.
+            detector (SharedDetector, optional): Shared detection stage providing the
+                ball detections.
+            engine (str): Tracking engine: "deepsort" (DeepSort with its re-ID
+                embedder) or "single" (SingleObjectTracker: motion-only, one ball,
+                no embedder).
+        """
+        if detector is None and model_path is None:
+            raise ValueError("Either model_path or detector must be provided.")
+        if engine not in BALL_TRACKER_ENGINES:
+            raise ValueError(f"Unknown ball tracker engine: {engine}. Expected one of {list(BALL_TRACKER_ENGINES)}.")
+
+        self.detector = detector
+        # ultralytics is only imported when the tracker runs its own model, so the
+        # smoothers and static helpers of this module do not pull it in.
+        self.model = load_yolo_model(model_path) if detector is None else None
+        self.engine = engine
+        if engine == "single":
+            self.tracker = SingleObjectTracker(max_age=max_age, conf_threshold=conf_threshold)
+        else:
+            self.tracker = DeepSortBackend(max_age=max_age, conf_threshold=conf_threshold, class_name='ball')
         self.conf_threshold = conf_threshold
 
     def detect_frames(self, frames):
@@ -21,78 +50,299 @@ class BallTracker:
             detections += detections_batch
         return detections
 
+    def detect_balls(self, frames):
+        """
+        Detect balls on each frame, through the shared detector if there is one.
+
+        Returns:
+            list: One np.ndarray (N, 5) of [x1, y1, x2, y2, conf] per frame.
+        """
+        empty = np.zeros((0, 5), dtype=np.float32)
+        if self.detector is not None:
+            ball_cls_id = self.detector.class_id(self.ball_class_name)
+            if ball_cls_id is None:
+                return [empty] * len(frames)
+            return self.detector.detections_for(frames, ball_cls_id)
+
+        ball_detections = []
+        for detection in self.detect_frames(frames):
+            cls_names_inv = {v: k for k, v in detection.names.items()}
+            ball_cls_id = cls_names_inv.get(self.ball_class_name)
+            ball_detections.append(split_detections_by_class(detection).get(ball_cls_id, empty))
+        return ball_detections
+
     def get_object_tracks(self, frames, read_from_stub=False, stub_path=None):
         tracks = read_stub(read_from_stub, stub_path)
         if tracks is not None and len(tracks) == len(frames):
             return tracks
 
-        detections = self.detect_frames(frames)
-        print(detections)
-        result_tracks = []
-
-        for i, detection in enumerate(detections):
-            frame = frames[i]
-            frame_tracks = {}
-
-            cls_names = detection.names
-            cls_names_inv = {v: k for k, v in cls_names.items()}
-            ball_cls_id = cls_names_inv.get('Ball')
-
-            det_inputs = []
-            for box, conf, cls in zip(
-                detection.boxes.xyxy.cpu().numpy(),
-                detection.boxes.conf.cpu().numpy(),
-                detection.boxes.cls.cpu().numpy()
-            ):
-                if cls == ball_cls_id and conf >= self.conf_threshold:
-                    x1, y1, x2, y2 = map(int, box)
-                    w, h = x2 - x1, y2 - y1
-                    det_inputs.append([[x1, y1, w, h], float(conf), 'ball'])
-
-            updated_tracks = self.tracker.update_tracks(det_inputs, frame=frame)
-
-            for track in updated_tracks:
-                if not track.is_confirmed():
-                    continue
-                tid = track.track_id
-                x, y, w, h = map(int, track.to_tlwh())
-                frame_tracks[tid] = {"bbox": [x, y, x + w, y + h]}
-
-            result_tracks.append(frame_tracks)
-
+        result_tracks = self.track_detections(frames, **self.detect_and_embed(frames))
         save_stub(stub_path, result_tracks)
         return result_tracks
 
-    def remove_wrong_detections(self, ball_positions, max_distance=25):
+    def detect_and_embed(self, frames):
+        """
+        Detect balls and, with the DeepSort engine, compute the appearance embeddings
+        of the detections in batches across frames. The result does not depend on
+        max_age, so it can be cached and reused to track again.
+
+        Returns:
+            dict: {"detections": per-frame detections, "embeddings": per-frame embeddings or None}.
+        """
+        detections = self.detect_balls(frames)
+        embeddings = self.tracker.embed(frames, detections) if self.engine == "deepsort" else None
+        return {"detections": detections, "embeddings": embeddings}
+
+    def track_detections(self, frames, detections, embeddings=None):
+        """
+        Run the tracking engine on per-frame ball detections.
+
+        Args:
+            frames (list): Video frames (used by the DeepSort embedder only).
+            detections (list): One np.ndarray (N, 5) of [x1, y1, x2, y2, conf] per frame.
+            embeddings (list, optional): Precomputed DeepSort embeddings of the detections.
+
+        Returns:
+            list: Per-frame dicts mapping ball track IDs to {"bbox": [x1, y1, x2, y2]}.
+        """
+        if self.engine == "single":
+            return [self.tracker.update(detection) for detection in detections]
+
+        if embeddings is None:
+            embeddings = [None] * len(detections)
+        return [self.tracker.update(detection, frame, embeds=embeds)
+                for detection, frame, embeds in zip(detections, frames, embeddings)]
+
+    @staticmethod
+    def remove_wrong_detections(ball_positions, max_distance=25):
+        """
+        Drop the ball detections that moved more than max_distance pixels per frame
+        from the last kept detection.
+
+        Args:
+            ball_positions (list): Per-frame dicts mapping ball IDs to {"bbox": [...]}.
+            max_distance (float): Maximum displacement of the ball per frame.
+
+        Returns:
+            list: A new list where the rejected frames are empty dicts; the input is
+            left untouched.
+        """
+        filtered_positions = list(ball_positions)
         last_good_frame_index = -1
+        last_position = None
 
-        for i in range(len(ball_positions)):
-            current = list(ball_positions[i].values())
-            if not current:
+        for i, frame_balls in enumerate(ball_positions):
+            if not frame_balls:
                 continue
-            current_box = current[0]['bbox']
+            position = np.asarray(next(iter(frame_balls.values()))['bbox'][:2], dtype=np.float64)
 
-            if last_good_frame_index == -1:
-                last_good_frame_index = i
-                continue
+            if last_good_frame_index != -1:
+                dist = np.hypot(*(position - last_position))
+                if dist > max_distance * (i - last_good_frame_index):
+                    filtered_positions[i] = {}
+                    continue
+
+            last_good_frame_index = i
+            last_position = position
+
+        return filtered_positions
+
+    @staticmethod
+    def interpolate_ball_positions(ball_positions):
+        """
+        Fill the frames without ball by linear interpolation between the surrounding
+        detections. Frames after the last detection keep it and frames before the
+        first one take it (the former pandas interpolate().bfill()).
+
+        Args:
+            ball_positions (list): Per-frame dicts mapping ball IDs to {"bbox": [...]}.
+
+        Returns:
+            list: Per-frame dicts {1: {"bbox": [x1, y1, x2, y2]}}.
+        """
+        n_frames = len(ball_positions)
+        bboxes = np.full((n_frames, 4), np.nan)
+        for i, frame_balls in enumerate(ball_positions):
+            if frame_balls:
+                bboxes[i] = next(iter(frame_balls.values()))['bbox']
+
+        frames = np.arange(n_frames)
+        for c in range(4):
+            detected = ~np.isnan(bboxes[:, c])
+            if detected.any():
+                bboxes[:, c] = np.interp(frames, frames[detected], bboxes[detected, c])
+
+        return [{1: {"bbox": bbox}} for bbox in bboxes.tolist()]
+
+
+class OnlineBallSmoother:
+    """
+    Online counterpart of BallTracker.remove_wrong_detections followed by
+    BallTracker.interpolate_ball_positions, for streams processed frame by frame.
+
+    Outliers are rejected causally, exactly as remove_wrong_detections does.
+    Gaps are filled by linear interpolation with a bounded look-ahead: each frame
+    is output lookahead frames after it was received, so a gap of up to
+    lookahead frames is interpolated as in the whole-video method, and a longer
+    gap keeps the last known position. The state is at most lookahead + 1 boxes.
+    """
+
+    def __init__(self, max_distance=25, lookahead=10):
+        self.max_distance = max_distance
+        self.lookahead = lookahead
+        self.reset()
+
+    def reset(self):
+        self._frame_num = 0
+        self._emitted = 0
+        self._pending = deque()
+        self._last_good = None
+        self._last_box = None
+        self._frames_since_last_box = 0
+
+    def update(self, ball_dict):
+        """
+        Add the ball detections of the next frame.
+
+        Args:
+            ball_dict (dict): Ball tracks of the frame, mapping ball_id to {"bbox": [...]}.
+
+        Returns:
+            tuple or None: (frame_num, {1: {"bbox": [...]}} or {}) of the frame received
+            lookahead frames earlier, or None while the first frames are buffered.
+        """
+        frame_num = self._frame_num
+        self._frame_num += 1
+
+        current = list(ball_dict.values())
+        box = current[0]['bbox'] if current else None
+        if box is not None:
+            if self._last_good is not None:
+                last_frame, last_box = self._last_good
+                dist = np.linalg.norm(np.array(box[:2]) - np.array(last_box[:2]))
+                if dist > self.max_distance * (frame_num - last_frame):
+                    box = None
+            if box is not None:
+                self._last_good = (frame_num, box)
+
+        self._pending.append(box)
+        if len(self._pending) <= self.lookahead:
+            return None
+        return self._emit()
+
+    def flush(self):
+        """
+        Output the frames still buffered, at the end of the stream.
+
+        Returns:
+            list: (frame_num, ball dict) of the remaining frames.
+        """
+        remaining = []
+        while self._pending:
+            remaining.append(self._emit())
+        return remaining
+
+    def _emit(self):
+        frame_num = self._emitted
+        self._emitted += 1
+        box = self._pending.popleft()
+
+        if box is not None:
+            self._last_box = self._observe(box)
+            self._frames_since_last_box = 0
+            return frame_num, {1: {"bbox": list(self._last_box)}}
+
+        next_index, next_box = next(((i, b) for i, b in enumerate(self._pending) if b is not None), (None, None))
+        if self._last_box is None:
+            # Before the first detection: back fill with the next one, if it is within the look-ahead.
+            return frame_num, ({1: {"bbox": list(next_box)}} if next_box is not None else {})
+
+        self._frames_since_last_box += 1
+        if next_box is None:
+            return frame_num, self._extrapolate()
+
+        span = self._frames_since_last_box + next_index + 1
+        weight = self._frames_since_last_box / span
+        interpolated = [float(a + (b - a) * weight) for a, b in zip(self._last_box, next_box)]
+        return frame_num, {1: {"bbox": interpolated}}
+
+    def _observe(self, box):
+        # Box output for a frame with a kept detection.
+        return box
+
+    def _extrapolate(self):
+        # Ball dict of a frame in a gap whose end is beyond the look-ahead.
+        return {1: {"bbox": list(self._last_box)}}
+
+
+class KalmanBallSmoother(OnlineBallSmoother):
+    """
+    OnlineBallSmoother with a constant-velocity Kalman filter on the ball center.
+
+    Kept detections are replaced by the filtered center (with the detected box
+    size), which removes the detector jitter. Gaps closed within the look-ahead
+    are interpolated from the last filtered box to the raw next detection (it is
+    only filtered when its own frame is output); a gap that is still open is
+    filled by following the estimated velocity for up to max_gap frames, after
+    which the ball is reported lost (empty dict) until it is detected again.
+    """
+
+    def __init__(self, max_distance=25, lookahead=10, max_gap=15, process_noise=1.0, measurement_noise=4.0):
+        """
+        Args:
+            max_distance (float): Maximum displacement of the ball per frame.
+            lookahead (int): Frames of delay allowed to close a gap by interpolation.
+            max_gap (int): Frames of an open gap filled by velocity extrapolation.
+            process_noise (float): Standard deviation of the ball acceleration, in pixels per frame².
+            measurement_noise (float): Standard deviation of the detected center, in pixels.
+        """
+        self.max_gap = max_gap
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+        super().__init__(max_distance=max_distance, lookahead=lookahead)
+
+    def reset(self):
+        super().reset()
+        self._state = None  # [cx, cy, vx, vy]
+        self._covariance = None
+
+    def _predict(self, steps):
+        transition = np.eye(4)
+        transition[0, 2] = transition[1, 3] = steps
+        # Discrete white noise acceleration over the elapsed frames.
+        q = self.process_noise ** 2
+        noise_1d = q * np.array([[steps ** 4 / 4, steps ** 3 / 2],
+                                 [steps ** 3 / 2, steps ** 2]])
+        noise = np.zeros((4, 4))
+        noise[np.ix_([0, 2], [0, 2])] = noise_1d
+        noise[np.ix_([1, 3], [1, 3])] = noise_1d
+
+        self._state = transition @ self._state
+        self._covariance = transition @ self._covariance @ transition.T + noise
+
+    def _observe(self, box):
+        x1, y1, x2, y2 = box
+        center = np.array([(x1 + x2) / 2, (y1 + y2) / 2], dtype=np.float64)
+
+        if self._state is None:
+            self._state = np.array([center[0], center[1], 0.0, 0.0])
+            self._covariance = np.diag([self.measurement_noise ** 2] * 2 + [self.max_distance ** 2] * 2)
+        else:
+            self._predict(self._frames_since_last_box + 1)
+            innovation = center - self._state[:2]
+            gain = self._covariance[:, :2] @ np.linalg.inv(
+                self._covariance[:2, :2] + np.eye(2) * self.measurement_noise ** 2)
+            self._state = self._state + gain @ innovation
+            self._covariance = self._covariance - gain @ self._covariance[:2, :]
+
+        half_w, half_h = (x2 - x1) / 2, (y2 - y1) / 2
+        cx, cy = self._state[:2]
+        return [float(cx - half_w), float(cy - half_h), float(cx + half_w), float(cy + half_h)]
 
-            last_box = list(ball_positions[last_good_frame_index].values())[0]['bbox']
-            dist = np.linalg.norm(np.array(current_box[:2]) - np.array(last_box[:2]))
-            if dist > max_distance * (i - last_good_frame_index):
-                ball_positions[i] = {}
-            else:
-                last_good_frame_index = i
-
-        return ball_positions
-
-    def interpolate_ball_positions(self, ball_positions):
-        bboxes = []
-        for d in ball_positions:
-            if d:
-                bbox = list(d.values())[0]['bbox']
-            else:
-                bbox = [np.nan] * 4
-            bboxes.append(bbox)
-
-        df = pd.DataFrame(bboxes, columns=['x1', 'y1', 'x2', 'y2']).interpolate().bfill()
-        return [{1: {"bbox": row.tolist()}} for _, row in df.iterrows()]
+    def _extrapolate(self):
+        if self._frames_since_last_box > self.max_gap:
+            return {}
+        shift = self._state[2:] * self._frames_since_last_box
+        x1, y1, x2, y2 = self._last_box
+        return {1: {"bbox": [float(x1 + shift[0]), float(y1 + shift[1]),
+                             float(x2 + shift[0]), float(y2 + shift[1])]}}
@@ -0,0 +1,52 @@
+import numpy as np
+
+
+def crop_detections(frame, detections_input):
+    """
+    Crop the detections of a frame, clipped to the frame, as DeepSort.crop_bb does.
+
+    Args:
+        frame (np.ndarray): The frame.
+        detections_input (list): DeepSort raw detections [[left, top, w, h], conf, class].
+
+    Returns:
+        list: One crop (a view of the frame) per detection.
+    """
+    im_height, im_width = frame.shape[:2]
+    crops = []
+    for (left, top, w, h), _, _ in detections_input:
+        left, top, w, h = int(left), int(top), int(w), int(h)
+        crops.append(frame[max(0, top):min(im_height, top + h), max(0, left):min(im_width, left + w)])
+    return crops
+
+
+def embed_detections(embedder, frames, detections_inputs, batch_size=256):
+    """
+    Compute the appearance embeddings of the detections of many frames at once.
+
+    DeepSort embeds the crops of one frame per update_tracks() call. Here the crops
+    of all the frames are gathered and sent to the embedder in batches of
+    batch_size crops, then split back per frame, ready for update_tracks(embeds=...).
+
+    Args:
+        embedder: DeepSort embedder (with a predict(list of crops) method).
+        frames (list): Video frames.
+        detections_inputs (list): DeepSort raw detections of each frame.
+        batch_size (int): Number of crops per embedder call.
+
+    Returns:
+        list: One np.ndarray (N, D) of embeddings per frame.
+    """
+    crops, counts = [], []
+    for frame, detections_input in zip(frames, detections_inputs):
+        frame_crops = crop_detections(frame, detections_input)
+        crops += frame_crops
+        counts.append(len(frame_crops))
+
+    embeds = []
+    for i in range(0, len(crops), batch_size):
+        embeds += list(embedder.predict(crops[i:i + batch_size]))
+    embeds = np.asarray(embeds, dtype=np.float32)
+
+    offsets = np.cumsum([0] + counts)
+    return [embeds[start:end] for start, end in zip(offsets[:-1], offsets[1:])]
@@ -1,30 +1,65 @@
-from ultralytics import YOLO
-from deep_sort_realtime.deepsort_tracker import DeepSort
+import logging
+import numpy as np
 
 
 import sys
 sys.path.append('../../')
 
-from src.utils import read_stub, save_stub
+from src.utils import read_stub, save_stub, load_yolo_model, auto_batch_size, predict_in_batches
+from src.detection.shared_detector import split_detections_by_class
+from src.tracks.backends import TrackerBackend, TRACKER_BACKENDS
+
+logger = logging.getLogger(__name__)
 
 
 class PlayerTracker:
     """
-    A class for player detection and tracking using YOLOv8 and Deep SORT.
+    A class for player detection and tracking using YOLOv8 and a tracking
+    backend (Deep SORT by default).
     """
 
-    def __init__(self, model_path, max_age=30, conf_threshold=0.5):
+    player_class_id = 4
+
+    def __init__(self, model_path=None, max_age=30, conf_threshold=0.5, batch_size=None,
+                 half=False, export_format=None, imgsz=640, detector=None, backend="deepsort"):
         """
-        Initialize the YOLOv8 model and Deep SORT tracker.
+        Initialize the YOLOv8 model and the tracking backend.
 
         Args:
-            model_path (str): Path to the YOLO model weights.
+            model_path (str, optional): Path to the YOLO model weights. Not needed
+                (and not loaded) when a shared detector is given.
             max_age (int): Max number of frames to keep a lost track.
             conf_threshold (float): Confidence threshold for detections.
+            batch_size (int, optional): Number of frames per inference batch.
+                If None, it is picked from the available CPU memory.
+            half (bool): Use half precision inference (CUDA, or an OpenVINO export on CPU).
+            export_format (str, optional): "onnx" or "openvino" to run inference
+                through an exported model instead of the PyTorch weights.
+            imgsz (int): Inference image size.
+            detector (SharedDetector, optional): Shared detection stage providing the
+                player detections, so the detection model runs once for all consumers.
+            backend (str or TrackerBackend): Tracking backend: "deepsort" (appearance
+                embeddings, robust but slow on CPU), "bytetrack" (motion-only two-stage
+                IoU association, fast) or a TrackerBackend instance.
         """
-        self.model = YOLO(model_path)
-        self.tracker = DeepSort(max_age=max_age)
+        if detector is None and model_path is None:
+            raise ValueError("Either model_path or detector must be provided.")
+
+        self.detector = detector
+        self.model = None
+        if detector is None:
+            self.model = load_yolo_model(model_path, export_format=export_format, half=half, imgsz=imgsz)
+        if isinstance(backend, TrackerBackend):
+            self.tracker = backend
+        elif backend in TRACKER_BACKENDS:
+            self.tracker = TRACKER_BACKENDS[backend](max_age=max_age, conf_threshold=conf_threshold)
+        else:
+            raise ValueError(f"Unknown tracker backend: {backend}. Expected one of {list(TRACKER_BACKENDS)}.")
         self.conf_threshold = conf_threshold
+        self.batch_size = batch_size
+        self.half = half
+        self.imgsz = imgsz
+        self.detection_fps = None
 
     def process_batches(self, frames):
         """
@@ -36,13 +71,53 @@ class PlayerTracker:
         Returns:
             list: YOLO detection results.
         """
-        detections = []
-        for frame in frames:
-            result = self.model.predict(frame, conf=self.conf_threshold, verbose=False)
-            detections.append(result[0])
+        if not frames:
+            return []
+
+        batch_size = self.batch_size or auto_batch_size(frames[0].shape, imgsz=self.imgsz)
+        detections, self.detection_fps = predict_in_batches(self.model, frames, batch_size,
+                                                            conf=self.tracker.min_confidence,
+                                                            half=self.half,
+                                                            imgsz=self.imgsz)
+
+        if self.detection_fps is not None:
+            logger.info(f"Player detection: {len(frames)} frames at {self.detection_fps:.1f} FPS "
+                        f"(batch size {batch_size})")
         return detections
 
-    def track_players(self, frames, use_cache=False, cache_path=None):
+    def detect_players(self, frames):
+        """
+        Detect players on each frame, through the shared detector if there is one.
+
+        Args:
+            frames (list): List of video frames.
+
+        Returns:
+            list: One np.ndarray (N, 5) of [x1, y1, x2, y2, conf] per frame.
+        """
+        if self.detector is not None:
+            return self.detector.detections_for(frames, self.player_class_id)
+
+        empty = np.zeros((0, 5), dtype=np.float32)
+        return [split_detections_by_class(result).get(self.player_class_id, empty)
+                for result in self.process_batches(frames)]
+
+    def detect_and_embed(self, frames):
+        """
+        Detect players and compute the appearance embeddings of the detections in
+        batches across frames (None with a motion-only backend). The result does
+        not depend on max_age, so it can be cached and reused to track again.
+
+        Args:
+            frames (list): List of video frames.
+
+        Returns:
+            dict: {"detections": per-frame detections, "embeddings": per-frame embeddings or None}.
+        """
+        detections = self.detect_players(frames)
+        return {"detections": detections, "embeddings": self.tracker.embed(frames, detections)}
+
+    def track_players(self, frames, use_cache=False, cache_path=None, detections=None, embeddings=None):
         """
         Track players across frames and return tracking results.
 
@@ -50,6 +125,8 @@ class PlayerTracker:
             frames (list): List of video frames.
             use_cache (bool): Whether to read from a cached result.
             cache_path (str): Path to the cache file.
+            detections (list, optional): Precomputed detections (see detect_and_embed).
+            embeddings (list, optional): Precomputed embeddings of the detections.
 
         Returns:
             list: List of dictionaries. Each dict maps track IDs to bounding boxes.
@@ -58,34 +135,14 @@ class PlayerTracker:
         if cached is not None and len(cached) == len(frames):
             return cached
 
-        detections = self.process_batches(frames)
-        tracks_per_frame = []
-
-        for i, detection in enumerate(detections):
-            tracks_frame = {}
-            detections_input = []
-
-            for box, score, cls in zip(detection.boxes.xyxy.cpu().numpy(),
-                                       detection.boxes.conf.cpu().numpy(),
-                                       detection.boxes.cls.cpu().numpy()):
-                if int(cls) == 4 and score >= self.conf_threshold:  # Class 4 = Player
-                    x1, y1, x2, y2 = map(int, box)
-                    w, h = x2 - x1, y2 - y1
-                    bbox = [x1, y1, w, h]
-                    detections_input.append([bbox, score, 'player'])
-
-            # Update tracker and get current tracks
-            updated_tracks = self.tracker.update_tracks(detections_input, frame=frames[i])
-
-            for t in updated_tracks:
-                if not t.is_confirmed():
-                    continue
-                track_id = t.track_id
-                l, t_, w, h = map(int, t.to_tlwh())
-                x1, y1, x2, y2 = l, t_, l + w, t_ + h
-                tracks_frame[track_id] = {"bbox": [x1, y1, x2, y2]}
-
-            tracks_per_frame.append(tracks_frame)
+        if detections is None:
+            precomputed = self.detect_and_embed(frames)
+            detections, embeddings = precomputed["detections"], precomputed["embeddings"]
+        if embeddings is None:
+            embeddings = [None] * len(detections)
+
+        tracks_per_frame = [self.tracker.update(detection, frame, embeds=embeds)
+                            for detection, frame, embeds in zip(detections, frames, embeddings)]
 
         save_stub(cache_path, tracks_per_frame)
         return tracks_per_frame
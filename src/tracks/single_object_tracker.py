@@ -0,0 +1,81 @@
+import numpy as np
+
+
+class SingleObjectTracker:
+    """
+    Motion-only tracker of a single object (the ball), without appearance model.
+
+    There is at most one ball on the court, so no assignment problem has to be
+    solved: every frame, the most confident detection inside the gate around the
+    position predicted by a constant-velocity model is kept. When the ball has
+    been lost for more than max_age frames, the gate is dropped and the most
+    confident detection of the frame restarts the track.
+
+    The output has the same format as the DeepSort path of BallTracker, with the
+    single track ID 1.
+    """
+
+    track_id = 1
+
+    def __init__(self, max_age=20, conf_threshold=0.5, max_distance=50, velocity_smoothing=0.5):
+        """
+        Args:
+            max_age (int): Frames without a matching detection after which the ball is lost.
+            conf_threshold (float): Confidence threshold for detections.
+            max_distance (float): Gate radius around the predicted center, in pixels per
+                frame elapsed since the last match.
+            velocity_smoothing (float): Weight of the previous velocity in its
+                exponential moving average (0 uses the last displacement only).
+        """
+        self.max_age = max_age
+        self.conf_threshold = conf_threshold
+        self.max_distance = max_distance
+        self.velocity_smoothing = velocity_smoothing
+        self.reset()
+
+    def reset(self):
+        self._center = None
+        self._velocity = np.zeros(2)
+        self._frames_since_update = 0
+
+    def update(self, detections):
+        """
+        Process the ball detections of the next frame.
+
+        Args:
+            detections (np.ndarray): (N, 5) array of [x1, y1, x2, y2, conf].
+
+        Returns:
+            dict: {1: {"bbox": [x1, y1, x2, y2]}} when the ball is matched in the
+            frame, otherwise an empty dict.
+        """
+        detections = np.asarray(detections, dtype=np.float64).reshape(-1, 5)
+        detections = detections[detections[:, 4] >= self.conf_threshold]
+
+        self._frames_since_update += 1
+        tracking = self._center is not None and self._frames_since_update <= self.max_age
+        if not tracking:
+            self.reset()
+
+        if len(detections) == 0:
+            return {}
+
+        centers = (detections[:, :2] + detections[:, 2:4]) / 2
+        if tracking:
+            predicted = self._center + self._velocity * self._frames_since_update
+            distances = np.hypot(*(centers - predicted).T)
+            in_gate = distances <= self.max_distance * self._frames_since_update
+            if not in_gate.any():
+                return {}
+            best = np.flatnonzero(in_gate)[np.argmax(detections[in_gate, 4])]
+
+            displacement = (centers[best] - self._center) / self._frames_since_update
+            self._velocity = (self.velocity_smoothing * self._velocity
+                              + (1 - self.velocity_smoothing) * displacement)
+        else:
+            best = int(np.argmax(detections[:, 4]))
+
+        self._center = centers[best]
+        self._frames_since_update = 0
+        x1, y1, x2, y2 = map(int, detections[best, :4])
+        return {self.track_id: {"bbox": [x1, y1, x2, y2]}}
@@ -1,3 +1,8 @@
+from src.utils.cache import StageCache, hash_file, atomic_write_bytes
 from src.utils.stub import save_stub, read_stub
-from src.utils.video import read_video, save_video
-from src.utils.bbox import get_center_of_bbox, get_bbox_width, measure_distance,measure_xy_distance,get_foot_position
\ No newline at end of file
+from src.utils.video import read_video, save_video, iter_video, iter_windows, get_video_properties, VideoSink, \
+    BackgroundVideoSink, prefetch
+from src.utils.bbox import get_center_of_bbox, get_bbox_width, measure_distance,measure_xy_distance,get_foot_position, \
+    iou_matrix
+from src.utils.yolo import load_yolo_model, auto_batch_size, predict_in_batches
+from src.utils.track_table import TrackTable, FrameView
@@ -1,3 +1,5 @@
+import numpy as np
+
 def get_center_of_bbox(bbox):
     """
     Calculate the center coordinates of a bounding box.
@@ -60,4 +62,27 @@ def get_foot_position(bbox):
         tuple: Coordinates (x, y) of the bottom center point.
     """
     x1,y1,x2,y2 = bbox
-    return int((x1+x2)/2),int(y2)
\ No newline at end of file
+    return int((x1+x2)/2),int(y2)
+
+def iou_matrix(boxes_a, boxes_b):
+    """
+    Calculate the intersection over union of every pair of bounding boxes.
+
+    Args:
+        boxes_a (array-like): (N, 4) bounding boxes in format (x1, y1, x2, y2).
+        boxes_b (array-like): (M, 4) bounding boxes in format (x1, y1, x2, y2).
+
+    Returns:
+        numpy.ndarray: (N, M) IoU values.
+    """
+    boxes_a = np.asarray(boxes_a, dtype=np.float64).reshape(-1, 4)
+    boxes_b = np.asarray(boxes_b, dtype=np.float64).reshape(-1, 4)
+
+    top_left = np.maximum(boxes_a[:, None, :2], boxes_b[None, :, :2])
+    bottom_right = np.minimum(boxes_a[:, None, 2:], boxes_b[None, :, 2:])
+    intersection = np.clip(bottom_right - top_left, 0, None).prod(axis=2)
+
+    area_a = (boxes_a[:, 2] - boxes_a[:, 0]) * (boxes_a[:, 3] - boxes_a[:, 1])
+    area_b = (boxes_b[:, 2] - boxes_b[:, 0]) * (boxes_b[:, 3] - boxes_b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - intersection
+    return np.divide(intersection, union, out=np.zeros_like(intersection), where=union > 0)
@@ -0,0 +1,216 @@
+import os
+import json
+import pickle
+import shutil
+import hashlib
+import logging
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+# Bumped when the format of cached results changes (2: float64 TrackTable boxes).
+CACHE_VERSION = 2
+
+
+def hash_file(path, chunk_size=1 << 20):
+    """
+    Compute the BLAKE2b digest of a file's content, read in chunks.
+
+    Args:
+        path (str): Path to the file.
+        chunk_size (int): Number of bytes read at a time.
+
+    Returns:
+        str: Hex digest.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def atomic_write_bytes(path, data):
+    """
+    Write bytes to path atomically: a temporary file in the same directory is
+    written then renamed, so readers never see a partially written file.
+    """
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class StageCache:
+    """
+    Content-addressed cache of pipeline stage results.
+
+    Each entry is keyed by the stage name, the hash of the input video content,
+    the hashes of the model weights and the stage parameters, so a different
+    video, model or configuration never reuses a stale result. Entries are
+    written atomically and the cache is kept under max_size_bytes by evicting
+    the least recently used entries.
+    """
+
+    def __init__(self, cache_dir="cache/stages", max_size_bytes=2 * 1024 ** 3):
+        self.cache_dir = cache_dir
+        self.max_size_bytes = max_size_bytes
+        self._file_hashes = {}
+
+    def file_hash(self, path):
+        """
+        Hash of a file's content, memoized per (path, size, mtime).
+        """
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        if key not in self._file_hashes:
+            self._file_hashes[key] = hash_file(path)
+        return self._file_hashes[key]
+
+    def make_key(self, stage, video_path=None, model_paths=(), params=None):
+        """
+        Build the cache key of a stage result.
+
+        Args:
+            stage (str): Stage name (e.g. "player_tracks").
+            video_path (str, optional): Input video, hashed by content.
+            model_paths (iterable): Model weight files, hashed by content. Missing files
+                (e.g. models downloaded by name) are keyed by their name.
+            params (dict, optional): Stage parameters, JSON serializable.
+
+        Returns:
+            str: The key.
+        """
+        key_data = {
+            "version": CACHE_VERSION,
+            "stage": stage,
+            "video": self.file_hash(video_path) if video_path else None,
+            "models": [self.file_hash(p) if os.path.isfile(p) else p for p in model_paths],
+            "params": params or {},
+        }
+        encoded = json.dumps(key_data, sort_keys=True, default=str).encode('utf-8')
+        return f"{stage}-{hashlib.blake2b(encoded, digest_size=16).hexdigest()}"
+
+    def entry_path(self, key):
+        return os.path.join(self.cache_dir, key + '.pkl')
+
+    def get(self, key):
+        """
+        Return the cached object for key, or None on a miss.
+        """
+        path = self.entry_path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except (pickle.UnpicklingError, EOFError) as e:
+            logger.warning(f"Dropping corrupted cache entry {path}: {e}")
+            os.remove(path)
+            return None
+
+        # Refresh the access time used by the LRU eviction.
+        os.utime(path)
+        logger.info(f"Cache hit: {key}")
+        return value
+
+    def set(self, key, value):
+        """
+        Store value under key atomically, then evict old entries if needed.
+        """
+        atomic_write_bytes(self.entry_path(key), pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        self.evict(keep=key)
+
+    def table_path(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def get_table(self, key, mmap_mode="r"):
+        """
+        Return the TrackTable stored under key (memory-mapped), or None on a miss.
+        """
+        from src.utils.track_table import TrackTable
+
+        path = self.table_path(key)
+        meta_path = os.path.join(path, "meta.json")
+        if not os.path.exists(meta_path):
+            return None
+
+        os.utime(meta_path)
+        logger.info(f"Cache hit: {key}")
+        return TrackTable.load(path, mmap_mode=mmap_mode)
+
+    def set_table(self, key, table):
+        """
+        Store a TrackTable under key in its columnar format. The columns are written
+        to a temporary directory renamed into place, and meta.json is the last file
+        written, so a partial entry is never read.
+        """
+        path = self.table_path(key)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = tempfile.mkdtemp(dir=self.cache_dir, prefix='.tmp-')
+        try:
+            table.save(tmp_path)
+            if os.path.exists(path):
+                shutil.rmtree(path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+        self.evict(keep=key)
+
+    def get_or_compute(self, key, compute):
+        """
+        Return the cached value for key, computing and storing it on a miss.
+
+        Args:
+            key (str): Key built with make_key.
+            compute (callable): Function without arguments producing the value.
+        """
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def evict(self, keep=None):
+        """
+        Remove least recently used entries until the cache fits in max_size_bytes.
+
+        Args:
+            keep (str, optional): Key that must not be evicted (the entry just written).
+        """
+        if not os.path.isdir(self.cache_dir):
+            return
+
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.startswith('.tmp-'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            if name.endswith('.pkl'):
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, stat.st_size, path))
+            elif os.path.exists(os.path.join(path, "meta.json")):
+                size = sum(entry.stat().st_size for entry in os.scandir(path))
+                entries.append((os.stat(os.path.join(path, "meta.json")).st_mtime, size, path))
+
+        total_size = sum(size for _, size, _ in entries)
+        keep_paths = {self.entry_path(keep), self.table_path(keep)} if keep else set()
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size_bytes:
+                break
+            if path in keep_paths:
+                continue
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            else:
+                os.remove(path)
+            total_size -= size
+            logger.info(f"Evicted cache entry {path}")
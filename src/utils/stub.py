@@ -1,22 +1,23 @@
 import os 
 import pickle
+from src.utils.cache import atomic_write_bytes
 
 def save_stub(stub_path,object):
     """
     Save a Python object to disk at the specified path.
 
     Creates necessary directories if they don't exist and serializes the object using pickle.
+    The file is written atomically.
 
     Args:
         stub_path (str): File path where the object should be saved.
         object: Any Python object that can be pickled.
     """
-    if not os.path.exists(os.path.dirname(stub_path)):
-        os.makedirs(os.path.dirname(stub_path))
+    if stub_path is None:
+        return
 
-    if stub_path is not None:
-        with open(stub_path,'wb') as f:
-            pickle.dump(object,f)
+    # Atomic write: an interrupted run never leaves a truncated stub behind.
+    atomic_write_bytes(stub_path, pickle.dumps(object))
 
 def read_stub(read_from_stub,stub_path):
     """
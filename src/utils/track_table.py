@@ -0,0 +1,233 @@
+import os
+import json
+from collections.abc import Sequence
+
+import numpy as np
+
+COLUMNS = {
+    "frame": np.int32,
+    "track_id": np.int64,
+    "x1": np.float64,
+    "y1": np.float64,
+    "x2": np.float64,
+    "y2": np.float64,
+    "conf": np.float64,
+    "team": np.int8,
+}
+
+
+class TrackTable:
+    """
+    Columnar representation of per-frame tracks.
+
+    One row per (frame, track) with NumPy columns frame, track_id, x1, y1, x2, y2,
+    conf (NaN when unknown) and team (-1 when unknown). Rows are sorted by frame
+    and keep the track order of each frame, and boxes are stored as float64 (the
+    precision of the trackers' Python floats), so converting back to the per-frame
+    {track_id: {"bbox": [...]}} dictionaries is lossless and threshold-sensitive
+    analytics (e.g. ball possession) give the same results on both forms.
+
+    Tables can be saved as one .npy file per column and loaded memory-mapped, so
+    a slice of frames can be read without loading the whole game.
+    """
+
+    def __init__(self, columns, n_frames, str_ids=False, int_bboxes=False):
+        """
+        Args:
+            columns (dict): Column name -> 1D array, all of the same length.
+            n_frames (int): Number of frames covered (frames without tracks have no rows).
+            str_ids (bool): Track ids were strings (DeepSort) and are converted back on read.
+            int_bboxes (bool): Bounding boxes were integers and are converted back on read.
+        """
+        self.columns = columns
+        self.n_frames = n_frames
+        self.str_ids = str_ids
+        self.int_bboxes = int_bboxes
+        self._offsets = None
+
+    def __len__(self):
+        return len(self.columns["frame"])
+
+    @classmethod
+    def from_tracks(cls, tracks, player_assignment=None):
+        """
+        Build a table from per-frame track dictionaries.
+
+        Args:
+            tracks (list): One dict per frame mapping track_id -> {"bbox": [x1, y1, x2, y2], ...}.
+                An optional "conf" entry is stored in the conf column.
+            player_assignment (list, optional): One dict per frame mapping track_id -> team_id.
+
+        Returns:
+            TrackTable: The table.
+        """
+        rows = {name: [] for name in COLUMNS}
+        str_ids = False
+        int_bboxes = True
+        for frame_num, frame_tracks in enumerate(tracks):
+            frame_teams = player_assignment[frame_num] if player_assignment is not None else {}
+            for track_id, track in frame_tracks.items():
+                bbox = track.get("bbox")
+                if not bbox:
+                    continue
+                str_ids = str_ids or isinstance(track_id, str)
+                int_bboxes = int_bboxes and all(isinstance(v, (int, np.integer)) for v in bbox)
+                rows["frame"].append(frame_num)
+                rows["track_id"].append(int(track_id))
+                rows["x1"].append(bbox[0])
+                rows["y1"].append(bbox[1])
+                rows["x2"].append(bbox[2])
+                rows["y2"].append(bbox[3])
+                rows["conf"].append(track.get("conf", np.nan))
+                rows["team"].append(frame_teams.get(track_id, -1))
+
+        columns = {name: np.asarray(values, dtype=dtype) for (name, dtype), values
+                   in zip(COLUMNS.items(), rows.values())}
+        return cls(columns, len(tracks), str_ids=str_ids, int_bboxes=int_bboxes and len(columns["frame"]) > 0)
+
+    @classmethod
+    def concatenate(cls, tables):
+        """
+        Concatenate tables of consecutive frame ranges (e.g. streaming windows) into one.
+        """
+        columns = {}
+        frame_offset = 0
+        frames = []
+        for table in tables:
+            frames.append(np.asarray(table.columns["frame"]) + frame_offset)
+            frame_offset += table.n_frames
+        columns["frame"] = np.concatenate(frames).astype(COLUMNS["frame"]) if tables else np.zeros(0, COLUMNS["frame"])
+        for name, dtype in COLUMNS.items():
+            if name != "frame":
+                columns[name] = np.concatenate([np.asarray(t.columns[name]) for t in tables]).astype(dtype) \
+                    if tables else np.zeros(0, dtype)
+
+        non_empty = [t for t in tables if len(t) > 0]
+        return cls(columns, frame_offset,
+                   str_ids=any(t.str_ids for t in non_empty),
+                   int_bboxes=bool(non_empty) and all(t.int_bboxes for t in non_empty))
+
+    @property
+    def offsets(self):
+        """
+        Row offsets of each frame: rows of frame f are offsets[f]:offsets[f + 1].
+        """
+        if self._offsets is None:
+            self._offsets = np.searchsorted(self.columns["frame"], np.arange(self.n_frames + 1))
+        return self._offsets
+
+    @property
+    def bboxes(self):
+        """
+        (N, 4) array of [x1, y1, x2, y2].
+        """
+        return np.stack([self.columns["x1"], self.columns["y1"], self.columns["x2"], self.columns["y2"]], axis=1)
+
+    def frame_slice(self, start, end):
+        """
+        Return the rows of frames start..end-1 as a new table whose frame numbers start at 0.
+        """
+        start, end = max(0, start), min(self.n_frames, end)
+        lo, hi = self.offsets[start], self.offsets[end]
+        columns = {name: np.asarray(column[lo:hi]) for name, column in self.columns.items()}
+        columns["frame"] = columns["frame"] - start
+        return TrackTable(columns, max(0, end - start), str_ids=self.str_ids, int_bboxes=self.int_bboxes)
+
+    def with_teams(self, player_assignment):
+        """
+        Return a copy of the table whose team column is filled from per-frame assignments.
+        """
+        teams = np.full(len(self), -1, dtype=np.int8)
+        for row, (frame_num, track_id) in enumerate(zip(self.columns["frame"], self.columns["track_id"])):
+            teams[row] = player_assignment[frame_num].get(self.track_key(track_id), -1)
+        columns = dict(self.columns, team=teams)
+        return TrackTable(columns, self.n_frames, str_ids=self.str_ids, int_bboxes=self.int_bboxes)
+
+    def track_key(self, track_id):
+        return str(track_id) if self.str_ids else int(track_id)
+
+    def _frame_tracks(self, frame_num):
+        lo, hi = self.offsets[frame_num], self.offsets[frame_num + 1]
+        cast = int if self.int_bboxes else float
+        frame_tracks = {}
+        for row in range(lo, hi):
+            bbox = [cast(self.columns[name][row]) for name in ("x1", "y1", "x2", "y2")]
+            frame_tracks[self.track_key(self.columns["track_id"][row])] = {"bbox": bbox}
+        return frame_tracks
+
+    def _frame_teams(self, frame_num):
+        lo, hi = self.offsets[frame_num], self.offsets[frame_num + 1]
+        return {self.track_key(track_id): int(team)
+                for track_id, team in zip(self.columns["track_id"][lo:hi], self.columns["team"][lo:hi])
+                if team != -1}
+
+    def to_tracks(self, start=0, end=None):
+        """
+        Convert frames start..end-1 back to per-frame {track_id: {"bbox": [...]}} dictionaries.
+        """
+        end = self.n_frames if end is None else end
+        return [self._frame_tracks(f) for f in range(start, end)]
+
+    def to_team_assignment(self, start=0, end=None):
+        """
+        Convert frames start..end-1 to per-frame {track_id: team_id} dictionaries.
+        """
+        end = self.n_frames if end is None else end
+        return [self._frame_teams(f) for f in range(start, end)]
+
+    def tracks_view(self):
+        """
+        List-like view of the per-frame track dictionaries, built on access.
+        """
+        return FrameView(self._frame_tracks, self.n_frames)
+
+    def teams_view(self):
+        """
+        List-like view of the per-frame team assignment dictionaries, built on access.
+        """
+        return FrameView(self._frame_teams, self.n_frames)
+
+    def save(self, path):
+        """
+        Save the table as a directory with one .npy file per column and a meta.json.
+        """
+        os.makedirs(path, exist_ok=True)
+        for name, column in self.columns.items():
+            np.save(os.path.join(path, name + ".npy"), np.asarray(column))
+        meta = {"n_frames": self.n_frames, "str_ids": self.str_ids, "int_bboxes": self.int_bboxes}
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump(meta, f)
+
+    @classmethod
+    def load(cls, path, mmap_mode="r"):
+        """
+        Load a table saved with save(). Columns are memory-mapped by default, so only
+        the slices that are read are loaded from disk.
+        """
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        columns = {name: np.load(os.path.join(path, name + ".npy"), mmap_mode=mmap_mode) for name in COLUMNS}
+        return cls(columns, meta["n_frames"], str_ids=meta["str_ids"], int_bboxes=meta["int_bboxes"])
+
+
+class FrameView(Sequence):
+    """
+    Read-only sequence of per-frame objects computed on access from a TrackTable,
+    usable wherever the pipeline expects a list indexed by frame.
+    """
+
+    def __init__(self, get_frame, n_frames):
+        self._get_frame = get_frame
+        self._n_frames = n_frames
+
+    def __len__(self):
+        return self._n_frames
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._get_frame(i) for i in range(*index.indices(self._n_frames))]
+        if index < 0:
+            index += self._n_frames
+        if not 0 <= index < self._n_frames:
+            raise IndexError(index)
+        return self._get_frame(index)
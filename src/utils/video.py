@@ -1,5 +1,159 @@
+import queue
+import threading
+
 import cv2
 
+_END = object()
+
+
+def get_video_properties(path):
+    """
+    Read the basic properties of a video without decoding its frames.
+
+    Args:
+        path (str): Path to the video file.
+
+    Returns:
+        tuple: (fps, frame_count, width, height).
+    """
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise IOError(f"Cannot open video: {path}")
+
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+    cap.release()
+    return fps, frame_count, width, height
+
+
+def iter_video(path, start=0, end=None):
+    """
+    Lazily decode a video, yielding one frame at a time.
+
+    Only the frame currently being consumed is kept in memory, so this can be
+    used on videos that would not fit in RAM as a list of frames.
+
+    Args:
+        path (str): Path to the video file.
+        start (int): Index of the first frame to decode (the decoder seeks to it).
+        end (int, optional): Index after the last frame to decode (end of the video if None).
+
+    Yields:
+        numpy.ndarray: Decoded BGR frames, in order.
+    """
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise IOError(f"Cannot open video: {path}")
+
+    try:
+        if start > 0:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+        frame_num = start
+        while end is None or frame_num < end:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            yield frame
+            frame_num += 1
+    finally:
+        cap.release()
+
+
+def iter_windows(frames, window_size):
+    """
+    Group an iterable of frames into consecutive windows.
+
+    Args:
+        frames (iterable): Frames to group (a list or a generator such as iter_video).
+        window_size (int): Maximum number of frames per window.
+
+    Yields:
+        tuple: (start_frame, window) where window is a list of at most window_size frames.
+    """
+    if window_size <= 0:
+        raise ValueError("window_size must be a positive integer.")
+
+    window = []
+    start_frame = 0
+    for frame in frames:
+        window.append(frame)
+        if len(window) == window_size:
+            yield start_frame, window
+            start_frame += len(window)
+            window = []
+
+    if window:
+        yield start_frame, window
+
+
+class _ProducerError:
+    def __init__(self, error):
+        self.error = error
+
+
+def prefetch(iterable, max_queued=32):
+    """
+    Iterate over iterable in a background thread, up to max_queued items ahead
+    of the consumer.
+
+    Used to decode a video (e.g. prefetch(iter_video(path))) while the frames
+    already decoded are processed: OpenCV releases the GIL while decoding, so
+    decoding overlaps with detection and drawing. The bounded queue keeps at most
+    max_queued frames in memory. Exceptions raised by the producer are re-raised
+    in the consumer, and the producer stops when the consumer stops iterating.
+
+    Args:
+        iterable (iterable): Items to produce (e.g. frames).
+        max_queued (int): Maximum number of items produced ahead.
+
+    Yields:
+        The items of iterable, in order.
+    """
+    items = queue.Queue(maxsize=max_queued)
+    stop = threading.Event()
+
+    def put(item):
+        # Give up when the consumer is gone, instead of blocking on a full queue.
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        iterator = iter(iterable)
+        try:
+            for item in iterator:
+                if not put(item):
+                    break
+            else:
+                put(_END)
+        except BaseException as e:
+            put(_ProducerError(e))
+        finally:
+            if hasattr(iterator, 'close'):
+                iterator.close()
+
+    thread = threading.Thread(target=produce, name="prefetch", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = items.get()
+            if item is _END:
+                return
+            if isinstance(item, _ProducerError):
+                raise item.error
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
+
 def read_video(path):
     """
     Read a video from the given path and return a list of frames and FPS.
@@ -7,32 +161,125 @@ def read_video(path):
     cap = cv2.VideoCapture(path)
     if not cap.isOpened():
         raise IOError(f"Cannot open video: {path}")
-    
+
     frames = []
     fps = cap.get(cv2.CAP_PROP_FPS)
-    
+
     while True:
         ret, frame = cap.read()
         if not ret:
             break
         frames.append(frame)
-    
+
     cap.release()
     return frames, fps
 
 
-def save_video(frames, path, fps=30):
+class VideoSink:
     """
-    Save a list of frames to a video file.
+    Incremental video writer.
+
+    The underlying cv2.VideoWriter is opened lazily on the first frame, so the
+    output size does not need to be known in advance. Frames can be written one
+    at a time or window by window.
     """
-    if not frames:
-        raise ValueError("No frames to write.")
 
-    height, width, _ = frames[0].shape
-    fourcc = cv2.VideoWriter_fourcc(*'avc1')  # Use 'XVID' or 'avc1' if needed
-    out = cv2.VideoWriter(path, fourcc, fps, (width, height))
+    def __init__(self, path, fps=30, fourcc='avc1'):
+        self.path = path
+        self.fps = fps
+        self.fourcc = cv2.VideoWriter_fourcc(*fourcc)
+        self.writer = None
+        self.frame_count = 0
 
-    for frame in frames:
-        out.write(frame)
-    
-    out.release()
\ No newline at end of file
+    def write(self, frame):
+        if self.writer is None:
+            height, width = frame.shape[:2]
+            self.writer = cv2.VideoWriter(self.path, self.fourcc, self.fps, (width, height))
+        self.writer.write(frame)
+        self.frame_count += 1
+
+    def write_frames(self, frames):
+        for frame in frames:
+            self.write(frame)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.release()
+            self.writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class BackgroundVideoSink(VideoSink):
+    """
+    Video writer encoding in a background thread.
+
+    write() only queues the frame, so encoding overlaps with the computation of
+    the next frames (OpenCV releases the GIL while encoding). The queue is
+    bounded: when the encoder falls behind, write() blocks instead of buffering
+    the whole video. Frames must not be modified after being written. Encoding
+    errors are raised by the next write() or by close().
+    """
+
+    def __init__(self, path, fps=30, fourcc='avc1', max_queued=32):
+        super().__init__(path, fps=fps, fourcc=fourcc)
+        self._queue = queue.Queue(maxsize=max_queued)
+        self._thread = None
+        self._error = None
+
+    def _encode(self):
+        while True:
+            frame = self._queue.get()
+            if frame is _END:
+                return
+            # After an error, keep draining the queue so that write() never blocks.
+            if self._error is None:
+                try:
+                    VideoSink.write(self, frame)
+                except BaseException as e:
+                    self._error = e
+
+    def _raise_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def write(self, frame):
+        self._raise_error()
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._encode, name="video-encode", daemon=True)
+            self._thread.start()
+        self._queue.put(frame)
+
+    def close(self):
+        if self._thread is not None:
+            self._queue.put(_END)
+            self._thread.join()
+            self._thread = None
+        super().close()
+        self._raise_error()
+
+
+def save_video(frames, path, fps=30, max_queued=32):
+    """
+    Save frames to a video file.
+
+    Args:
+        frames (iterable): A list of frames or any iterable (e.g. a generator),
+            written as they are produced.
+        path (str): Output video path.
+        fps (float): Frames per second of the output video.
+        max_queued (int): Frames queued for encoding in a background thread, so
+            that producing the frames overlaps with encoding them. 0 encodes on the
+            calling thread.
+    """
+    sink = BackgroundVideoSink(path, fps=fps, max_queued=max_queued) if max_queued > 0 else VideoSink(path, fps=fps)
+    with sink:
+        sink.write_frames(frames)
+
+    if sink.frame_count == 0:
+        raise ValueError("No frames to write.")
@@ -0,0 +1,119 @@
+import os
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ("onnx", "openvino")
+
+
+def get_available_memory():
+    """
+    Return the amount of available system memory in bytes, or None if unknown.
+    """
+    try:
+        import psutil
+        return psutil.virtual_memory().available
+    except ImportError:
+        pass
+
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def auto_batch_size(frame_shape, imgsz=640, memory_fraction=0.25, min_batch_size=1, max_batch_size=64,
+                    default_batch_size=16):
+    """
+    Pick a YOLO inference batch size that fits in the available CPU memory.
+
+    The per-frame cost is estimated as the decoded frame plus the letterboxed
+    float32 input tensor and its intermediate activations (roughly 8x the input).
+
+    Args:
+        frame_shape (tuple): Shape of a video frame (height, width, channels).
+        imgsz (int): Inference image size.
+        memory_fraction (float): Fraction of the available memory the batch may use.
+        min_batch_size (int): Lower bound of the returned batch size.
+        max_batch_size (int): Upper bound of the returned batch size.
+        default_batch_size (int): Batch size used when available memory is unknown.
+
+    Returns:
+        int: The batch size.
+    """
+    available = get_available_memory()
+    if available is None:
+        return default_batch_size
+
+    frame_bytes = 1
+    for dim in frame_shape:
+        frame_bytes *= dim
+    input_bytes = imgsz * imgsz * 3 * 4
+    bytes_per_frame = frame_bytes + input_bytes * 8
+
+    batch_size = int(available * memory_fraction // bytes_per_frame)
+    return max(min_batch_size, min(max_batch_size, batch_size))
+
+
+def load_yolo_model(model_path, export_format=None, half=False, imgsz=640, task="detect"):
+    """
+    Load a YOLO model, optionally through an exported inference runtime.
+
+    With export_format="onnx" or "openvino" the PyTorch weights are exported once
+    next to the original file (reused on later runs) and the exported model is
+    loaded instead. OpenVINO supports half precision (FP16) on CPU.
+
+    Args:
+        model_path (str): Path to the .pt weights.
+        export_format (str, optional): None, "onnx" or "openvino".
+        half (bool): Export with half precision weights.
+        imgsz (int): Inference image size used for the export.
+        task (str): YOLO task of the exported model ("detect", "pose", ...).
+
+    Returns:
+        ultralytics.YOLO: The loaded model.
+    """
+    from ultralytics import YOLO
+
+    if export_format is None:
+        return YOLO(model_path)
+
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {export_format}. Expected one of {EXPORT_FORMATS}.")
+
+    stem, _ = os.path.splitext(model_path)
+    if export_format == "onnx":
+        exported_path = stem + ".onnx"
+    else:
+        exported_path = stem + "_openvino_model"
+
+    if not os.path.exists(exported_path):
+        logger.info(f"Exporting {model_path} to {export_format}...")
+        exported_path = YOLO(model_path).export(format=export_format, half=half, imgsz=imgsz)
+
+    return YOLO(exported_path, task=task)
+
+
+def predict_in_batches(model, frames, batch_size, **predict_kwargs):
+    """
+    Run model.predict over frames in batches and measure the throughput.
+
+    Args:
+        model (ultralytics.YOLO): The model.
+        frames (list): Frames to process.
+        batch_size (int): Number of frames per predict call.
+        **predict_kwargs: Extra arguments forwarded to model.predict.
+
+    Returns:
+        tuple: (results, fps) where results has one YOLO result per frame and
+        fps is the number of frames processed per second (None if unmeasurable).
+    """
+    results = []
+    start_time = time.perf_counter()
+    for i in range(0, len(frames), batch_size):
+        results += model.predict(frames[i:i + batch_size], verbose=False, **predict_kwargs)
+    elapsed = time.perf_counter() - start_time
+
+    fps = len(frames) / elapsed if elapsed > 0 else None
+    return results, fps
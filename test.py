@@ -1,7 +1,8 @@
-import cv2
 import os
-from deep_sort_realtime.deepsort_tracker import DeepSort
 from src.utils import read_video, save_video
+from src.tracks.player_tracker import PlayerTracker
+from src.court_keypoint_detector.court_keypoint_detector import CourtKeypointDetector
+from src.tactic_view.tactic_view_converter import TacticalViewConverter
 from src.speed_and_distance_calculator import SpeedAndDistanceCalculator
 from src.draws.speed_and_distance_drawer import SpeedAndDistanceDrawer
 
@@ -10,40 +11,35 @@ def main():
     video_path = "data/videos/video_1.mp4"
     output_path = "output/match_annotated.mp4"
     model_path = "models/players_detection_model.pt"
-
-    # === Paramètres terrain
-    width_meters = 28.0  # terrain de basket officiel
-    height_meters = 15.0
+    court_model_path = "models/court_keypoints.pt"
+    court_image_path = "data/basketball_court.png"
 
     # === Lecture de la vidéo
     frames, fps = read_video(video_path)
-    height, width = frames[0].shape[:2]
-
-    # === Initialiser le tracker
-    tracker = DeepSort(max_age=30)
 
-    all_tracks = []
+    # === Détection et suivi des joueurs
+    player_tracks = PlayerTracker(model_path=model_path, max_age=15).track_players(frames)
 
-    for frame in frames:
-        # ⚠️ Adapter ici si tu utilises YOLO pour obtenir les détections
-        detections = []  # Format: [(x1, y1, x2, y2, conf, class_id), ...]
-        tracks = tracker.update_tracks(detections, frame=frame)
-        all_tracks.append(tracks)
+    # === Positions des joueurs sur le terrain (vue tactique)
+    court_keypoints = CourtKeypointDetector(model_path=court_model_path).detect_keypoints(frames)
+    converter = TacticalViewConverter(court_image_path=court_image_path)
+    validated_keypoints = converter.validate_keypoints(court_keypoints)
+    tactical_positions = converter.transform_players_to_tactical_view(validated_keypoints, player_tracks)
 
-    # === Calcul distance & vitesse
+    # === Calcul distance & vitesse, en mètres sur le terrain
     calculator = SpeedAndDistanceCalculator(
-        width_in_pixels=width,
-        height_in_pixels=height,
-        width_in_meters=width_meters,
-        height_in_meters=height_meters
+        width_in_pixels=converter.width,
+        height_in_pixels=converter.height,
+        width_in_meters=converter.actual_width_in_meters,
+        height_in_meters=converter.actual_height_in_meters
     )
 
-    distances = calculator.calculate_distance(all_tracks)
+    distances = calculator.calculate_distance(tactical_positions)
     speeds = calculator.calculate_speed(distances, fps=fps)
 
     # === Annotation
     drawer = SpeedAndDistanceDrawer()
-    annotated_frames = drawer.draw(frames, all_tracks, distances, speeds)
+    annotated_frames = drawer.draw(frames, player_tracks, distances, speeds)
 
     os.makedirs("output", exist_ok=True)
     save_video(annotated_frames, output_path, fps)
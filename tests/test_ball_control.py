@@ -0,0 +1,44 @@
+import random
+
+import pytest
+
+from src.stats import BallControlStats, OnlineBallControlStats
+
+
+@pytest.mark.parametrize("rolling_window", [None, 1, 7, 50])
+@pytest.mark.parametrize("seed", range(3))
+def test_online_percentages_match_whole_video_stats(seed, rolling_window):
+    rng = random.Random(seed)
+    team_ball_control = [rng.choice([-1, 1, 1, 2]) for _ in range(300)]
+    stats = BallControlStats.from_team_ball_control(team_ball_control)
+
+    online = OnlineBallControlStats(rolling_window=rolling_window)
+    for frame_num, team_id in enumerate(team_ball_control):
+        online.update(team_id)
+        assert online.percentages(frame_num) == pytest.approx(stats.percentages(frame_num))
+        if rolling_window:
+            assert (online.percentages(frame_num, window=rolling_window)
+                    == pytest.approx(stats.percentages(frame_num, window=rolling_window)))
+        if rolling_window and rolling_window >= 3:
+            # Shorter windows are counted from the kept frames.
+            assert online.percentages(frame_num, window=3) == pytest.approx(stats.percentages(frame_num, window=3))
+    assert len(online) == len(stats)
+
+
+def test_state_is_bounded():
+    online = OnlineBallControlStats(rolling_window=10)
+    for frame_num in range(10000):
+        online.update([-1, 1, 2][frame_num % 3])
+    assert len(online._window) == 10
+    assert set(online._totals) == {-1, 1, 2}
+
+
+def test_ranges_that_are_not_kept():
+    online = OnlineBallControlStats(rolling_window=10)
+    for _ in range(100):
+        online.update(1)
+    with pytest.raises(ValueError):
+        online.percentages(98)
+    with pytest.raises(ValueError):
+        online.percentages(99, window=20)
+    assert OnlineBallControlStats().percentages(0) == {1: 0.0, 2: 0.0}
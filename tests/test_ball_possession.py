@@ -0,0 +1,150 @@
+import random
+
+import pytest
+
+from src.ball_aquisition.ball_aquisition_detector import BallAquisitionDetector
+from src.utils import TrackTable
+from src.utils.bbox import get_center_of_bbox
+
+BALL = [95, 95, 105, 105]  # center (100, 100)
+
+
+def baseline_detect_ball_possession(detector, player_tracks, ball_tracks):
+    """
+    detect_ball_possession as it was before vectorization: one
+    find_best_candidate_for_possession call per frame.
+    """
+    possession_list = [-1] * len(ball_tracks)
+    consecutive_possession_count = {}
+    for frame_num in range(len(ball_tracks)):
+        ball_bbox = ball_tracks[frame_num].get(1, {}).get('bbox', [])
+        if not ball_bbox:
+            continue
+        best_player_id = detector.find_best_candidate_for_possession(get_center_of_bbox(ball_bbox),
+                                                                     player_tracks[frame_num], ball_bbox)
+        if best_player_id != -1:
+            count = consecutive_possession_count.get(best_player_id, 0) + 1
+            consecutive_possession_count = {best_player_id: count}
+            if count >= detector.min_frames:
+                possession_list[frame_num] = best_player_id
+        else:
+            consecutive_possession_count = {}
+    return possession_list
+
+
+def held(player_boxes, n_frames=12, ball=BALL):
+    """
+    Fixture of n_frames frames with the same players and ball in each frame.
+    """
+    player_tracks = [{player_id: {"bbox": list(bbox)} for player_id, bbox in player_boxes.items()}
+                     for _ in range(n_frames)]
+    ball_tracks = [{1: {"bbox": list(ball)}} for _ in range(n_frames)]
+    return player_tracks, ball_tracks
+
+
+def random_fixture(seed, n_frames=200, n_players=6):
+    """
+    Players moving slowly, the ball mostly near a holder changing every 30 frames,
+    with missing players, missing balls and float or integer coordinates.
+    """
+    rng = random.Random(seed)
+    as_int = rng.random() < 0.5
+    positions = {player_id: [rng.uniform(0, 300), rng.uniform(0, 200)] for player_id in range(1, n_players + 1)}
+    player_tracks, ball_tracks = [], []
+    for frame_num in range(n_frames):
+        frame_tracks = {}
+        for player_id, position in positions.items():
+            position[0] += rng.uniform(-6, 6)
+            position[1] += rng.uniform(-6, 6)
+            if rng.random() < 0.9:
+                bbox = [position[0], position[1], position[0] + rng.uniform(30, 50), position[1] + rng.uniform(80, 110)]
+                frame_tracks[player_id] = {"bbox": [int(v) for v in bbox] if as_int else bbox}
+        player_tracks.append(frame_tracks)
+
+        if frame_num % 30 == 0:
+            holder = rng.randint(1, n_players)
+        if rng.random() < 0.85:
+            # Near the holder most of the time (possession streaks), anywhere otherwise.
+            if rng.random() < 0.97:
+                x, y = positions[holder][0] + rng.uniform(-15, 45), positions[holder][1] + rng.uniform(10, 80)
+            else:
+                x, y = rng.uniform(50, 300), rng.uniform(50, 250)
+            bbox = [x, y, x + 10, y + 10]
+            ball_tracks.append({1: {"bbox": [int(v) for v in bbox] if as_int else bbox}})
+        else:
+            ball_tracks.append({})
+    return player_tracks, ball_tracks
+
+
+def assert_same_possession(player_tracks, ball_tracks):
+    detector = BallAquisitionDetector()
+    expected = baseline_detect_ball_possession(detector, player_tracks, ball_tracks)
+    assert detector.detect_ball_possession(player_tracks, ball_tracks) == expected
+    assert detector.detect_ball_possession(TrackTable.from_tracks(player_tracks), ball_tracks) == expected
+    return expected
+
+
+@pytest.mark.parametrize("x1, holder", [
+    (150 - 1e-6, 7),  # distance just below the possession threshold
+    (150, -1),        # distance equal to the threshold: not held
+    (150 + 1e-6, -1),
+])
+def test_distance_threshold_boundary(x1, holder):
+    player_tracks, ball_tracks = held({7: [x1, 80, x1 + 40, 130]})
+    possession = assert_same_possession(player_tracks, ball_tracks)
+    assert possession[-1] == holder
+
+
+@pytest.mark.parametrize("x1, contained", [
+    (97, False),         # 80% of the ball in the box: not above the containment threshold
+    (97 - 1e-6, True),
+])
+def test_containment_threshold_boundary(x1, contained):
+    # Player 2 is closer to the ball center, player 1 contains the ball: containment
+    # above the threshold takes priority over distance.
+    player_tracks, ball_tracks = held({1: [x1, 0, 300, 300], 2: [99, 99, 101, 101]})
+    possession = assert_same_possession(player_tracks, ball_tracks)
+    assert possession[-1] == (1 if contained else 2)
+
+
+def test_high_containment_prefers_largest_distance():
+    player_tracks, ball_tracks = held({1: [0, 0, 200, 200], 2: [90, 90, 110, 110]})
+    assert assert_same_possession(player_tracks, ball_tracks)[-1] == 1
+
+
+def test_distance_tie_keeps_first_player():
+    player_tracks, ball_tracks = held({3: [120, 80, 160, 130], 4: [40, 80, 80, 130]})
+    assert assert_same_possession(player_tracks, ball_tracks)[-1] == 3
+
+
+@pytest.mark.parametrize("n_frames, confirmed", [(10, False), (11, True)])
+def test_min_frames_boundary(n_frames, confirmed):
+    player_tracks, ball_tracks = held({5: [120, 80, 160, 130]}, n_frames=n_frames)
+    possession = assert_same_possession(player_tracks, ball_tracks)
+    assert possession[-1] == (5 if confirmed else -1)
+
+
+def test_frames_without_ball_keep_the_streak_and_frames_without_candidate_break_it():
+    player_tracks, ball_tracks = held({5: [120, 80, 160, 130]}, n_frames=30)
+    ball_tracks[5] = {}
+    player_tracks[20] = {}
+    possession = assert_same_possession(player_tracks, ball_tracks)
+    assert possession[11] == 5
+    assert possession[5] == -1
+    assert possession[30 - 1] == -1  # only 9 frames since the break
+
+
+def test_string_track_ids():
+    player_tracks, ball_tracks = held({"12": [120, 80, 160, 130], "3": [400, 80, 440, 130]})
+    assert assert_same_possession(player_tracks, ball_tracks)[-1] == "12"
+
+
+def test_no_ball_and_no_players():
+    assert assert_same_possession([{} for _ in range(5)], [{} for _ in range(5)]) == [-1] * 5
+    player_tracks, _ = held({1: [120, 80, 160, 130]}, n_frames=5)
+    assert assert_same_possession(player_tracks, [{} for _ in range(5)]) == [-1] * 5
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_random_fixtures(seed):
+    assert_same_possession(*random_fixture(seed))
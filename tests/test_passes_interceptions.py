@@ -0,0 +1,122 @@
+import random
+
+import pytest
+
+from src.passes.passes_interceptions import PassAndInterceptionDetector
+
+
+def baseline_detect_events(ball_acquisition, player_assignment):
+    """
+    detect_passes and detect_interceptions as they were before the segment-based
+    events: one loop over the frames, comparing each holder with the previous one.
+    """
+    passes = [-1] * len(ball_acquisition)
+    interceptions = [-1] * len(ball_acquisition)
+    prev_holder = -1
+    previous_frame = -1
+    for frame in range(1, len(ball_acquisition)):
+        if ball_acquisition[frame - 1] != -1:
+            prev_holder = ball_acquisition[frame - 1]
+            previous_frame = frame - 1
+
+        current_holder = ball_acquisition[frame]
+        if prev_holder != -1 and current_holder != -1 and prev_holder != current_holder:
+            prev_team = player_assignment[previous_frame].get(prev_holder, -1)
+            current_team = player_assignment[frame].get(current_holder, -1)
+            if prev_team == current_team and prev_team != -1:
+                passes[frame] = prev_team
+            if prev_team != current_team and prev_team != -1 and current_team != -1:
+                interceptions[frame] = current_team
+    return passes, interceptions
+
+
+def random_game(seed, n_frames=300, n_players=6):
+    """
+    Possession runs of random length separated by loose balls, with teams changing
+    during the game and players without a team in some frames.
+    """
+    rng = random.Random(seed)
+    teams = {player_id: 1 + player_id % 2 for player_id in range(1, n_players + 1)}
+    ball_acquisition, player_assignment = [], []
+    while len(ball_acquisition) < n_frames:
+        holder = rng.choice([-1] + list(teams))
+        for _ in range(rng.randint(1, 20)):
+            if rng.random() < 0.02:
+                player_id = rng.choice(list(teams))
+                teams[player_id] = rng.choice([1, 2])
+            ball_acquisition.append(holder)
+            player_assignment.append({player_id: team for player_id, team in teams.items()
+                                      if rng.random() < 0.95})
+    return ball_acquisition[:n_frames], player_assignment[:n_frames]
+
+
+def assert_same_as_baseline(ball_acquisition, player_assignment):
+    expected_passes, expected_interceptions = baseline_detect_events(ball_acquisition, player_assignment)
+    detector = PassAndInterceptionDetector()
+    events = detector.detect_events(ball_acquisition, player_assignment)
+    assert events["passes"] == expected_passes
+    assert events["interceptions"] == expected_interceptions
+    # A turnover for the other team at every interception.
+    assert [-1 if team == -1 else 3 - team for team in events["interceptions"]] == events["turnovers"]
+
+    assert PassAndInterceptionDetector().detect_passes(ball_acquisition, player_assignment) == expected_passes
+    assert (PassAndInterceptionDetector().detect_interceptions(ball_acquisition, player_assignment)
+            == expected_interceptions)
+
+    online = PassAndInterceptionDetector()
+    frames = [online.update(holder, frame_assignment)
+              for holder, frame_assignment in zip(ball_acquisition, player_assignment)]
+    assert [pass_team for pass_team, _ in frames] == expected_passes
+    assert [interception_team for _, interception_team in frames] == expected_interceptions
+    return events
+
+
+def test_pass_interception_and_loose_ball():
+    ball_acquisition = [1, 1, -1, 3, 3, -1, -1, 2, 2, 2, 4]
+    player_assignment = [{1: 1, 2: 2, 3: 1, 4: 2}] * len(ball_acquisition)
+    events = assert_same_as_baseline(ball_acquisition, player_assignment)
+    assert events["passes"][3] == 1
+    assert events["interceptions"][7] == 2
+    assert events["passes"][10] == 2
+
+
+def test_same_holder_after_a_loose_ball_is_not_an_event():
+    ball_acquisition = [1, 1, -1, -1, 1, 1]
+    events = assert_same_as_baseline(ball_acquisition, [{1: 1}] * len(ball_acquisition))
+    assert events["passes"] == events["interceptions"] == [-1] * len(ball_acquisition)
+
+
+def test_unknown_teams():
+    ball_acquisition = [1, 2, 3, 4]
+    player_assignment = [{1: 1}, {1: 1}, {3: 2}, {3: 2, 4: 2}]
+    assert_same_as_baseline(ball_acquisition, player_assignment)
+
+
+def test_team_change_of_the_holder():
+    ball_acquisition = [1, 1, 1, 2, 2]
+    player_assignment = [{1: 1, 2: 2}, {1: 2, 2: 2}, {1: 2, 2: 2}, {1: 2, 2: 2}, {1: 2, 2: 2}]
+    events = assert_same_as_baseline(ball_acquisition, player_assignment)
+    assert events["passes"][3] == 2
+
+
+def test_empty_and_no_possession():
+    assert_same_as_baseline([], [])
+    assert_same_as_baseline([-1] * 5, [{}] * 5)
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_random_games(seed):
+    assert_same_as_baseline(*random_game(seed))
+
+
+def test_wrappers_compute_the_events_once():
+    ball_acquisition, player_assignment = random_game(0)
+    detector = PassAndInterceptionDetector()
+    passes = detector.detect_passes(ball_acquisition, player_assignment)
+    events = detector._last_events[2]
+    detector.detect_interceptions(ball_acquisition, player_assignment)
+    assert detector._last_events[2] is events
+    assert detector.detect_events(ball_acquisition, player_assignment)["passes"] is passes
+
+    # Other input objects, even with equal contents, are computed again.
+    assert detector.detect_events(list(ball_acquisition), player_assignment) is not events
@@ -0,0 +1,159 @@
+import random
+
+import pytest
+
+from src.speed_and_distance_calculator import SpeedAndDistanceCalculator
+from src.utils import measure_distance
+
+
+def baseline_calculate_distance(calculator, tactical_player_positions):
+    """
+    calculate_distance as it was before vectorization.
+    """
+    previous_players_position = {}
+    output_distances = []
+    for frame_number, tactical_player_position_frame in enumerate(tactical_player_positions):
+        output_distances.append({})
+        for player_id, current_player_position in tactical_player_position_frame.items():
+            if player_id in previous_players_position:
+                previous_x, previous_y = previous_players_position[player_id]
+                current_x, current_y = current_player_position
+                meter_distance = measure_distance(
+                    (current_x * calculator.width_in_meters / calculator.width_in_pixels,
+                     current_y * calculator.height_in_meters / calculator.height_in_pixels),
+                    (previous_x * calculator.width_in_meters / calculator.width_in_pixels,
+                     previous_y * calculator.height_in_meters / calculator.height_in_pixels))
+                output_distances[frame_number][player_id] = meter_distance * 0.4
+            previous_players_position[player_id] = current_player_position
+    return output_distances
+
+
+def baseline_calculate_speed(distances, fps=30, window_size=5):
+    """
+    calculate_speed as it was before vectorization (window_size was fixed to 5).
+    """
+    speeds = []
+    for frame_idx in range(len(distances)):
+        speeds.append({})
+        for player_id in distances[frame_idx].keys():
+            start_frame = max(0, frame_idx - (window_size * 3) + 1)
+            total_distance = 0
+            frames_present = 0
+            last_frame_present = None
+            for i in range(start_frame, frame_idx + 1):
+                if player_id in distances[i]:
+                    if last_frame_present is not None:
+                        total_distance += distances[i][player_id]
+                        frames_present += 1
+                    last_frame_present = i
+            if frames_present >= window_size:
+                time_in_hours = frames_present / fps / 3600
+                speeds[frame_idx][player_id] = (total_distance / 1000) / time_in_hours
+            else:
+                speeds[frame_idx][player_id] = 0
+    return speeds
+
+
+def calculator(window_size=5):
+    speed_calculator = SpeedAndDistanceCalculator(300, 161, 28, 15)
+    speed_calculator.window_size = window_size
+    return speed_calculator
+
+
+def random_positions(seed, n_frames=300, n_players=10, presence=0.8):
+    """
+    Players walking on the court, each present in a frame with probability
+    presence, and a new track ID from time to time (tracker ID churn).
+    """
+    rng = random.Random(seed)
+    positions = {player_id: [rng.uniform(0, 300), rng.uniform(0, 161)] for player_id in range(n_players)}
+    next_id = n_players
+    frames = []
+    for _ in range(n_frames):
+        if rng.random() < 0.05:
+            positions[next_id] = positions.pop(rng.choice(list(positions)))
+            next_id += 1
+        frame = {}
+        for player_id, position in positions.items():
+            position[0] += rng.uniform(-3, 3)
+            position[1] += rng.uniform(-3, 3)
+            if rng.random() < presence:
+                frame[player_id] = list(position)
+        frames.append(frame)
+    return frames
+
+
+def assert_same_values(actual, expected, rel=1e-12):
+    assert len(actual) == len(expected)
+    for actual_frame, expected_frame in zip(actual, expected):
+        assert actual_frame.keys() == expected_frame.keys()
+        for player_id, value in expected_frame.items():
+            assert actual_frame[player_id] == pytest.approx(value, rel=rel, abs=1e-12)
+
+
+def rows_to_dicts(speed_calculator, tactical_player_positions):
+    rows = speed_calculator.rows_by_player(tactical_player_positions)
+    distances = speed_calculator.distance_rows(rows["frames"], rows["players"], rows["values"])
+    speeds, _ = speed_calculator.speed_rows(rows["frames"], rows["players"], distances)
+    return speed_calculator._rows_to_dicts(rows, distances), speed_calculator._rows_to_dicts(rows, speeds)
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("presence", [1.0, 0.8, 0.4])
+def test_distance_rows_and_speed_rows_match_baseline(seed, presence):
+    speed_calculator = calculator()
+    tactical_player_positions = random_positions(seed, presence=presence)
+    expected_distances = baseline_calculate_distance(speed_calculator, tactical_player_positions)
+    expected_speeds = baseline_calculate_speed(expected_distances)
+
+    distances, speeds = rows_to_dicts(speed_calculator, tactical_player_positions)
+    assert_same_values(distances, expected_distances)
+    assert_same_values(speeds, expected_speeds)
+    assert_same_values(speed_calculator.calculate_distance(tactical_player_positions), expected_distances)
+    assert_same_values(speed_calculator.calculate_speed(expected_distances), expected_speeds)
+
+
+@pytest.mark.parametrize("window_size", [1, 2, 3, 7])
+def test_window_size(window_size):
+    speed_calculator = calculator(window_size)
+    tactical_player_positions = random_positions(window_size, presence=0.6)
+    expected_distances = baseline_calculate_distance(speed_calculator, tactical_player_positions)
+    distances, speeds = rows_to_dicts(speed_calculator, tactical_player_positions)
+    assert_same_values(distances, expected_distances)
+    assert_same_values(speeds, baseline_calculate_speed(expected_distances, window_size=window_size))
+
+
+@pytest.mark.parametrize("present_every", [1, 2, 3, 4, 5])
+def test_frames_present_boundary(present_every):
+    # One player seen every present_every frames: the number of counted distances
+    # in the window of 15 frames falls on both sides of window_size (5).
+    tactical_player_positions = [{1: [frame_num * 1.5, 50.0]} if frame_num % present_every == 0 else {}
+                                 for frame_num in range(60)]
+    speed_calculator = calculator()
+    expected_distances = baseline_calculate_distance(speed_calculator, tactical_player_positions)
+    expected_speeds = baseline_calculate_speed(expected_distances)
+    distances, speeds = rows_to_dicts(speed_calculator, tactical_player_positions)
+    assert_same_values(distances, expected_distances)
+    assert_same_values(speeds, expected_speeds)
+
+    # Distances counted in a window (its first one excluded): 14 // present_every.
+    has_speed = any(speed > 0 for frame in expected_speeds for speed in frame.values())
+    assert has_speed == (14 // present_every >= 5)
+
+
+def test_online_update_matches_baseline():
+    speed_calculator = calculator()
+    tactical_player_positions = random_positions(7, presence=0.7)
+    expected_distances = baseline_calculate_distance(speed_calculator, tactical_player_positions)
+    expected_speeds = baseline_calculate_speed(expected_distances)
+
+    online = [speed_calculator.update(frame) for frame in tactical_player_positions]
+    assert_same_values([distances for distances, _ in online], expected_distances)
+    assert_same_values([speeds for _, speeds in online], expected_speeds)
+
+
+def test_empty_inputs():
+    speed_calculator = calculator()
+    assert rows_to_dicts(speed_calculator, []) == ([], [])
+    assert rows_to_dicts(speed_calculator, [{}, {}]) == ([{}, {}], [{}, {}])
+    assert rows_to_dicts(speed_calculator, [{1: [0.0, 0.0]}]) == ([{}], [{}])
@@ -0,0 +1,151 @@
+import random
+from copy import deepcopy
+
+import numpy as np
+import pytest
+
+from src.tactic_view.tactic_view_converter import TacticalViewConverter
+from src.utils.bbox import measure_distance
+
+
+def baseline_validate_keypoints(converter, keypoints_list):
+    """
+    validate_keypoints as it was before vectorization: a deep copy of the input,
+    then one loop per frame and per keypoint.
+    """
+    validated_list = deepcopy(keypoints_list)
+    for frame_idx, frame_keypoints in enumerate(validated_list):
+        if len(frame_keypoints) == 0:
+            continue
+        frame_keypoints = frame_keypoints[0]
+        detected_indices = [i for i, kp in enumerate(frame_keypoints) if kp[0] > 0 and kp[1] > 0]
+        if len(detected_indices) < 3:
+            continue
+
+        invalid_keypoints = []
+        for i in detected_indices:
+            other_indices = [idx for idx in detected_indices if idx != i and idx not in invalid_keypoints]
+            if len(other_indices) < 2:
+                continue
+            j, k = other_indices[:2]
+            d_ij = measure_distance(frame_keypoints[i], frame_keypoints[j])
+            d_ik = measure_distance(frame_keypoints[i], frame_keypoints[k])
+            t_ij = measure_distance(converter.key_points[i], converter.key_points[j])
+            t_ik = measure_distance(converter.key_points[i], converter.key_points[k])
+            if t_ij > 0 and t_ik > 0:
+                prop_detected = d_ij / d_ik if d_ik > 0 else float('inf')
+                prop_tactical = t_ij / t_ik
+                if abs((prop_detected - prop_tactical) / prop_tactical) > 0.8:
+                    validated_list[frame_idx][0][i] = np.array([0.0, 0.0])
+                    invalid_keypoints.append(i)
+    return validated_list
+
+
+@pytest.fixture
+def converter():
+    return TacticalViewConverter(court_image_path=None)
+
+
+def court_frame(converter, scale=3.0, offset=(40.0, 25.0), missing=(), moved=None):
+    """
+    Keypoints of one frame as returned by CourtKeypointDetector (one detection of
+    K [x, y] lists): the tactical key points scaled and shifted, with missing
+    keypoints at (0, 0) and some keypoints moved to given positions.
+    """
+    keypoints = [[x * scale + offset[0], y * scale + offset[1]] for x, y in converter.key_points]
+    for i in missing:
+        keypoints[i] = [0.0, 0.0]
+    for i, point in (moved or {}).items():
+        keypoints[i] = list(point)
+    return [keypoints]
+
+
+def random_frame(converter, rng):
+    missing = rng.sample(range(len(converter.key_points)), rng.randint(0, len(converter.key_points)))
+    moved = {i: (rng.uniform(1, 900), rng.uniform(1, 500))
+             for i in rng.sample(range(len(converter.key_points)), rng.randint(0, 4))}
+    return court_frame(converter, rng.uniform(1, 4), (rng.uniform(0, 200), rng.uniform(0, 100)), missing, moved)
+
+
+def assert_same_as_baseline(converter, keypoints_list):
+    expected = baseline_validate_keypoints(converter, keypoints_list)
+    validated = converter.validate_keypoints(keypoints_list)
+    assert len(validated) == len(expected)
+    for frame_validated, frame_expected in zip(validated, expected):
+        # Only the first detection of a frame is validated (and returned).
+        assert bool(len(frame_validated)) == bool(len(frame_expected))
+        if len(frame_expected):
+            expected_points = np.array([np.asarray(point, dtype=np.float64) for point in frame_expected[0]])
+            np.testing.assert_array_equal(frame_validated[0], expected_points)
+    return validated
+
+
+def test_consistent_frame_is_kept(converter):
+    keypoints_list = [court_frame(converter)]
+    validated = assert_same_as_baseline(converter, keypoints_list)
+    assert (validated[0][0] > 0).all()
+
+
+def test_outliers_are_dropped(converter):
+    keypoints_list = [court_frame(converter, moved={0: (800.0, 20.0)}),
+                      court_frame(converter, moved={2: (800.0, 20.0)})]
+    validated = assert_same_as_baseline(converter, keypoints_list)
+    # The outlier itself, or the keypoints compared with it first.
+    assert (validated[0][0][0] == 0).all()
+    assert (validated[1][0] == 0).any()
+
+
+def test_duplicate_points(converter):
+    # Two detected keypoints at the same position: a zero distance to compare with.
+    frame = court_frame(converter, missing=range(6, 18))
+    frame[0][1] = list(frame[0][0])
+    frame_all_equal = [[[50.0, 50.0]] * 4 + [[0.0, 0.0]] * 14]
+    assert_same_as_baseline(converter, [frame, frame_all_equal])
+
+
+def test_frames_with_fewer_than_three_keypoints(converter):
+    keypoints_list = [court_frame(converter, missing=range(2, 18)),
+                      court_frame(converter, missing=range(1, 18)),
+                      court_frame(converter, missing=range(18)),
+                      court_frame(converter, missing=range(3, 18))]
+    validated = assert_same_as_baseline(converter, keypoints_list)
+    # Nothing to compare with: the keypoints are returned unchanged.
+    for frame, frame_keypoints in zip(validated[:3], keypoints_list):
+        np.testing.assert_array_equal(frame[0], np.asarray(frame_keypoints[0]))
+
+
+def test_empty_frames(converter):
+    assert_same_as_baseline(converter, [[], court_frame(converter), [], []])
+    assert converter.validate_keypoints([[], []]) == [[], []]
+    assert converter.validate_keypoints([]) == []
+
+
+def test_several_detections_keep_the_first_one(converter):
+    first, second = court_frame(converter)[0], court_frame(converter, scale=2.0)[0]
+    validated = assert_same_as_baseline(converter, [[first, second]])
+    assert validated[0].shape == (1, len(converter.key_points), 2)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_random_fixtures(converter, seed):
+    rng = random.Random(seed)
+    keypoints_list = [random_frame(converter, rng) if rng.random() < 0.9 else [] for _ in range(50)]
+    assert_same_as_baseline(converter, keypoints_list)
+
+
+def test_list_input_is_not_modified_but_array_input_is_validated_in_place(converter):
+    # A list of per-frame keypoints (the CourtKeypointDetector output) is copied
+    # into a new array, like the baseline deep copy. A (num_frames, K, 2) array is
+    # validated in place to avoid the copy: callers passing an array they still
+    # need must copy it first.
+    keypoints_list = [court_frame(converter, moved={0: (800.0, 20.0)}) for _ in range(3)]
+    original = deepcopy(keypoints_list)
+    validated = converter.validate_keypoints(keypoints_list)
+    assert keypoints_list == original
+    assert (validated[0][0][0] == 0).all()
+
+    keypoints_array = np.array([frame[0] for frame in original], dtype=np.float64)
+    validated = converter.validate_keypoints(keypoints_array)
+    assert (keypoints_array[:, 0] == 0).all()
+    assert all(np.shares_memory(frame, keypoints_array) for frame in validated)
+    np.testing.assert_array_equal(np.concatenate(validated), keypoints_array)
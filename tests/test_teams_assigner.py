@@ -0,0 +1,84 @@
+import numpy as np
+
+from src.draws.draw_player import PlayerTracksDrawer
+from src.draws.tactic_viewer_drawer import TacticalViewDrawer
+from src.teams.team_engines import TeamClassificationEngine
+from src.teams.teams_assigner import TeamAssigner
+from src.utils import TrackTable
+
+
+class BrightnessEngine(TeamClassificationEngine):
+    """
+    Team 1 for bright crops, team 2 for dark ones, unknown (-1) in between.
+    """
+
+    def classify_crops(self, crops):
+        teams = []
+        for crop in crops:
+            brightness = crop.mean()
+            teams.append(1 if brightness > 170 else 2 if brightness < 85 else -1)
+        return teams
+
+
+def video():
+    # Player 1 on a bright area, player 2 on a dark one, player 3 on a gray one.
+    frame = np.zeros((100, 300, 3), dtype=np.uint8)
+    frame[:, :100] = 255
+    frame[:, 200:] = 128
+    tracks = {1: {"bbox": [10, 10, 90, 90]}, 2: {"bbox": [110, 10, 190, 90]}, 3: {"bbox": [210, 10, 290, 90]}}
+    return [frame] * 4, [dict(tracks) for _ in range(4)]
+
+
+def test_tracks_without_team_are_left_out_like_in_teams_view():
+    frames, player_tracks = video()
+    assigner = TeamAssigner(engine=BrightnessEngine(), sample_interval=1, samples_per_track=2)
+    assignment = assigner.get_player_teams_across_frames(frames, player_tracks)
+
+    assert assignment == [{1: 1, 2: 2}] * len(frames)
+    assert assigner.vote_team(3) == -1
+    # Streaming and chunked modes read the assignment back from a TrackTable.
+    assert list(TrackTable.from_tracks(player_tracks, assignment).teams_view()) == assignment
+
+
+def test_get_player_team_does_not_cache_unknown_teams():
+    frames, player_tracks = video()
+    assigner = TeamAssigner(engine=BrightnessEngine())
+    assert assigner.get_player_team(frames[0], player_tracks[0][3]["bbox"], 3) == -1
+    assert 3 not in assigner.player_team_dict
+    assert assigner.get_player_team(frames[0], [0, 0, 0, 0], 4) == -1
+    assert assigner.get_player_team(frames[0], player_tracks[0][1]["bbox"], 1) == 1
+    assert assigner.player_team_dict == {1: 1}
+
+
+def test_unknown_team_color():
+    team_colors = dict(team_1_color=[10, 20, 30], team_2_color=[40, 50, 60], unknown_team_color=[200, 200, 200])
+    drawer = PlayerTracksDrawer(**team_colors)
+    assert [drawer.team_color(team_id) for team_id in (1, 2, -1)] == [[10, 20, 30], [40, 50, 60], [200, 200, 200]]
+
+    frame = np.zeros((100, 100, 3), dtype=np.uint8)
+    drawer.draw_frame(frame, {5: {"bbox": [20, 20, 60, 80]}}, {}, -1)
+    colors = {tuple(int(value) for value in pixel) for pixel in frame.reshape(-1, 3)}
+    assert (200, 200, 200) in colors and (10, 20, 30) not in colors and (40, 50, 60) not in colors
+
+    tactical_drawer = TacticalViewDrawer(**team_colors)
+    frame = np.zeros((300, 400, 3), dtype=np.uint8)
+    court_image = np.zeros((161, 300, 3), dtype=np.uint8)
+    tactical_drawer.draw_frame(frame, court_image, [], {5: [50.0, 50.0]}, {}, -1)
+    assert tuple(frame[40 + 50, 20 + 50]) == (200, 200, 200)
+
+
+def test_tracks_unseen_for_forget_after_frames_are_forgotten():
+    frames, player_tracks = video()
+    assigner = TeamAssigner(engine=BrightnessEngine(), sample_interval=1, samples_per_track=2, forget_after=5)
+    assigner.get_player_teams_across_frames(frames[:1], player_tracks[:1])
+    frame = frames[0]
+    for frame_num in range(20):
+        # A new track ID every frame (tracker ID churn), player 1 always seen.
+        tracks = {1: player_tracks[0][1], 100 + frame_num: player_tracks[0][2]}
+        assignment = assigner.get_player_teams_across_frames([frame], [tracks])[0]
+        assert assignment == {1: 1, 100 + frame_num: 2}
+
+    remembered = set(range(100 + 20 - 6, 100 + 20)) | {1}
+    assert set(assigner.player_team_dict) == remembered
+    assert set(assigner.track_votes) == remembered
+    assert set(assigner.track_appearances) == remembered
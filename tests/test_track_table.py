@@ -0,0 +1,104 @@
+import numpy as np
+
+from src.utils import TrackTable
+
+
+def float_tracks():
+    # DeepSort style: string IDs, float64 boxes, an empty frame, a track without bbox.
+    return [
+        {"1": {"bbox": [100.123456789, 50.5, 140.987654321, 150.25]},
+         "2": {"bbox": [200.0, 60.0, 240.0, 160.0], "conf": 0.75}},
+        {},
+        {"2": {"bbox": [201.1, 61.2, 241.3, 161.4]}, "3": {"bbox": []}},
+        {"4": {"bbox": [1e-6, 2.0, 150 - 1e-6, 130.0]}, "1": {"bbox": [99.5, 49.5, 139.5, 149.5]}},
+    ]
+
+
+def int_tracks():
+    # Ball tracker style: integer IDs and boxes.
+    return [
+        {1: {"bbox": [10, 20, 30, 40]}},
+        {1: {"bbox": [11, 21, 31, 41]}},
+        {},
+    ]
+
+
+def without_empty_bboxes(tracks):
+    return [{track_id: {"bbox": track["bbox"]} for track_id, track in frame_tracks.items() if track.get("bbox")}
+            for frame_tracks in tracks]
+
+
+def assert_same_tracks(actual, expected):
+    assert len(actual) == len(expected)
+    for actual_frame, expected_frame in zip(actual, expected):
+        # Same track order and exact box values and types.
+        assert list(actual_frame) == list(expected_frame)
+        for track_id, track in expected_frame.items():
+            assert actual_frame[track_id]["bbox"] == track["bbox"]
+            assert [type(v) for v in actual_frame[track_id]["bbox"]] == [type(v) for v in track["bbox"]]
+
+
+def test_from_tracks_to_tracks_round_trip():
+    for tracks in (float_tracks(), int_tracks()):
+        table = TrackTable.from_tracks(tracks)
+        assert table.n_frames == len(tracks)
+        assert_same_tracks(table.to_tracks(), without_empty_bboxes(tracks))
+        assert_same_tracks(list(table.tracks_view()), without_empty_bboxes(tracks))
+
+
+def test_float64_boxes_are_kept_exactly():
+    table = TrackTable.from_tracks(float_tracks())
+    assert table.columns["x1"][0] == 100.123456789
+    assert table.to_tracks()[3]["4"]["bbox"][2] == 150 - 1e-6
+    assert table.columns["conf"][1] == 0.75
+    assert np.isnan(table.columns["conf"][0])
+
+
+def test_teams_round_trip():
+    tracks = float_tracks()
+    assignment = [{"1": 1, "2": 2}, {}, {"2": 2}, {"1": 1}]
+    table = TrackTable.from_tracks(tracks, assignment)
+    assert table.to_team_assignment() == assignment
+    assert list(table.teams_view()) == assignment
+    assert table.with_teams(assignment).to_team_assignment() == assignment
+
+
+def test_save_load_mmap_round_trip(tmp_path):
+    tracks = float_tracks()
+    table = TrackTable.from_tracks(tracks, [{"1": 1}, {}, {"2": 2}, {}])
+    table.save(str(tmp_path / "table"))
+
+    loaded = TrackTable.load(str(tmp_path / "table"))
+    assert isinstance(loaded.columns["x1"], np.memmap)
+    assert loaded.n_frames == table.n_frames
+    assert (loaded.str_ids, loaded.int_bboxes) == (table.str_ids, table.int_bboxes)
+    for name, column in table.columns.items():
+        assert loaded.columns[name].dtype == column.dtype
+        np.testing.assert_array_equal(loaded.columns[name], column)
+    assert_same_tracks(loaded.to_tracks(), without_empty_bboxes(tracks))
+    assert loaded.to_team_assignment() == table.to_team_assignment()
+
+
+def test_frame_slice():
+    tracks = without_empty_bboxes(float_tracks())
+    table = TrackTable.from_tracks(tracks)
+    for start, end in ((0, 4), (1, 3), (2, 4), (3, 3), (-2, 10)):
+        window = table.frame_slice(start, end)
+        assert_same_tracks(window.to_tracks(), tracks[max(0, start):end])
+        assert window.columns["frame"].min(initial=0) >= 0
+
+
+def test_concatenate_windows():
+    tracks = without_empty_bboxes(float_tracks())
+    table = TrackTable.from_tracks(tracks)
+    windows = [table.frame_slice(0, 1), table.frame_slice(1, 3), table.frame_slice(3, 4)]
+    joined = TrackTable.concatenate(windows)
+    assert joined.n_frames == len(tracks)
+    for name, column in table.columns.items():
+        np.testing.assert_array_equal(joined.columns[name], column)
+    assert_same_tracks(joined.to_tracks(), tracks)
+
+    # Windows built separately keep their own types, e.g. integer ball boxes.
+    joined = TrackTable.concatenate([TrackTable.from_tracks(int_tracks()), TrackTable.from_tracks([{}])])
+    assert_same_tracks(joined.to_tracks(), int_tracks() + [{}])
+    assert TrackTable.concatenate([]).n_frames == 0